@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+Streaming alert rules evaluated in the logger process.
+
+Each rule watches one location's readings:
+
+* ``above``: the temperature stays above ``threshold`` for ``duration`` seconds.
+* ``below``: the temperature stays below ``threshold`` for ``duration``
+  seconds. With ``arm`` set, the rule only counts once the temperature has
+  reached ``arm`` since it last fired, so "fire burning down" fires once per
+  burn instead of all day on a cold stove.
+* ``rise`` / ``fall``: the least-squares slope over the last ``window``
+  seconds exceeds ``threshold`` °F per minute.
+
+A rule fires on the first sample that meets its condition, so an alert goes
+out within one sample period, and resolves once the condition clears past
+``clear`` (hysteresis). ``min_value`` ignores samples below a level, e.g. a
+fast rise only matters on an already hot catalyst. Each sample costs O(1) per
+rule: the level rules only remember when their condition started, and the
+slope rules keep running sums over the window, so each reading is added and
+removed once.
+
+Alerts go to pluggable sinks: the log, a JSON-lines file, or a webhook such
+as the chat backend's /api/alerts, posted from a background thread so a slow
+endpoint never delays sampling. ``AlertLog`` is the chat backend's SQLite
+record of the rules and alerts it receives.
+"""
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+ALERTS_FIRED = metrics.counter("stove_alerts_fired_total", "Alerts fired by the edge rule engine", ["rule"])
+ALERT_SINK_FAILURES = metrics.counter("stove_alert_sink_failures_total", "Alerts a sink failed to deliver", ["sink"])
+
+KINDS = ("above", "below", "rise", "fall")
+STATES = ("firing", "resolved")
+
+# ALERT_RULES=default
+DEFAULT_RULES = [
+    {"name": "overfire", "kind": "above", "threshold": 1600, "duration": 120, "clear": 1500,
+     "severity": "critical"},
+    {"name": "runaway", "kind": "rise", "threshold": 50, "window": 180, "min_value": 1200,
+     "severity": "warning"},
+    {"name": "reload", "kind": "below", "threshold": 500, "arm": 700, "duration": 120, "clear": 550,
+     "severity": "info", "message": "Catalyst is down to {value:.0f}°F, time to reload"},
+    {"name": "fire_out", "kind": "below", "threshold": 250, "arm": 500, "duration": 600, "clear": 300,
+     "severity": "info", "message": "The fire is out ({value:.0f}°F)"},
+]
+
+
+class Rule:
+    """One alert condition on one location's readings."""
+
+    FIELDS = ("name", "kind", "threshold", "location", "duration", "window", "clear", "arm",
+              "min_value", "severity", "message")
+
+    def __init__(self, name: str, kind: str, threshold: float, location: str = "catalyst",
+                 duration: float = 0.0, window: float = 300.0, clear: Optional[float] = None,
+                 arm: Optional[float] = None, min_value: Optional[float] = None,
+                 severity: str = "warning", message: Optional[str] = None):
+        if kind not in KINDS:
+            raise ValueError(f"Alert rule '{name}' has unknown kind '{kind}', expected one of {', '.join(KINDS)}")
+        if window <= 0:
+            raise ValueError(f"Alert rule '{name}' needs a positive window")
+        self.name = name
+        self.kind = kind
+        self.threshold = float(threshold)
+        self.location = location
+        self.duration = float(duration)
+        self.window = float(window)
+        self.clear = float(threshold if clear is None else clear)
+        self.arm = arm
+        self.min_value = min_value
+        self.severity = severity
+        self.message = message
+
+    @classmethod
+    def from_dict(cls, spec: dict) -> "Rule":
+        unknown = set(spec) - set(cls.FIELDS)
+        if unknown:
+            raise ValueError(f"Alert rule '{spec.get('name')}' has unknown fields: {', '.join(sorted(unknown))}")
+        return cls(**spec)
+
+    def to_dict(self) -> dict:
+        spec = {field: getattr(self, field) for field in self.FIELDS}
+        return {key: value for key, value in spec.items() if value is not None}
+
+    def describe(self) -> str:
+        """Plain-language condition, e.g. "catalyst above 1600°F for 2 min"."""
+        if self.kind in ("rise", "fall"):
+            text = f"{self.location} {'rising' if self.kind == 'rise' else 'falling'} faster than " \
+                   f"{self.threshold:g}°F/min over {self.window / 60:g} min"
+        else:
+            text = f"{self.location} {self.kind} {self.threshold:g}°F"
+            if self.arm is not None:
+                text += f" after reaching {self.arm:g}°F"
+        if self.duration:
+            text += f" for {self.duration / 60:g} min"
+        return text
+
+
+class _RuleState:
+    """Incremental evaluation of one rule."""
+
+    def __init__(self, rule: Rule):
+        self.rule = rule
+        self.firing = False
+        self.armed = rule.arm is None
+        self.since: Optional[float] = None
+        self.value: Optional[float] = None
+        # Sliding window for the slope rules, with sums relative to t0
+        self._window: deque = deque()
+        self._t0 = 0.0
+        self._sums = [0.0] * 5  # n, Σt, Σv, Σt², Σtv
+
+    def _add(self, t: float, value: float, sign: float):
+        x = t - self._t0
+        for i, term in enumerate((1.0, x, value, x * x, x * value)):
+            self._sums[i] += sign * term
+
+    def _slope(self, t: float, value: float) -> Optional[float]:
+        """Least-squares slope in °F/min over the window ending at t, once it covers half the window."""
+        if not self._window or t - self._t0 > 100000:
+            # Re-center the sums now and then so they keep their precision
+            self._t0 = t
+            self._sums = [0.0] * 5
+            for old in self._window:
+                self._add(*old, 1.0)
+        self._window.append((t, value))
+        self._add(t, value, 1.0)
+        while self._window[0][0] <= t - self.rule.window:
+            self._add(*self._window.popleft(), -1.0)
+        n, st, sv, stt, stv = self._sums
+        spread = n * stt - st * st
+        if n < 3 or t - self._window[0][0] < self.rule.window / 2 or spread <= 0:
+            return None
+        return (n * stv - st * sv) / spread * 60
+
+    def update(self, t: float, value: float) -> Optional[str]:
+        """Feed one reading; return "firing" or "resolved" when the alert changes state."""
+        rule = self.rule
+        if rule.kind in ("rise", "fall"):
+            slope = self._slope(t, value)
+            if slope is None:
+                return None
+            metric = slope if rule.kind == "rise" else -slope
+        else:
+            metric = value
+        if rule.arm is not None and value >= rule.arm:
+            self.armed = True
+        self.value = value
+
+        below = rule.kind == "below"
+        if self.firing:
+            if (metric >= rule.clear) if below else (metric <= rule.clear):
+                self.firing = False
+                self.since = None
+                return "resolved"
+            return None
+
+        met = self.armed and ((metric < rule.threshold) if below else (metric > rule.threshold))
+        if met and rule.min_value is not None and value < rule.min_value:
+            met = False
+        if not met:
+            self.since = None
+            return None
+        if self.since is None:
+            self.since = t
+        if t - self.since >= rule.duration:
+            self.firing = True
+            self.armed = rule.arm is None
+            return "firing"
+        return None
+
+
+class AlertEngine:
+    """Evaluates every rule on each sample and sends state changes to the sinks."""
+
+    def __init__(self, rules: List[Rule], sinks: list):
+        names = [rule.name for rule in rules]
+        if len(set(names)) != len(names):
+            raise ValueError("Alert rule names must be unique")
+        self.rules = rules
+        self.sinks = sinks
+        self._states = [_RuleState(rule) for rule in rules]
+        self._emit({"type": "rules", "time": time.time(), "rules": [rule.to_dict() for rule in rules]})
+
+    def process(self, readings: Dict[str, Optional[float]], t: float) -> List[dict]:
+        """Evaluate one sample ({location: °F or None}, epoch seconds); return the alerts it raised or resolved."""
+        events = []
+        for state in self._states:
+            value = readings.get(state.rule.location)
+            if value is None:
+                continue
+            change = state.update(t, value)
+            if change is not None:
+                events.append(self._event(state, change, t))
+        for event in events:
+            if event["state"] == "firing":
+                ALERTS_FIRED.inc(rule=event["rule"])
+            self._emit(event)
+        return events
+
+    def _event(self, state: _RuleState, change: str, t: float) -> dict:
+        rule = state.rule
+        if change == "firing" and rule.message:
+            message = rule.message.format(value=state.value, threshold=rule.threshold, location=rule.location)
+        elif change == "firing":
+            message = f"{rule.describe()} ({state.value:.0f}°F)"
+        else:
+            message = f"Cleared: {rule.describe()} ({state.value:.0f}°F)"
+        return {
+            "type": "alert",
+            "rule": rule.name,
+            "state": change,
+            "severity": rule.severity,
+            "location": rule.location,
+            "value": round(state.value, 1),
+            "time": t,
+            "message": message
+        }
+
+    def _emit(self, event: dict):
+        for sink in self.sinks:
+            try:
+                sink.emit(event)
+            except Exception as e:
+                ALERT_SINK_FAILURES.inc(sink=type(sink).__name__)
+                logger.error(f"Alert sink {type(sink).__name__} failed: {e}")
+
+    def active(self) -> List[str]:
+        """Names of the rules currently firing."""
+        return [state.rule.name for state in self._states if state.firing]
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+class LogSink:
+    """Writes alerts to the logger's log."""
+
+    def emit(self, event: dict):
+        if event["type"] == "rules":
+            logger.info(f"Alert rules: {', '.join(rule['name'] for rule in event['rules'])}")
+        elif event["state"] == "firing":
+            logger.warning(f"ALERT [{event['severity']}] {event['rule']}: {event['message']}")
+        else:
+            logger.info(f"Alert resolved {event['rule']}: {event['message']}")
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    """Appends alerts to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def emit(self, event: dict):
+        with self._lock:
+            self._file.write(json.dumps(event) + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class WebhookSink:
+    """POSTs each alert as JSON to a URL from a background thread.
+
+    emit only queues the alert. When the queue is full the oldest alert is
+    dropped; failed posts are retried with backoff a few times.
+    """
+
+    def __init__(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 5.0,
+                 max_queue: int = 1000, retries: int = 3):
+        self.url = url
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.timeout = timeout
+        self.retries = retries
+        self.sent = 0
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="alert-webhook", daemon=True)
+        self._thread.start()
+
+    def emit(self, event: dict):
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def _post(self, event: dict):
+        request = urllib.request.Request(self.url, data=json.dumps(event).encode(), headers=self.headers,
+                                         method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            for attempt in range(self.retries + 1):
+                try:
+                    self._post(event)
+                    self.sent += 1
+                    break
+                except Exception as e:
+                    if attempt == self.retries:
+                        self.dropped += 1
+                        ALERT_SINK_FAILURES.inc(sink="WebhookSink")
+                        logger.error(f"Failed to post alert to {self.url}: {e}")
+                    else:
+                        time.sleep(min(2 ** attempt, 30))
+
+    def close(self, timeout: float = 10.0):
+        """Send what is queued, waiting up to timeout seconds."""
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+
+
+def load_rules(config: str) -> List[Rule]:
+    """Rules from ALERT_RULES: "default", a JSON list, or the path of a JSON file holding one."""
+    config = config.strip()
+    if config == "default":
+        specs = DEFAULT_RULES
+    elif config.startswith("["):
+        specs = json.loads(config)
+    else:
+        with open(config, encoding="utf-8") as f:
+            specs = json.load(f)
+    return [Rule.from_dict(spec) for spec in specs]
+
+
+def sinks_from_config(config: str, webhook_headers: Optional[Dict[str, str]] = None) -> list:
+    """Sinks from ALERT_SINKS, a comma-separated list of log, file:PATH and webhook:URL."""
+    sinks = []
+    for entry in config.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        kind, _, target = entry.partition(":")
+        if kind in ("log", "stdout"):
+            sinks.append(LogSink())
+        elif kind == "file" and target:
+            sinks.append(FileSink(target))
+        elif kind == "webhook" and target:
+            sinks.append(WebhookSink(target, webhook_headers))
+        else:
+            raise ValueError(f"Invalid alert sink '{entry}', expected log, file:PATH or webhook:URL")
+    return sinks
+
+
+def _checked_rules(specs) -> List[dict]:
+    """The rules of a posted rules event as validated Rule dicts; raises ValueError."""
+    if not isinstance(specs, list):
+        raise ValueError("A rules event needs a list of rules")
+    rules = []
+    for spec in specs:
+        if not isinstance(spec, dict):
+            raise ValueError("Each alert rule must be an object")
+        try:
+            rules.append(Rule.from_dict(spec).to_dict())
+        except TypeError as e:
+            raise ValueError(f"Invalid alert rule '{spec.get('name')}': {e}")
+    names = [rule["name"] for rule in rules]
+    if len(set(names)) != len(names):
+        raise ValueError("Alert rule names must be unique")
+    return rules
+
+
+def _checked_alert(event: dict) -> tuple:
+    """(time, rule, state, severity, location, value, message) of a posted alert; raises ValueError."""
+    def number(value):
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+    if not number(event.get("time")):
+        raise ValueError("An alert needs a numeric time")
+    if not isinstance(event.get("rule"), str) or not event["rule"]:
+        raise ValueError("An alert needs a rule name")
+    if event.get("state") not in STATES:
+        raise ValueError(f"An alert state must be one of {', '.join(STATES)}")
+    if event.get("value") is not None and not number(event["value"]):
+        raise ValueError("An alert value must be a number")
+    row = [event["time"], event["rule"], event["state"]]
+    for field, default in (("severity", "warning"), ("location", "catalyst")):
+        value = event.get(field, default)
+        if not isinstance(value, str):
+            raise ValueError(f"An alert {field} must be a string")
+        row.append(value)
+    message = event.get("message", "")
+    if not isinstance(message, str):
+        raise ValueError("An alert message must be a string")
+    return (*row, event.get("value"), message)
+
+
+class AlertLog:
+    """SQLite record of the alert rules and alerts posted by the logger's webhook sink.
+
+    Shared by every gunicorn worker through the database file.
+    """
+
+    def __init__(self, path: str, max_age: float = 90 * 86400):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS alert_rules (name TEXT PRIMARY KEY, rule TEXT NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS alerts ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " time REAL NOT NULL,"
+            " rule TEXT NOT NULL,"
+            " state TEXT NOT NULL,"
+            " severity TEXT NOT NULL,"
+            " location TEXT NOT NULL,"
+            " value REAL,"
+            " message TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS alerts_time ON alerts (time)")
+
+    @contextmanager
+    def _transaction(self):
+        """Hold the lock and a write transaction, rolled back if the block raises."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def record(self, event: dict) -> bool:
+        """Store one event from AlertEngine (a rule list or an alert); False if it is neither.
+
+        Raises ValueError for a malformed event, before anything is written.
+        """
+        if event.get("type") == "rules":
+            rules = _checked_rules(event.get("rules"))
+            with self._transaction():
+                self._conn.execute("DELETE FROM alert_rules")
+                self._conn.executemany("INSERT INTO alert_rules (name, rule) VALUES (?, ?)",
+                                       [(rule["name"], json.dumps(rule)) for rule in rules])
+            return True
+        if event.get("type") != "alert":
+            return False
+        row = _checked_alert(event)
+        with self._transaction():
+            self._conn.execute(
+                "INSERT INTO alerts (time, rule, state, severity, location, value, message)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)", row
+            )
+            self._conn.execute("DELETE FROM alerts WHERE time < ?", (row[0] - self.max_age,))
+        return True
+
+    def rules(self) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT rule FROM alert_rules ORDER BY name").fetchall()
+        return [json.loads(row["rule"]) for row in rows]
+
+    def active(self) -> List[dict]:
+        """The latest alert of each rule whose latest state is firing."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM alerts WHERE id IN (SELECT MAX(id) FROM alerts GROUP BY rule)"
+                " AND state = 'firing' ORDER BY time"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def since(self, start: float, limit: int = 100) -> List[dict]:
+        """Alerts raised or resolved at or after start, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM alerts WHERE time >= ? ORDER BY time DESC, id DESC LIMIT ?", (start, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
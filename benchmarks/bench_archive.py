@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Measure bulk history export and import throughput and memory (history_archive.py).
+
+The InfluxDB mock (benchmarks/mock_services.py) serves a burn-cycle trace
+of --rows readings. The range is exported a chunk at a time to Parquet and
+to Arrow IPC, then loaded back through the batched write path into the
+mock's /api/v2/write and straight into a local store. A second, ten times
+shorter export shows whether memory stays flat as the range grows.
+
+Each step runs in its own process, so its peak resident memory can be
+measured from a clean start. rss_growth_bytes is how far the peak rose
+above the footprint after imports; arrow_peak_bytes is the most Arrow
+memory held at once. rows_per_cpu_s counts only the step's own CPU time, so
+it tracks the archive code even where the mock is the slower side.
+
+Usage:
+    python benchmarks/bench_archive.py
+    python benchmarks/bench_archive.py --rows 5000000 --json results.json
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import mock_services  # noqa: E402
+
+STEPS = ("export_parquet_tenth", "export_parquet", "export_arrow", "import_influxdb", "import_local_store")
+
+
+def peak_rss_bytes():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_step(args):
+    """Child process: run one step and return its results."""
+    import influxdb_client
+    import pyarrow as pa
+    from influxdb_client.client.write_api import SYNCHRONOUS
+
+    import history_archive
+    from local_store import RingStore
+
+    url = f"http://127.0.0.1:{args.mock_port}"
+    parquet_path, arrow_path = str(Path(args.dir) / "history.parquet"), str(Path(args.dir) / "history.arrow")
+    client = influxdb_client.InfluxDBClient(url=url, token="mock", org="mock", timeout=300_000)
+    baseline = peak_rss_bytes()
+    cpu_started = cpu_seconds()
+    started = time.perf_counter()
+
+    if args.step.startswith("export"):
+        start = args.stop - (args.stop - args.start) / 10 if args.step.endswith("tenth") else args.start
+        path = arrow_path if args.step == "export_arrow" else parquet_path
+        if args.step.endswith("tenth"):
+            path = str(Path(args.dir) / "tenth.parquet")
+        rows = history_archive.export_range(client.query_api(), "mock", start, args.stop, path,
+                                            chunk_seconds=int(args.chunk_hours * 3600))
+        result = {"rows": rows, "file_bytes": os.path.getsize(path)}
+    elif args.step == "import_influxdb":
+        before = json.load(urllib.request.urlopen(f"{url}/mock/stats"))["points_written"]
+        rows, accepted = history_archive.load_file(parquet_path, client.write_api(write_options=SYNCHRONOUS),
+                                                   "mock", "mock", str(Path(args.dir) / "spool.db"),
+                                                   args.points_per_write)
+        delivered = json.load(urllib.request.urlopen(f"{url}/mock/stats"))["points_written"] - before
+        result = {"rows": rows, "accepted": accepted, "delivered": delivered}
+    else:
+        store = RingStore(str(Path(args.dir) / "local_store.bin"), capacity=args.rows)
+        rows, stored = history_archive.import_to_store(history_archive.read_batches(arrow_path), store)
+        result = {"rows": rows, "stored": stored}
+
+    elapsed = time.perf_counter() - started
+    cpu = cpu_seconds() - cpu_started
+    client.close()
+    result.update({
+        "s": round(elapsed, 2),
+        "cpu_s": round(cpu, 2),
+        "rows_per_s": round(result["rows"] / elapsed),
+        "rows_per_cpu_s": round(result["rows"] / cpu),
+        "rss_growth_bytes": peak_rss_bytes() - baseline,
+        "arrow_peak_bytes": pa.default_memory_pool().max_memory(),
+    })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000, help="readings in the exported range")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between readings")
+    parser.add_argument("--chunk-hours", type=float, default=24, help="hours of data per Flux query")
+    parser.add_argument("--points-per-write", type=int, default=5000)
+    parser.add_argument("--mock-port", type=int, default=8930)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--step", choices=STEPS, help=argparse.SUPPRESS)
+    parser.add_argument("--dir", help=argparse.SUPPRESS)
+    parser.add_argument("--start", type=float, help=argparse.SUPPRESS)
+    parser.add_argument("--stop", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.step:
+        # Child process: run one step and print its results as JSON
+        print(json.dumps(run_step(args)))
+        return
+
+    hours = args.rows * args.interval / 3600
+    mocks = mock_services.spawn(args.mock_port, history_hours=hours, history_interval=args.interval, timeout=300)
+    # The trace ends when the mock starts
+    stop = time.time() + 1
+    start = stop - hours * 3600 - 60
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            for step in STEPS:
+                output = subprocess.run(
+                    [sys.executable, __file__, "--step", step, "--dir", data_dir, "--start", str(start),
+                     "--stop", str(stop), "--rows", str(args.rows), "--chunk-hours", str(args.chunk_hours),
+                     "--points-per-write", str(args.points_per_write), "--mock-port", str(args.mock_port)],
+                    cwd=ROOT, check=True, stdout=subprocess.PIPE, text=True
+                ).stdout
+                results[step] = json.loads(output.strip().splitlines()[-1])
+                r = results[step]
+                print(f"{step:>21}: {r['rows']:>9} rows in {r['s']:6.2f} s ({r['rows_per_s']:>8} rows/s, "
+                      f"{r['rows_per_cpu_s']:>8} per CPU s), "
+                      f"peak RSS +{r['rss_growth_bytes'] / 2 ** 20:.0f} MiB, "
+                      f"Arrow peak {r['arrow_peak_bytes'] / 2 ** 20:.0f} MiB"
+                      + (f", file {r['file_bytes'] / 2 ** 20:.1f} MiB" if "file_bytes" in r else ""))
+    finally:
+        mocks.terminate()
+        mocks.wait()
+
+    delivered = results["import_influxdb"]["delivered"]
+    print(f"InfluxDB import: {delivered} of {results['export_parquet']['rows']} exported rows reached the mock")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
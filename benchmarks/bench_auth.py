@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Measure authentication overhead per request.
+
+Compares the old check of every request (Werkzeug check_password_hash:
+scrypt or PBKDF2, depending on the Werkzeug version) with the two shortcuts
+in chat_auth: a verified-credential cache hit and a signed bearer token
+check. Also reports how many requests per second one core could
+authenticate with each.
+
+Usage:
+    python benchmarks/bench_auth.py
+    python benchmarks/bench_auth.py --requests 20000 --json results.json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from chat_auth import TokenSigner, VerifiedCredentials, derive_secret  # noqa: E402
+
+
+def per_call_us(fn, calls):
+    fn()  # warm up
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10000, help="requests timed for the fast checks")
+    parser.add_argument("--hash-requests", type=int, default=20, help="requests timed for the password hash")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    password = "correct horse battery staple"
+    password_hash = generate_password_hash(password)
+    secret = derive_secret(password, "benchmark-secret")
+    credentials = VerifiedCredentials(secret)
+    credentials.add("admin", password)
+    signer = TokenSigner(secret)
+    token, _ = signer.issue("admin")
+
+    checks = {
+        "password_hash": (lambda: check_password_hash(password_hash, password), args.hash_requests),
+        "verified_credentials": (lambda: credentials.contains("admin", password), args.requests),
+        "bearer_token": (lambda: signer.verify(token), args.requests),
+    }
+    print(f"Password hash method: {password_hash.split('$')[0]}")
+    results = {"method": password_hash.split("$")[0], "checks": {}}
+    for name, (fn, calls) in checks.items():
+        us = per_call_us(fn, calls)
+        results["checks"][name] = {"us_per_request": round(us, 2), "requests_per_core_s": round(1e6 / us)}
+        print(f"{name:>22}: {us:10.2f} µs per request ({1e6 / us:10.0f} requests/s per core)")
+    baseline = results["checks"]["password_hash"]["us_per_request"]
+    for name in ("verified_credentials", "bearer_token"):
+        print(f"{name:>22}: {baseline / results['checks'][name]['us_per_request']:.0f}x cheaper than the hash")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Compare window means with shape-preserving downsampling at the same point budget.
+
+Builds a synthetic trace of 5-minute points with fires and short reload
+spikes. It reduces the trace to --budget points three ways: window means (the
+old history tool), LTTB and per-bucket min/max. It reports the JSON payload
+size, estimated tokens (chars / 4), time, how far the highest kept point is
+below the true peak, and how many reload spikes are still visible.
+
+Usage:
+    python benchmarks/bench_downsample.py --days 7 --budget 50
+    python benchmarks/bench_downsample.py --days 90 --budget 500 --json results.json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from downsample import downsample  # noqa: E402
+
+INTERVAL_S = 300
+
+
+def synthetic_trace(days, seed=0):
+    """Two fires a day, each with a 15-minute reload spike two hours in."""
+    rng = np.random.default_rng(seed)
+    n = days * 86400 // INTERVAL_S
+    t = np.arange(n) * INTERVAL_S
+    temps = np.full(n, 80.0)
+    spikes = []
+    for start in range(0, n, 12 * 3600 // INTERVAL_S):
+        length = int(rng.uniform(4, 6) * 3600 / INTERVAL_S)
+        burn = np.arange(min(length, n - start))
+        temps[start:start + len(burn)] += rng.uniform(600, 900) * np.exp(-burn / (length / 3))
+        spike = start + 2 * 3600 // INTERVAL_S
+        if spike + 3 < n:
+            temps[spike:spike + 3] += 250
+            spikes.append(spike + 1)
+    return t, temps + rng.normal(0, 3, n), np.array(spikes)
+
+
+def payload(times, temps):
+    return json.dumps([{"temperature": round(float(v), 2), "time": int(s)} for s, v in zip(times, temps)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--budget", type=int, default=50)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    t, temps, spikes = synthetic_trace(args.days)
+    results = {"points": len(t), "budget": args.budget, "full_bytes": len(payload(t, temps)), "methods": {}}
+
+    def window_means():
+        size = -(-len(t) // args.budget)
+        bins = np.arange(len(t)) // size
+        counts = np.bincount(bins)
+        return (np.bincount(bins, t) / counts), np.bincount(bins, temps) / counts
+
+    def select(method):
+        keep = downsample(t, temps, args.budget, method)
+        return t[keep], temps[keep]
+
+    for name, fn in (("window_mean", window_means), ("lttb", lambda: select("lttb")),
+                     ("minmax", lambda: select("minmax"))):
+        fn()  # warm up
+        started = time.perf_counter()
+        times, values = fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        body = payload(times, values)
+        # A reload spike is visible when a kept point within 15 minutes of it is 150°F
+        # above the reading half an hour earlier
+        visible = sum(
+            bool(np.any((np.abs(times - t[s]) <= 900) & (values > temps[s - 6] + 150))) for s in spikes
+        )
+        results["methods"][name] = {
+            "points": len(values),
+            "bytes": len(body),
+            "approx_tokens": len(body) // 4,
+            "ms": round(elapsed, 3),
+            "peak_error": round(float(temps.max() - values.max()), 1),
+            "spikes_visible": f"{visible}/{len(spikes)}"
+        }
+        r = results["methods"][name]
+        print(f"{name:>12}: {r['points']:4d} pts {r['bytes']:7d} B (~{r['approx_tokens']} tokens) "
+              f"{r['ms']:7.3f} ms  peak error {r['peak_error']:6.1f}°F  reload spikes {r['spikes_visible']}")
+    print(f"{'full':>12}: {len(t):4d} pts {results['full_bytes']:7d} B")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark the prediction feature pipeline against a naive per-point loop.
+
+The naive version mirrors engineerFeatures/prepareTrainingData in
+src/predictionModel.js: per-point slices for the rolling mean and a nested
+list per training window. The vectorized version is burn_prediction's
+engineer_features plus the zero-copy window view.
+
+Usage:
+    python benchmarks/bench_features.py --days 30 90 365
+    python benchmarks/bench_features.py --days 90 --json results.json
+
+Reports wall time and peak traced memory of each path and checks that both
+produce the same windows. The naive loop is skipped above --naive-max-days,
+since it needs gigabytes for a year of data.
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from burn_prediction import SEQUENCE_LENGTH, engineer_features, training_windows, window_view  # noqa: E402
+
+POINTS_PER_DAY = 24 * 12  # 5-minute points
+
+
+def synthetic_temperatures(days, seed=0):
+    """Two fires a day on top of room temperature, with sensor noise."""
+    rng = np.random.default_rng(seed)
+    minutes = np.arange(days * POINTS_PER_DAY) * 5.0
+    phase = (minutes % 720) / 720
+    burn = 900 * np.sqrt(np.clip(np.sin(np.pi * np.minimum(phase / 0.6, 1)), 0, None))
+    return 70 + burn + rng.normal(0, 5, len(minutes))
+
+
+def naive_pipeline(temperatures, sequence_length=SEQUENCE_LENGTH):
+    """Per-point loop like the browser code: O(N * window) Python objects."""
+    features = []
+    for i, temp in enumerate(temperatures):
+        rate = temp - temperatures[i - 1] if i > 0 else 0.0
+        window = temperatures[max(0, i - 2):i + 1]
+        rolling = sum(window) / len(window)
+        features.append([max(0.0, temp) / 800, rate / 100, max(0.0, rolling) / 800])
+    sequences, targets = [], []
+    for i in range(len(features) - sequence_length - 1):
+        sequences.append([list(f) for f in features[i:i + sequence_length]])
+        targets.append(features[i + sequence_length][0])
+    return sequences, targets
+
+
+def vectorized_pipeline(temperatures, sequence_length=SEQUENCE_LENGTH):
+    features = engineer_features(temperatures)
+    return window_view(features, sequence_length), training_windows(features, sequence_length)
+
+
+def measure(fn, *args):
+    """Return (result, wall ms, peak MB); tracing slows Python code, so memory is a second run."""
+    started = time.perf_counter()
+    result = fn(*args)
+    elapsed = (time.perf_counter() - started) * 1000
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 90, 365])
+    parser.add_argument("--naive-max-days", type=int, default=90)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for days in args.days:
+        temps = synthetic_temperatures(days)
+        (windows, (inputs, targets)), vec_ms, vec_mb = measure(vectorized_pipeline, temps)
+        row = {
+            "days": days,
+            "points": len(temps),
+            "windows": len(targets),
+            "vectorized_ms": round(vec_ms, 2),
+            "vectorized_peak_mb": round(vec_mb, 2),
+            "window_view_shares_memory": bool(np.shares_memory(windows, inputs)),
+        }
+        if days <= args.naive_max_days:
+            (sequences, naive_targets), naive_ms, naive_mb = measure(naive_pipeline, temps.tolist())
+            row.update({
+                "naive_ms": round(naive_ms, 1),
+                "naive_peak_mb": round(naive_mb, 1),
+                "speedup": round(naive_ms / vec_ms, 1),
+                "max_abs_diff": float(max(
+                    np.abs(windows[:len(sequences)] - np.asarray(sequences, dtype=np.float32)).max(),
+                    np.abs(targets[:, 0] - np.asarray(naive_targets, dtype=np.float32)).max()
+                )),
+            })
+            del sequences
+        results.append(row)
+        naive = (f"naive {row['naive_ms']:9.1f} ms {row['naive_peak_mb']:8.1f} MB  x{row['speedup']}"
+                 if "naive_ms" in row else "naive skipped")
+        print(f"{days:4d} days {row['points']:7d} pts  vectorized {row['vectorized_ms']:7.2f} ms "
+              f"{row['vectorized_peak_mb']:6.2f} MB  {naive}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
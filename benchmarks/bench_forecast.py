@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark burn forecast latency and calibration.
+
+Simulates stove traces (fires with random start, peak, length and reloads,
+plus sensor noise) and, at many forecast origins, trains on the preceding
+selection and forecasts the next hours. It compares:
+
+* recursive: one-step model rolled forward (block=1), like the browser model
+* direct: multi-step model, one forward pass per block (auto block size)
+
+For each mode it reports fit/forecast latency, MAE, and how often the actual
+reading fell inside the 90% ensemble band (coverage; ideally ~0.90). The same
+coverage is reported for the old fixed ±15% band around the prediction.
+
+Usage:
+    python benchmarks/bench_forecast.py --trials 40 --train-hours 24
+    python benchmarks/bench_forecast.py --train-hours 8 --json results.json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from burn_prediction import INTERVAL_MS, BurnPredictor, context_vector  # noqa: E402
+
+POINTS_PER_HOUR = 12
+
+
+def simulate_trace(hours, rng):
+    """5-minute catalyst temperatures for a stove lit a few times a day."""
+    n = hours * POINTS_PER_HOUR
+    temps = np.full(n, 70.0)
+    t = int(rng.integers(0, 6 * POINTS_PER_HOUR))
+    while t < n:
+        peak = rng.uniform(650, 1100)
+        rise = int(rng.integers(3, 8))
+        burn = int(rng.uniform(3, 8) * POINTS_PER_HOUR)
+        reloads = int(rng.integers(0, 3))
+        curve = np.concatenate((
+            np.linspace(70, peak, rise),
+            peak * np.exp(-np.arange(burn) / rng.uniform(40, 90))
+        ))
+        for _ in range(reloads):
+            at = int(rng.integers(rise + 12, len(curve)))
+            boost = np.zeros(len(curve))
+            boost[at:] = (peak - curve[at]) * 0.8 * np.exp(-np.arange(len(curve) - at) / 30)
+            curve = np.maximum(curve, curve + boost)
+        curve = np.maximum(curve, 70)
+        end = min(n, t + len(curve))
+        temps[t:end] = np.maximum(temps[t:end], curve[:end - t])
+        t = end + int(rng.uniform(2, 10) * POINTS_PER_HOUR)
+    return temps + rng.normal(0, 4, n)
+
+
+def run_mode(block, trials, train_points, horizon, rng_seed):
+    rng = np.random.default_rng(rng_seed)
+    context = context_vector(25, 75, 0.6)
+    fit_ms, forecast_ms, errors, covered, covered_fixed, widths = [], [], [], [], [], []
+    for _ in range(trials):
+        trace = simulate_trace(72, rng)
+        # Forecast from an origin where the stove is burning
+        hot = np.flatnonzero(trace[train_points:-horizon] > 400) + train_points
+        origin = int(rng.choice(hot)) if len(hot) else len(trace) - horizon
+        timestamps = 1.7e12 + np.arange(len(trace)) * INTERVAL_MS
+        train = slice(origin - train_points, origin)
+
+        started = time.perf_counter()
+        model = BurnPredictor(horizon=horizon, block=block).fit(timestamps[train], trace[train], context)
+        fit_ms.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        forecast = model.forecast(trace[:origin], context, timestamps[origin], horizon)
+        forecast_ms.append((time.perf_counter() - started) * 1000)
+
+        actual = trace[origin:origin + horizon]
+        errors.append(np.abs(forecast.predictions - actual))
+        covered.append((actual >= forecast.lower) & (actual <= forecast.upper))
+        covered_fixed.append((actual >= forecast.predictions * 0.85) & (actual <= forecast.predictions * 1.15))
+        widths.append(forecast.upper - forecast.lower)
+
+    return {
+        "block_steps": model.block,
+        "fit_ms_p50": round(float(np.median(fit_ms)), 2),
+        "forecast_ms_p50": round(float(np.median(forecast_ms)), 2),
+        "mae": round(float(np.mean(errors)), 1),
+        "band_coverage": round(float(np.mean(covered)), 3),
+        "band_width_mean": round(float(np.mean(widths)), 1),
+        "fixed_15pct_coverage": round(float(np.mean(covered_fixed)), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=40)
+    parser.add_argument("--train-hours", type=float, default=24)
+    parser.add_argument("--horizon-hours", type=float, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    train_points = int(args.train_hours * POINTS_PER_HOUR)
+    horizon = int(args.horizon_hours * POINTS_PER_HOUR)
+    results = {}
+    for mode, block in (("recursive", 1), ("direct", None)):
+        results[mode] = run_mode(block, args.trials, train_points, horizon, args.seed)
+        r = results[mode]
+        print(f"{mode:>9} (block {r['block_steps']:2d}): fit {r['fit_ms_p50']:7.2f} ms  "
+              f"forecast {r['forecast_ms_p50']:6.2f} ms  MAE {r['mae']:6.1f}°F  "
+              f"90% band coverage {r['band_coverage']:.2f} (width {r['band_width_mean']:.0f}°F)  "
+              f"±15% coverage {r['fixed_15pct_coverage']:.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
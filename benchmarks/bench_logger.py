@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Measure InfluxDBLogger write throughput against the InfluxDB mock.
+
+Replays a synthetic burn cycle through fake MAX31855 channels
+(benchmarks/fake_max31855.py) and the real SensorArray, and logs every
+sample with InfluxDBLogger.log_readings as fast as it will go, once per
+mode:
+
+* ``sync``: one blocking write per sample, as the logger does by default.
+* ``batching``: INFLUXDB_BATCHING=true; samples are queued and a background
+  thread writes them in batches of INFLUXDB_BATCH_SIZE.
+
+The mock waits --influx-latency seconds per write, like a remote InfluxDB.
+Reports the per-sample cost of log_readings (p50/p99), how many samples per
+second the loop sustained, and the end-to-end rate until the mock had
+received every point. The batching queue is sized so nothing is dropped.
+
+Usage:
+    python benchmarks/bench_logger.py
+    python benchmarks/bench_logger.py --samples 5000 --influx-latency 0.05 --json results.json
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import mock_services  # noqa: E402
+from fake_max31855 import TraceHardware  # noqa: E402
+from stove_trace import burn_cycle_trace  # noqa: E402
+
+CHANNELS = "D5:catalyst,D6:flue,D13:stovetop,D19:room"
+
+
+def mock_points(port):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/mock/stats") as response:
+        return json.load(response)["points_written"]
+
+
+def run_mode(mode, args, trace, spool_dir):
+    # Imported late: the logger reads its configuration from the environment
+    from sensor_array import SensorArray
+    from streamingtemp_influxdb import InfluxDBLogger
+
+    os.environ.update(
+        INFLUXDB_URL=f"http://127.0.0.1:{args.mock_port}",
+        INFLUXDB_TOKEN="mock",
+        INFLUXDB_ORG="mock",
+        INFLUXDB_BUCKET="mock",
+        INFLUXDB_BATCHING="true" if mode == "batching" else "false",
+        INFLUXDB_SPOOL_PATH=str(Path(spool_dir) / f"{mode}.db"),
+        INFLUXDB_BATCH_SIZE=str(args.batch_size),
+        INFLUXDB_FLUSH_INTERVAL="1",
+        INFLUXDB_MAX_QUEUE=str(args.samples + 1)
+    )
+    for name in ("LOCAL_INGEST_URL", "EDGE_COMPRESSION", "EDGE_ROLLUP"):
+        os.environ.pop(name, None)
+
+    step = 0
+    # Each location replays the catalyst trace, scaled to roughly its range
+    hardware = TraceHardware(
+        {pin: trace._replace(temperatures=70 + (trace.temperatures - 70) * scale)
+         for pin, scale in (("D5", 1.0), ("D6", 0.6), ("D13", 0.45), ("D19", 0.02))},
+        clock=lambda: step * args.interval
+    )
+    sensors = SensorArray.from_config(CHANNELS, hardware=hardware)
+    influx_logger = InfluxDBLogger()
+    before = mock_points(args.mock_port)
+    expected = args.samples * len(sensors.channels)
+
+    latencies = []
+    started = time.perf_counter()
+    for step in range(args.samples):
+        timestamp = datetime.datetime.fromtimestamp(trace.timestamps[step % len(trace.timestamps)],
+                                                    datetime.timezone.utc)
+        call_started = time.perf_counter()
+        readings = {loc: temp for loc, temp in sensors.read_all().items() if temp is not None}
+        influx_logger.log_readings(readings, timestamp)
+        latencies.append(time.perf_counter() - call_started)
+    submitted = time.perf_counter() - started
+
+    deadline = time.monotonic() + args.timeout
+    while mock_points(args.mock_port) - before < expected and time.monotonic() < deadline:
+        time.sleep(0.05)
+    delivered = time.perf_counter() - started
+    received = mock_points(args.mock_port) - before
+    influx_logger.close()
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "samples": args.samples,
+        "points": expected,
+        "points_received": received,
+        "log_readings_ms_p50": round(float(np.percentile(latencies_ms, 50)), 3),
+        "log_readings_ms_p99": round(float(np.percentile(latencies_ms, 99)), 3),
+        "samples_per_s": round(args.samples / submitted, 1),
+        "delivered_points_per_s": round(received / delivered, 1),
+        "delivered_s": round(delivered, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", choices=["sync", "batching"], default=["sync", "batching"])
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between replayed samples")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--influx-latency", type=float, default=0.02, help="seconds per write at the mock")
+    parser.add_argument("--mock-port", type=int, default=8910)
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for delivery")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    trace = burn_cycle_trace(args.samples * args.interval / 3600, args.interval, seed=0)
+    mocks = mock_services.spawn(args.mock_port, influx_latency=args.influx_latency, history_hours=0)
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as spool_dir:
+            for mode in args.modes:
+                results[mode] = result = run_mode(mode, args, trace, spool_dir)
+                print(f"{mode:>9}: {result['samples_per_s']:9.1f} samples/s logged, "
+                      f"{result['delivered_points_per_s']:9.1f} points/s delivered "
+                      f"({result['points_received']}/{result['points']}), "
+                      f"log_readings p50 {result['log_readings_ms_p50']} ms p99 {result['log_readings_ms_p99']} ms")
+    finally:
+        mocks.terminate()
+        mocks.wait()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Measure hit rate and lookup time of the chat response cache.
+
+Replays a stream of questions as users phrase them: paraphrases of a few
+common questions, mixed with questions that look alike but need a different
+answer ("today" vs "yesterday", "24 hours" vs "48 hours"). Each miss is
+answered with a fake answer that takes --answer-ms and is then cached. The
+report gives the hit rate, how many first-time phrasings were still
+answered from the cache, wrong answers served (a hit whose cached question
+belongs to a different group), lookup time and latency saved.
+
+Usage:
+    python benchmarks/bench_response_cache.py
+    python benchmarks/bench_response_cache.py --similarity 0.85 --json results.json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from response_cache import ResponseCache  # noqa: E402
+
+# Each group holds phrasings of one question; different groups need different answers
+QUESTION_GROUPS = [
+    ["Is the stove hot?", "is the stove hot right now", "Is my stove hot?", "is stove hot"],
+    ["What is the stove temperature?", "what's the stove temperature", "What's the current stove temperature?",
+     "tell me the stove temperature"],
+    ["When was the last fire?", "when was my last fire", "When was the last fire?"],
+    ["When was the first fire?"],
+    ["What was the peak temperature today?", "what was the peak temperature today",
+     "What was today's peak temperature?"],
+    ["What was the peak temperature yesterday?", "what was yesterday's peak temperature"],
+    ["Show me stats for the last 24 hours", "show stats for the last 24 hours", "Stats for the last 24 hours please"],
+    ["Show me stats for the last 48 hours"],
+    ["How many fires this week?", "how many fires were there this week"],
+    ["Is the stove cold?"],
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--similarity", type=float, default=0.9)
+    parser.add_argument("--answer-ms", type=float, default=2500.0, help="latency of an uncached answer")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    cache = ResponseCache(similarity=args.similarity)
+    group_of = {q: g for g, group in enumerate(QUESTION_GROUPS) for q in group}
+    wrong = 0
+    seen = set()
+    new_phrasings = new_phrasing_hits = 0
+    lookup_ms = []
+    for _ in range(args.questions):
+        group = QUESTION_GROUPS[rng.integers(len(QUESTION_GROUPS))]
+        question = group[rng.integers(len(group))]
+        started = time.perf_counter()
+        hit = cache.get(question, fingerprint=0)
+        lookup_ms.append((time.perf_counter() - started) * 1000)
+        if question not in seen:
+            seen.add(question)
+            new_phrasings += 1
+            new_phrasing_hits += hit is not None
+        if hit is None:
+            cache.set(question, 0, f"answer to {question}", args.answer_ms)
+        elif group_of[hit["question"]] != group_of[question]:
+            wrong += 1
+
+    stats = cache.stats()
+    results = {
+        **stats,
+        "questions": args.questions,
+        "similarity": args.similarity,
+        "new_phrasings": new_phrasings,
+        "new_phrasing_hits": new_phrasing_hits,
+        "wrong_answers": wrong,
+        "lookup_ms_p50": round(float(np.percentile(lookup_ms, 50)), 4),
+        "lookup_ms_p99": round(float(np.percentile(lookup_ms, 99)), 4)
+    }
+    print(f"{args.questions} questions, similarity >= {args.similarity}")
+    print(f"  hit rate {stats['hit_rate']:.1%} ({stats['exact_hits']} exact, {stats['similar_hits']} similar), "
+          f"{wrong} wrong answers")
+    print(f"  {new_phrasing_hits}/{new_phrasings} first-time phrasings answered from the cache")
+    print(f"  lookup p50 {results['lookup_ms_p50']:.3f} ms, p99 {results['lookup_ms_p99']:.3f} ms")
+    print(f"  saved {stats['saved_ms'] / 1000:.0f} s of answer latency")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
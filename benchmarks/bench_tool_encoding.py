@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Measure prompt tokens saved by the compact tool result encoding.
+
+Builds representative results for every chat tool. It encodes each result
+with tool_encoding.encode_result and reports the tokens of the plain
+json.dumps form against the compact form. Each encoded series is decoded
+back and checked: times must match to the second and values to the rounding.
+Tokens come from tiktoken when it is installed (otherwise chars / 4).
+
+Usage:
+    python benchmarks/bench_tool_encoding.py
+    python benchmarks/bench_tool_encoding.py --budget 300 --json results.json
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import tool_encoding  # noqa: E402
+from tool_encoding import encode_result  # noqa: E402
+
+
+def history(points, step_minutes, seed=0, gaps=False):
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 1, 5, tzinfo=timezone.utc)
+    minutes = np.arange(points) * step_minutes
+    if gaps:
+        minutes = np.sort(rng.choice(np.arange(points * 3) * step_minutes, points, replace=False))
+    temps = 300 + 400 * np.abs(np.sin(minutes / 600)) + rng.normal(0, 5, points)
+    return {
+        "readings": [
+            {"temperature": round(float(v), 2), "time": (start + timedelta(minutes=int(m))).isoformat()}
+            for m, v in zip(minutes, temps)
+        ],
+        "count": points,
+        "hours": points * step_minutes // 60,
+        "aggregation_window": f"{step_minutes}m",
+        "note": f"Data aggregated in {step_minutes}m windows for efficiency"
+    }
+
+
+def sessions(count):
+    start = datetime(2025, 1, 5, 6, tzinfo=timezone.utc)
+    return {
+        "days_searched": 30,
+        "count": count,
+        "sessions": [
+            {
+                "start": (start + timedelta(hours=12 * i)).isoformat(),
+                "end": (start + timedelta(hours=12 * i + 4, minutes=17)).isoformat(),
+                "duration_minutes": 257.0,
+                "peak_temperature": 912.37 + i,
+                "reloads": i % 3,
+                "minutes_above_500F": 181.5
+            }
+            for i in range(count)
+        ]
+    }
+
+
+CASES = {
+    "current_temperature": {"temperature": 612.37, "time": "2025-01-05T14:05:12.345678+00:00", "location": "catalyst"},
+    "stats_24h": {"hours": 24, "count": 17280, "mean": 412.73, "stddev": 201.4, "min": 68.2, "max": 1103.9,
+                  "p50": 405.1, "p90": 801.25, "p95": 902.6},
+    "history_24h": history(48, 30),
+    "history_7d_lttb": history(50, 200, gaps=True),
+    "history_5m_day": history(288, 5),
+    "burn_sessions_30d": sessions(40),
+}
+
+
+def decode_series(series):
+    """Reconstruct (epoch seconds, values) from an encoded series."""
+    start = datetime.fromisoformat(series["start"].replace("Z", "+00:00")).timestamp()
+    values = next(v for k, v in series.items() if isinstance(v, list) and k != "dt_s")
+    if "interval_s" in series:
+        offsets = np.arange(len(values)) * series["interval_s"]
+    else:
+        offsets = np.concatenate(([0], np.cumsum(series.get("dt_s", []))))
+    return start + series.get("start_offset_s", 0) + offsets, np.array(values)
+
+
+def check_roundtrip(original, content):
+    """True when every reading of the original series survives the encoding."""
+    encoded = json.loads(content)
+    series = encoded.get("readings")
+    if not isinstance(series, dict) or "downsampled_from" in series:
+        return None
+    times, values = decode_series(series)
+    expected_times = [datetime.fromisoformat(r["time"]).timestamp() for r in original["readings"]]
+    expected_values = [r["temperature"] for r in original["readings"]]
+    return bool(np.allclose(times, expected_times) and np.allclose(values, expected_values, atol=0.051))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=int, default=800, help="token budget per tool result")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    tokenizer = "tiktoken" if tool_encoding.tiktoken is not None else "chars/4 estimate"
+    print(f"Token counts from {tokenizer}, budget {args.budget}")
+    results = {"tokenizer": tokenizer, "budget": args.budget, "cases": {}}
+    for name, result in CASES.items():
+        content, stats = encode_result(result, args.budget)
+        roundtrip = check_roundtrip(result, content) if "readings" in result else None
+        results["cases"][name] = {**stats, "roundtrip_ok": roundtrip}
+        saved = stats["tokens_saved"] / stats["raw_tokens"] if stats["raw_tokens"] else 0.0
+        print(f"{name:>20}: {stats['raw_tokens']:5d} -> {stats['tokens']:5d} tokens "
+              f"({saved:5.0%} saved)  round trip {'-' if roundtrip is None else roundtrip}")
+    total_raw = sum(case["raw_tokens"] for case in results["cases"].values())
+    total = sum(case["tokens"] for case in results["cases"].values())
+    print(f"{'total':>20}: {total_raw:5d} -> {total:5d} tokens ({1 - total / total_raw:5.0%} saved)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Measure the latency of each chat tool function in stove_chat_app.py.
+
+Calls the tools in-process, with the query cache disabled, against one of
+two data sources:
+
+* ``influxdb``: every tool runs its Flux query against the InfluxDB mock
+  (benchmarks/mock_services.py), which serves a week of synthetic burn
+  cycles. The time includes the HTTP round trip, CSV parsing and the tool's
+  own processing.
+* ``local``: the same week is posted to /api/ingest first, so the tools
+  answer from the local store, rollups and burn session index. The ingest
+  rate is reported too.
+
+Each source runs in its own process, since the backend picks its sources at
+import time. Reports p50/p99/mean milliseconds per tool call.
+
+Usage:
+    python benchmarks/bench_tools.py
+    python benchmarks/bench_tools.py --sources local --calls 200 --json results.json
+"""
+import argparse
+import base64
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import mock_services  # noqa: E402
+from stove_trace import burn_cycle_trace, line_protocol  # noqa: E402
+
+# (label, tool name, arguments)
+TOOL_CALLS = [
+    ("current", "get_current_temperature", {}),
+    ("history_24h", "get_temperature_history", {"hours": 24}),
+    ("history_7d", "get_temperature_history", {"hours": 168}),
+    ("stats_24h", "get_temperature_stats", {"hours": 24}),
+    ("stats_7d", "get_temperature_stats", {"hours": 168}),
+    ("last_fire", "find_last_fire", {"days_back": 7}),
+    ("burn_sessions", "get_burn_sessions", {"days_back": 7}),
+]
+
+
+def ingest(app, hours, interval, chunk=10000):
+    """Post a synthetic trace to /api/ingest; return (points, seconds)."""
+    lines = line_protocol(burn_cycle_trace(hours, interval, seed=0))
+    client = app.app.test_client()
+    headers = {"Authorization": "Basic " + base64.b64encode(b"bench:bench").decode()}
+    started = time.perf_counter()
+    for i in range(0, len(lines), chunk):
+        response = client.post("/api/ingest", data="\n".join(lines[i:i + chunk]), headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/ingest returned {response.status_code}")
+    return len(lines), time.perf_counter() - started
+
+
+def run_source(args):
+    """Benchmark the tools in this process; the environment is already set up."""
+    import stove_chat_app as app
+
+    results = {"source": args.source, "tools": {}}
+    if args.source == "local":
+        points, seconds = ingest(app, args.hours, args.interval)
+        results["ingest"] = {"points": points, "points_per_s": round(points / seconds)}
+
+    for label, name, arguments in TOOL_CALLS:
+        function = app.available_functions.get(name)
+        if function is None:
+            continue
+        result = function(**arguments)
+        if isinstance(result, dict) and result.get("error"):
+            raise RuntimeError(f"{name} failed: {result['error']}")
+        latencies = []
+        for _ in range(args.calls):
+            started = time.perf_counter()
+            function(**arguments)
+            latencies.append((time.perf_counter() - started) * 1000)
+        results["tools"][label] = {
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+            "mean_ms": round(float(np.mean(latencies)), 3)
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", nargs="+", choices=["influxdb", "local"], default=["influxdb", "local"])
+    parser.add_argument("--calls", type=int, default=50, help="timed calls per tool")
+    parser.add_argument("--hours", type=float, default=168, help="hours of synthetic data")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between ingested readings")
+    parser.add_argument("--influx-latency", type=float, default=0.0, help="seconds per query at the mock")
+    parser.add_argument("--mock-port", type=int, default=8920)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--source", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.source:
+        # Child process: benchmark one source and print its results as JSON
+        print(json.dumps(run_source(args)))
+        return
+
+    mocks = mock_services.spawn(args.mock_port, influx_latency=args.influx_latency, history_hours=args.hours)
+    results = {}
+    try:
+        for source in args.sources:
+            with tempfile.TemporaryDirectory() as data_dir:
+                env = dict(
+                    os.environ,
+                    OPENAI_API_KEY="mock",
+                    INFLUXDB_URL=f"http://127.0.0.1:{args.mock_port}",
+                    INFLUXDB_TOKEN="mock",
+                    INFLUXDB_ORG="mock",
+                    INFLUXDB_BUCKET="mock",
+                    CHAT_USERNAME="bench",
+                    CHAT_PASSWORD="bench",
+                    QUERY_CACHE_TTL="0",
+                    RESPONSE_CACHE_SIZE="0"
+                )
+                for name in ("LOCAL_STORE_PATH", "ROLLUP_DB", "BURN_SESSION_DB", "INFLUXDB_USE_ROLLUPS"):
+                    env.pop(name, None)
+                if source == "local":
+                    env.update(
+                        LOCAL_STORE_PATH=str(Path(data_dir) / "local_store.bin"),
+                        ROLLUP_DB=str(Path(data_dir) / "rollups.db"),
+                        BURN_SESSION_DB=str(Path(data_dir) / "sessions.db")
+                    )
+                output = subprocess.run(
+                    [sys.executable, __file__, "--source", source, "--calls", str(args.calls),
+                     "--hours", str(args.hours), "--interval", str(args.interval)],
+                    cwd=ROOT, env=env, check=True, stdout=subprocess.PIPE, text=True
+                ).stdout
+                results[source] = json.loads(output.strip().splitlines()[-1])
+            print(f"{source}:")
+            if "ingest" in results[source]:
+                print(f"  ingest {results[source]['ingest']['points_per_s']} points/s")
+            for label, timing in results[source]["tools"].items():
+                print(f"  {label:>14}: p50 {timing['p50_ms']:8.3f} ms  p99 {timing['p99_ms']:8.3f} ms")
+    finally:
+        mocks.terminate()
+        mocks.wait()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
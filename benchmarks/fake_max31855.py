@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the Blinka/MAX31855 hardware layer, replaying synthetic traces.
+
+``TraceHardware`` has the same ``open_sensor(pin)`` interface as
+``sensor_array.Max31855Hardware``, so a SensorArray runs unchanged:
+
+    hardware = TraceHardware({"D5": burn_cycle_trace(24)}, clock=lambda: step * 5.0)
+    sensors = SensorArray.from_config("D5:catalyst", hardware=hardware)
+
+Each sensor returns the trace reading at the clock's offset (seconds since
+replay started, looping at the end), in °C at the chip's 0.25° resolution.
+With failure_rate > 0 a read raises like the driver does when the
+thermocouple is disconnected, so the channel's retry and backoff paths run.
+"""
+import time
+
+import numpy as np
+
+
+class FakeMax31855:
+    """One thermocouple channel replaying a trace in °C."""
+
+    def __init__(self, trace, clock, failure_rate=0.0, seed=0):
+        self._temps_c = (np.asarray(trace.temperatures) - 32) * 5 / 9
+        self._interval = float(trace.timestamps[1] - trace.timestamps[0]) if len(trace.timestamps) > 1 else 1.0
+        self._clock = clock
+        self._failure_rate = failure_rate
+        self._rng = np.random.default_rng(seed)
+        self.reads = 0
+
+    @property
+    def temperature(self):
+        self.reads += 1
+        if self._failure_rate and self._rng.random() < self._failure_rate:
+            raise RuntimeError("thermocouple not connected")
+        index = int(self._clock() // self._interval) % len(self._temps_c)
+        return round(float(self._temps_c[index]) * 4) / 4
+
+
+class TraceHardware:
+    """Hardware layer whose sensors replay {pin: Trace}; pins without a trace raise."""
+
+    def __init__(self, traces, clock=None, failure_rate=0.0):
+        if clock is None:
+            started = time.monotonic()
+            clock = lambda: time.monotonic() - started  # noqa: E731
+        self.traces = traces
+        self.clock = clock
+        self.failure_rate = failure_rate
+        self.sensors = {}
+
+    def open_sensor(self, pin):
+        if pin not in self.traces:
+            raise ValueError(f"No trace for pin {pin}")
+        sensor = FakeMax31855(self.traces[pin], self.clock, self.failure_rate, seed=len(self.sensors))
+        self.sensors[pin] = sensor
+        return sensor
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Load test comparing the sync (gunicorn) and async (uvicorn) chat backends.
+
+Starts the mock OpenAI/InfluxDB services, then for each server mode launches
+the backend pointed at the mocks and fires concurrent /api/chat requests.
+Each request makes two model calls and one InfluxDB query, so throughput is
+bound by how many slow upstream calls a worker can overlap. The questions
+rotate through QUESTIONS, so the mock model asks for each tool in turn and
+the InfluxDB mock answers from its synthetic burn-cycle trace.
+
+Usage:
+    python benchmarks/load_test_chat.py --concurrency 50 --requests 500
+    python benchmarks/load_test_chat.py --modes async --json results.json
+
+Reports requests/s and p50/p99 latency per mode. The query and response
+caches are disabled so every request reaches both mocks.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+
+ROOT = Path(__file__).resolve().parent.parent
+USERNAME, PASSWORD = "bench", "bench"
+
+QUESTIONS = [
+    "How hot is the stove?",
+    "Show me the temperature history for today",
+    "What are the stats for the last day?",
+    "When was the last fire?",
+]
+
+SERVERS = {
+    "sync": ["gunicorn", "stove_chat_app:app", "--workers", "1", "--threads", "8"],
+    "gevent": ["gunicorn", "stove_chat_app:app", "--workers", "1",
+               "--worker-class", "gevent", "--worker-connections", "1000"],
+    "async": ["uvicorn", "stove_chat_asgi:application", "--workers", "1", "--log-level", "warning"],
+}
+
+
+def server_command(mode, port):
+    command = SERVERS[mode]
+    if command[0] == "gunicorn":
+        return [sys.executable, "-m"] + command + ["--bind", f"127.0.0.1:{port}"]
+    return [sys.executable, "-m"] + command + ["--host", "127.0.0.1", "--port", str(port)]
+
+
+async def wait_for_port(port, process, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(map(str, process.args))} exited with code {process.returncode}")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Nothing listening on port {port} after {timeout:.0f}s")
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+async def run_load(port, concurrency, total):
+    url = f"http://127.0.0.1:{port}/api/chat"
+    auth = aiohttp.BasicAuth(USERNAME, PASSWORD)
+    latencies, errors = [], 0
+    remaining = iter(range(total))
+
+    async def worker(session):
+        nonlocal errors
+        for i in remaining:
+            started = time.perf_counter()
+            try:
+                message = QUESTIONS[i % len(QUESTIONS)]
+                async with session.post(url, json={"message": message}, auth=auth) as resp:
+                    await resp.read()
+                    if resp.status != 200:
+                        errors += 1
+                        continue
+            except aiohttp.ClientError:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=300)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 2),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 1) if latencies else None,
+    }
+
+
+async def benchmark(args):
+    env = dict(
+        os.environ,
+        OPENAI_API_KEY="mock",
+        OPENAI_BASE_URL=f"http://127.0.0.1:{args.mock_port}/v1",
+        INFLUXDB_URL=f"http://127.0.0.1:{args.mock_port}",
+        INFLUXDB_TOKEN="mock",
+        INFLUXDB_ORG="mock",
+        INFLUXDB_BUCKET="mock",
+        CHAT_USERNAME=USERNAME,
+        CHAT_PASSWORD=PASSWORD,
+        QUERY_CACHE_TTL="0",
+        RESPONSE_CACHE_SIZE="0",
+    )
+    for name in ("LOCAL_STORE_PATH", "ROLLUP_DB", "BURN_SESSION_DB"):
+        env.pop(name, None)
+
+    mocks = subprocess.Popen(
+        [sys.executable, str(ROOT / "benchmarks" / "mock_services.py"), "--port", str(args.mock_port),
+         "--openai-latency", str(args.openai_latency), "--influx-latency", str(args.influx_latency)],
+        cwd=ROOT
+    )
+    results = {}
+    try:
+        await wait_for_port(args.mock_port, mocks)
+        for mode in args.modes:
+            server = subprocess.Popen(server_command(mode, args.port), cwd=ROOT, env=env,
+                                      stdout=subprocess.DEVNULL)
+            try:
+                await wait_for_port(args.port, server)
+                await run_load(args.port, min(args.concurrency, 4), min(args.requests, 8))  # warm up
+                results[mode] = await run_load(args.port, args.concurrency, args.requests)
+                print(f"{mode:>7}: {results[mode]['requests_per_s']:7.1f} req/s  "
+                      f"p50 {results[mode]['p50_ms']} ms  p99 {results[mode]['p99_ms']} ms  "
+                      f"errors {results[mode]['errors']}")
+            finally:
+                server.terminate()
+                server.wait()
+    finally:
+        mocks.terminate()
+        mocks.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", choices=sorted(SERVERS), default=["sync", "async"])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--mock-port", type=int, default=8900)
+    parser.add_argument("--openai-latency", type=float, default=0.5)
+    parser.add_argument("--influx-latency", type=float, default=0.1)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(benchmark(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
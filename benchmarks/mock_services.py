@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Mock OpenAI and InfluxDB endpoints for benchmarking the chat backend offline.
+
+The OpenAI mock answers /v1/chat/completions. When the last message is from
+the user it asks for the tool the question is about (history, stats, last
+fire, burn sessions, alerts, else the current temperature). Otherwise it
+returns a short answer. Responses are streamed as SSE chunks when the request sets
+``stream``, with a usage chunk when ``stream_options`` asks for one.
+
+The InfluxDB mock keeps the catalyst series in memory: a synthetic burn-cycle
+trace (benchmarks/stove_trace.py) ending at startup, plus every point
+written to /api/v2/write. /api/v2/query understands the Flux shapes the chat
+tools send: last(), a threshold filter before last(), aggregateWindow with
+mean/min/max/last, and the reduce/quantile statistics query. It answers with
+annotated CSV computed from that series, or plain CSV when the request's
+dialect asks for no annotations (as history_archive.py does). GET /mock/stats reports the writes,
+points and queries received.
+
+Both wait a configurable latency so the benchmark measures how the server
+overlaps slow upstream calls rather than how fast the mocks are.
+
+Usage:
+    python benchmarks/mock_services.py --port 8900 --openai-latency 0.5 --influx-latency 0.1
+
+Then point the chat backend or the logger at it:
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1 INFLUXDB_URL=http://127.0.0.1:8900
+"""
+import argparse
+import asyncio
+import json
+import re
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from local_store import parse_line_protocol  # noqa: E402
+from stove_trace import burn_cycle_trace  # noqa: E402
+
+ANSWER = "The catalyst is currently at 612.4°F, which is in the active burn range."
+
+# Question keywords -> (tool, arguments); the first match wins
+TOOL_KEYWORDS = [
+    (("how many fires", "burns", "sessions"), "get_burn_sessions", {"days_back": 7}),
+    (("history", "trend", "over the last", "graph"), "get_temperature_history", {"hours": 24}),
+    (("stats", "average", "peak", "percentile"), "get_temperature_stats", {"hours": 24}),
+    (("last fire", "when did", "last used"), "find_last_fire", {"days_back": 7}),
+    (("alert", "over-fire", "overfire"), "get_alerts", {"hours": 24}),
+]
+
+PRECISION_SECONDS = {"ns": 1e-9, "us": 1e-6, "ms": 1e-3, "s": 1.0}
+UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+RANGE_RELATIVE = re.compile(r"range\(start: -(\d+)([smhd])\)")
+RANGE_ABSOLUTE = re.compile(r"range\(start: (\d+), stop: (\d+)\)")
+WINDOW = re.compile(r"aggregateWindow\(every: (\d+)([smhd]), fn: (\w+)")
+THRESHOLD = re.compile(r"r\._value > ([\d.]+)")
+QUANTILE = re.compile(r'quantile\(q: ([\d.]+)[^)]*\) \|> yield\(name: "(\w+)"\)')
+
+SERIES_COLUMNS = [("result", "string"), ("table", "long"), ("_start", "dateTime:RFC3339"),
+                  ("_stop", "dateTime:RFC3339"), ("_time", "dateTime:RFC3339"), ("_value", "double"),
+                  ("_field", "string"), ("_measurement", "string"), ("location", "string")]
+SUMMARY_COLUMNS = [("result", "string"), ("table", "long"), ("count", "double"), ("sum", "double"),
+                   ("sumsq", "double"), ("min", "double"), ("max", "double")]
+VALUE_COLUMNS = [("result", "string"), ("table", "long"), ("_value", "double")]
+
+
+def pick_tool(message, tools):
+    available = {tool["function"]["name"] for tool in tools}
+    text = message.lower()
+    for keywords, name, arguments in TOOL_KEYWORDS:
+        if name in available and any(keyword in text for keyword in keywords):
+            return name, arguments
+    return "get_current_temperature", {}
+
+
+def completion_chunk(delta, finish_reason=None):
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": "mock",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+
+
+async def chat_completions(request):
+    body = await request.json()
+    await asyncio.sleep(request.app["openai_latency"])
+
+    last = body["messages"][-1]
+    wants_tool = last["role"] == "user" and body.get("tools")
+    usage = {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120}
+    if wants_tool:
+        name, arguments = pick_tool(last.get("content") or "", body["tools"])
+        tool_call = {"id": "call_mock", "type": "function",
+                     "function": {"name": name, "arguments": json.dumps(arguments)}}
+
+    if not body.get("stream"):
+        if wants_tool:
+            message = {"role": "assistant", "content": None, "tool_calls": [tool_call]}
+            finish_reason = "tool_calls"
+        else:
+            message = {"role": "assistant", "content": ANSWER}
+            finish_reason = "stop"
+        return web.json_response({
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "mock",
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": usage
+        })
+
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await response.prepare(request)
+    if wants_tool:
+        chunks = [completion_chunk({"role": "assistant", "tool_calls": [{"index": 0, **tool_call}]}),
+                  completion_chunk({}, "tool_calls")]
+    else:
+        chunks = [completion_chunk({"role": "assistant", "content": ""})]
+        chunks += [completion_chunk({"content": word + " "}) for word in ANSWER.split()]
+        chunks.append(completion_chunk({}, "stop"))
+    if (body.get("stream_options") or {}).get("include_usage"):
+        chunks.append({**completion_chunk({}), "choices": [], "usage": usage})
+    for chunk in chunks:
+        await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+    await response.write(b"data: [DONE]\n\n")
+    await response.write_eof()
+    return response
+
+
+class TraceBucket:
+    """Catalyst series the InfluxDB mock answers from: a seeded trace plus the points written to it."""
+
+    def __init__(self, history_hours=168.0, interval=30.0, seed=0):
+        if history_hours > 0:
+            trace = burn_cycle_trace(history_hours, interval, seed=seed)
+            self._ts, self._temps = trace.timestamps, trace.temperatures
+        else:
+            self._ts, self._temps = np.empty(0), np.empty(0)
+        self._written_ts, self._written_temps = [], []
+        self.writes = self.points_written = self.queries = 0
+
+    def write(self, payload, precision="ns"):
+        """Store the catalyst readings of a line protocol payload; return the number of points."""
+        points = sum(1 for line in payload.splitlines() if line.strip() and not line.startswith("#"))
+        timestamps, temperatures = parse_line_protocol(payload, tags={"location": "catalyst"})
+        scale = PRECISION_SECONDS.get(precision, 1e-9)
+        self._written_ts.extend(t * scale for t in timestamps)
+        self._written_temps.extend(temperatures)
+        self.writes += 1
+        self.points_written += points
+        return points
+
+    def series(self, start, stop):
+        """(timestamps s, temperatures) with start <= t < stop."""
+        if self._written_ts:
+            ts = np.concatenate((self._ts, self._written_ts))
+            order = np.argsort(ts, kind="stable")
+            self._ts, self._temps = ts[order], np.concatenate((self._temps, self._written_temps))[order]
+            self._written_ts, self._written_temps = [], []
+        lo, hi = np.searchsorted(self._ts, [start, stop])
+        return self._ts[lo:hi], self._temps[lo:hi]
+
+
+def rfc3339(seconds):
+    stamps = np.datetime_as_string((np.asarray(seconds) * 1e3).astype("datetime64[ms]"), unit="ms")
+    return [f"{stamp}Z" for stamp in stamps]
+
+
+def annotated_csv(name, columns, rows):
+    """One annotated CSV table block; rows are lists of values after the result and table columns."""
+    names, types = zip(*columns)
+    lines = [
+        "#datatype," + ",".join(types),
+        "#group," + ",".join("true" if n in ("_start", "_stop", "_field", "_measurement", "location") else "false"
+                             for n in names),
+        f"#default,{name}" + "," * (len(names) - 1),
+        "," + ",".join(names),
+    ]
+    lines += [f",{name},0," + ",".join(map(str, row)) for row in rows]
+    return "\r\n".join(lines) + "\r\n\r\n"
+
+
+def series_csv(timestamps, values, start, stop):
+    start_s, stop_s = rfc3339([start, stop])
+    rows = [[start_s, stop_s, stamp, float(value), "temperature", "temperature_measurement", "catalyst"]
+            for stamp, value in zip(rfc3339(timestamps), values)]
+    return annotated_csv("_result", SERIES_COLUMNS, rows)
+
+
+def window_aggregate(ts, temps, every, fn, stop):
+    """Flux aggregateWindow(createEmpty: false): one value per epoch-aligned window, stamped at its stop."""
+    if not len(ts):
+        return ts, temps
+    bins = np.floor(ts / every).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    if fn == "mean":
+        values = np.add.reduceat(temps, starts) / np.diff(np.r_[starts, len(ts)])
+    elif fn in ("min", "max"):
+        values = getattr(np, f"{fn}imum").reduceat(temps, starts)
+    else:
+        values = temps[np.r_[starts[1:], len(ts)] - 1]
+    return np.minimum((bins[starts] + 1) * every, stop), values
+
+
+def answer_query(bucket, query):
+    """Annotated CSV answering one of the chat tools' Flux queries."""
+    now = time.time()
+    if match := RANGE_ABSOLUTE.search(query):
+        start, stop = float(match[1]), float(match[2])
+    elif match := RANGE_RELATIVE.search(query):
+        start, stop = now - int(match[1]) * UNIT_SECONDS[match[2]], now
+    else:
+        start, stop = now - 3600, now
+    ts, temps = bucket.series(start, stop)
+
+    if "reduce(" in query:
+        blocks = [annotated_csv("summary", SUMMARY_COLUMNS, [[
+            float(len(temps)), float(temps.sum()), float((temps * temps).sum()),
+            float(temps.min()) if len(temps) else 0.0, float(temps.max()) if len(temps) else 0.0
+        ]])]
+        for q, name in QUANTILE.findall(query):
+            if len(temps):
+                blocks.append(annotated_csv(name, VALUE_COLUMNS, [[float(np.quantile(temps, float(q)))]]))
+        for name in ("min", "max"):
+            if f'yield(name: "{name}")' in query and len(temps):
+                blocks.append(annotated_csv(name, VALUE_COLUMNS, [[float(getattr(temps, name)())]]))
+        return "".join(blocks)
+
+    if match := THRESHOLD.search(query):
+        above = np.flatnonzero(temps > float(match[1]))
+        ts, temps = ts[above], temps[above]
+    if match := WINDOW.search(query):
+        ts, temps = window_aggregate(ts, temps, int(match[1]) * UNIT_SECONDS[match[2]], match[3], stop)
+    elif "last()" in query:
+        ts, temps = ts[-1:], temps[-1:]
+    return series_csv(ts, temps, start, stop)
+
+
+async def influx_query(request):
+    body = await request.read()
+    await asyncio.sleep(request.app["influx_latency"])
+    bucket = request.app["bucket"]
+    bucket.queries += 1
+    try:
+        request_body = json.loads(body)
+        query = request_body["query"]
+    except (ValueError, KeyError):
+        request_body, query = {}, body.decode()
+    text = answer_query(bucket, query)
+    dialect = request_body.get("dialect")
+    if dialect is not None and not dialect.get("annotations"):
+        text = "".join(line for line in text.splitlines(keepends=True) if not line.startswith("#"))
+    return web.Response(text=text, content_type="text/csv")
+
+
+async def influx_write(request):
+    payload = await request.text()
+    await asyncio.sleep(request.app["influx_latency"])
+    request.app["bucket"].write(payload, request.query.get("precision", "ns"))
+    return web.Response(status=204)
+
+
+async def mock_stats(request):
+    bucket = request.app["bucket"]
+    return web.json_response({"writes": bucket.writes, "points_written": bucket.points_written,
+                              "queries": bucket.queries})
+
+
+def make_app(openai_latency, influx_latency, history_hours=168.0, seed=0, history_interval=30.0):
+    app = web.Application(client_max_size=64 * 1024 ** 2)
+    app["openai_latency"] = openai_latency
+    app["influx_latency"] = influx_latency
+    app["bucket"] = TraceBucket(history_hours, history_interval, seed=seed)
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_post("/api/v2/query", influx_query)
+    app.router.add_post("/api/v2/write", influx_write)
+    app.router.add_get("/mock/stats", mock_stats)
+    return app
+
+
+def spawn(port, openai_latency=0.0, influx_latency=0.0, history_hours=168.0, timeout=30.0,
+          history_interval=30.0):
+    """Run the mocks in a subprocess; returns the Popen once the port accepts connections."""
+    process = subprocess.Popen(
+        [sys.executable, __file__, "--port", str(port), "--openai-latency", str(openai_latency),
+         "--influx-latency", str(influx_latency), "--history-hours", str(history_hours),
+         "--history-interval", str(history_interval)]
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Mock services exited with code {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Mock services not listening on port {port} after {timeout:.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--openai-latency", type=float, default=0.5, help="seconds per completion")
+    parser.add_argument("--influx-latency", type=float, default=0.1, help="seconds per query or write")
+    parser.add_argument("--history-hours", type=float, default=168, help="hours of synthetic trace to serve")
+    parser.add_argument("--history-interval", type=float, default=30, help="seconds between trace samples")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    web.run_app(make_app(args.openai_latency, args.influx_latency, args.history_hours, args.seed,
+                         args.history_interval),
+                host="127.0.0.1", port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Run the benchmark suite and save or compare its results.
+
+Runs each benchmark script with --json, then merges their results into one
+file stamped with the git commit, date and Python version. Every script
+generates its data from a fixed seed, so two runs on the same machine differ
+only by the code between them.
+
+Usage:
+    python benchmarks/run_suite.py --out results-$(git rev-parse --short HEAD).json
+    python benchmarks/run_suite.py --only logger tools --baseline results-abc1234.json
+    python benchmarks/run_suite.py --compare results-abc1234.json results-def5678.json
+
+--baseline (or --compare) prints every numeric result that changed by more
+than --threshold percent, marked as a regression or an improvement. Lower is
+better for times (a ms, us or s word, as in p99_ms, but not rates such as
+requests_per_s), errors, misses, tokens and bytes. Higher is better for
+everything else, including anything "saved".
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# name -> arguments; chat runs shortened so the whole suite takes a few minutes
+BENCHMARKS = {
+    "logger": ["bench_logger.py"],
+    "tools": ["bench_tools.py"],
+    "chat": ["load_test_chat.py", "--concurrency", "20", "--requests", "200"],
+    "alerts": ["bench_alerts.py"],
+    "archive": ["bench_archive.py"],
+    "auth": ["bench_auth.py"],
+    "response_cache": ["bench_response_cache.py"],
+    "tool_encoding": ["bench_tool_encoding.py"],
+    "downsample": ["bench_downsample.py"],
+    "features": ["bench_features.py", "--days", "30", "90"],
+    "forecast": ["bench_forecast.py"],
+}
+
+LOWER_IS_BETTER = {"ms", "us", "s", "errors", "wrong", "misses", "dropped", "tokens", "bytes"}
+
+
+def git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names):
+    results = {}
+    with tempfile.TemporaryDirectory() as out_dir:
+        for name in names:
+            script, *arguments = BENCHMARKS[name]
+            out = Path(out_dir) / f"{name}.json"
+            print(f"== {name}", flush=True)
+            started = time.perf_counter()
+            process = subprocess.run([sys.executable, str(ROOT / "benchmarks" / script), *arguments,
+                                      "--json", str(out)], cwd=ROOT)
+            if process.returncode != 0 or not out.exists():
+                print(f"!! {name} failed with exit code {process.returncode}")
+                continue
+            results[name] = {"wall_s": round(time.perf_counter() - started, 1),
+                             "output": json.loads(out.read_text())}
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results
+    }
+
+
+def lower_is_better(key):
+    words = key.rsplit(".", 1)[-1].lower().split("_")
+    if "saved" in words or (words[-1] == "s" and "per" in words):
+        return False
+    return bool(LOWER_IS_BETTER.intersection(words))
+
+
+def flatten(value, prefix=""):
+    """{"a": {"b": [1]}} -> {"a.b.0": 1}, keeping numeric leaves outside the config."""
+    if isinstance(value, (dict, list)):
+        items = {}
+        for key, child in value.items() if isinstance(value, dict) else enumerate(value):
+            if key != "config":
+                items.update(flatten(child, f"{prefix}.{key}" if prefix else str(key)))
+        return items
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    return {}
+
+
+def compare(baseline, current, threshold):
+    """Print results that changed by more than threshold percent; return the number of regressions."""
+    print(f"baseline {(baseline.get('commit') or '?')[:10]}  vs  current {(current.get('commit') or '?')[:10]}")
+    before, after = flatten(baseline["results"]), flatten(current["results"])
+    regressions = 0
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        if old == new or key.endswith("wall_s"):
+            continue
+        change = (new - old) / abs(old) * 100 if old else float("inf")
+        if abs(change) < threshold:
+            continue
+        worse = (change > 0) == lower_is_better(key)
+        regressions += worse
+        print(f"  {'REGRESSION ' if worse else 'improvement'} {key}: {old} -> {new} ({change:+.1f}%)")
+    for key in sorted(before.keys() - after.keys()):
+        print(f"  missing     {key}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmarks to run (default: all)")
+    parser.add_argument("--out", help="write the merged results to this file")
+    parser.add_argument("--baseline", help="compare the new results with this results file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="compare two results files")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change worth reporting")
+    args = parser.parse_args()
+
+    if args.compare:
+        baseline, current = (json.loads(Path(path).read_text()) for path in args.compare)
+        sys.exit(1 if compare(baseline, current, args.threshold) else 0)
+
+    current = run(args.only or list(BENCHMARKS))
+    if args.out:
+        Path(args.out).write_text(json.dumps(current, indent=2))
+        print(f"Results written to {args.out}")
+    if args.baseline:
+        sys.exit(1 if compare(json.loads(Path(args.baseline).read_text()), current, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
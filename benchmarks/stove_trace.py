@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic catalyst traces for benchmarks and offline testing.
+
+``burn_cycle_trace`` lays out a schedule of fires and renders it at any
+sample interval. Each fire goes through ignition (a fast climb from
+ambient), an active plateau with a slow wobble, up to two reloads (burned
+down to coals, then an overshoot as the new load catches), coaling (a slow
+decay to a few hundred °F) and cooling back to ambient.
+The catalyst follows each phase's target as a first-order lag. Within a
+phase the response has a closed form, so rendering is vectorized and does
+not depend on the sample rate. Sensor noise is added on top. The same seed
+always gives the same trace.
+
+Usage:
+    python benchmarks/stove_trace.py --hours 48 --interval 5 > trace.csv
+    python benchmarks/stove_trace.py --hours 24 --line-protocol > trace.lp
+
+``--line-protocol`` prints points as the logger writes them, ready for
+/api/ingest or an InfluxDB bucket.
+"""
+import argparse
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+Trace = namedtuple("Trace", ["timestamps", "temperatures", "events"])
+
+AMBIENT_F = 70.0
+
+
+def _fire_phases(rng, ambient):
+    """(name, duration s, target °F, time constant s) phases of one fire."""
+    plateau = rng.uniform(950, 1300)
+    phases = [("ignition", rng.uniform(20, 40) * 60, plateau + rng.uniform(50, 150), 12 * 60),
+              ("active", rng.uniform(1.5, 3.0) * 3600, plateau, 20 * 60)]
+    for _ in range(int(rng.integers(0, 3))):
+        # Burned down to coals, then a new load catches and overshoots the plateau
+        phases.append(("coaling", rng.uniform(45, 75) * 60, rng.uniform(300, 400), 15 * 60))
+        phases.append(("reload", rng.uniform(15, 25) * 60, plateau + rng.uniform(100, 200), 8 * 60))
+        phases.append(("active", rng.uniform(1.0, 2.0) * 3600, plateau, 20 * 60))
+    phases.append(("coaling", rng.uniform(1.0, 2.0) * 3600, rng.uniform(300, 450), 40 * 60))
+    phases.append(("cooling", rng.uniform(1.0, 3.0) * 3600, ambient, 120 * 60))
+    return phases
+
+
+def burn_cycle_trace(hours=24.0, interval=5.0, fires_per_day=2.0, seed=0, start=None,
+                     ambient=AMBIENT_F, noise=2.0):
+    """Return Trace(timestamps s, temperatures °F, events) covering hours at interval seconds.
+
+    Fires start about every 24 / fires_per_day hours, shifted randomly by up to
+    a third of that period. events lists {"time", "kind"} for every phase
+    change ("ignition", "reload", "coaling", ...), for checking detectors
+    against the ground truth. start defaults to hours before now.
+    """
+    rng = np.random.default_rng(seed)
+    if start is None:
+        start = time.time() - hours * 3600
+    duration = hours * 3600
+    timestamps = start + np.arange(int(duration // interval)) * interval
+    offsets = timestamps - start
+
+    # Lay out (start offset, target, time constant) segments until the end
+    segments = [(0.0, ambient, 120 * 60, None)]
+    events = []
+    period = 24 * 3600 / fires_per_day if fires_per_day > 0 else float("inf")
+    cursor, fire = 0.0, 0
+    while fire * period < duration:
+        planned = fire * period + rng.uniform(0.1, 0.35) * period
+        fire += 1
+        if planned < cursor:
+            continue
+        cursor = planned
+        for name, length, target, tau in _fire_phases(rng, ambient):
+            if cursor >= duration:
+                break
+            segments.append((cursor, target, tau, name))
+            if name != "active":
+                events.append({"time": float(start + cursor), "kind": name})
+            cursor += length
+        # Idle at ambient until the next fire
+        segments.append((cursor, ambient, 120 * 60, None))
+
+    temps = np.empty(len(offsets))
+    level = ambient
+    bounds = [s[0] for s in segments[1:]] + [duration]
+    for (seg_start, target, tau, name), seg_end in zip(segments, bounds):
+        if seg_start >= duration:
+            break
+        lo, hi = np.searchsorted(offsets, [seg_start, seg_end])
+        elapsed = offsets[lo:hi] - seg_start
+        temps[lo:hi] = target + (level - target) * np.exp(-elapsed / tau)
+        level = target + (level - target) * np.exp(-(seg_end - seg_start) / tau)
+        if name == "active":
+            # Slow wobble as the wood burns down and the draft changes
+            temps[lo:hi] += 30 * np.sin(2 * np.pi * elapsed / 2400 + rng.uniform(0, 2 * np.pi))
+
+    temps += rng.normal(0.0, noise, len(temps))
+    return Trace(timestamps, np.maximum(temps, ambient - 10), events)
+
+
+def line_protocol(trace, location="catalyst"):
+    """Lines in the logger's temperature_measurement format, nanosecond timestamps."""
+    return [
+        f"temperature_measurement,location={location},sensor=k-type-thermocouple temperature={temp:.2f} {int(ts * 1e9)}"
+        for ts, temp in zip(trace.timestamps, trace.temperatures)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--interval", type=float, default=5, help="seconds between samples")
+    parser.add_argument("--fires-per-day", type=float, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--line-protocol", action="store_true", help="print line protocol instead of CSV")
+    args = parser.parse_args()
+
+    trace = burn_cycle_trace(args.hours, args.interval, args.fires_per_day, args.seed)
+    if args.line_protocol:
+        sys.stdout.write("\n".join(line_protocol(trace)) + "\n")
+        return
+    print("timestamp,temperature")
+    for ts, temp in zip(trace.timestamps, trace.temperatures):
+        print(f"{ts:.3f},{temp:.2f}")
+    for event in trace.events:
+        print(f"# {event['time']:.0f} {event['kind']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Server-side burn prediction.
+
+Uses the same inputs as the browser model in src/predictionModel.js: per
+5-minute point the normalized temperature, rate of change and 3-point rolling
+average, plus a context vector of outdoor temperature, firebox fill level,
+wood BTU and hour of day. Features live in one contiguous float32 array, and
+training windows are zero-copy strided views over it, so months of 5-minute
+data window in milliseconds without extra memory. The model is a ridge
+regression over the flattened window and context. It trains in milliseconds
+on the CPU, so there is nothing to checkpoint, and a whole forecast is one
+call.
+
+Temperatures are scaled by 800°F like the browser model, but not clipped at
+1.0, so catalyst readings above 800°F stay distinguishable.
+
+Outdoor temperature, fill level and BTU are constant within one training
+selection, so the model cannot learn their effect from it. Features are
+centered before fitting, which gives those columns zero weight instead of an
+arbitrary one. Hour of day varies across the selection and is learned.
+"""
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+SEQUENCE_LENGTH = 60           # 5 hours of 5-minute points
+INTERVAL_MS = 5 * 60 * 1000    # spacing of input and predicted points
+TEMP_SCALE = 800.0
+RATE_SCALE = 100.0
+ROLLING_POINTS = 3
+
+
+def engineer_features(temperatures, dtype=np.float32) -> np.ndarray:
+    """Contiguous (..., n, 3) array of normalized temp, rate of change and rolling average, as engineerFeatures.
+
+    Works along the last axis, so a (paths, n) batch of series gives (paths, n, 3).
+    """
+    temps = np.asarray(temperatures, dtype=np.float64)
+    n = temps.shape[-1]
+    features = np.empty(temps.shape + (3,), dtype=dtype)
+    if n == 0:
+        return features
+    features[..., 0] = np.maximum(temps, 0) / TEMP_SCALE
+    features[..., 0, 1] = 0.0
+    features[..., 1:, 1] = np.diff(temps, axis=-1) / RATE_SCALE
+    # Rolling mean from cumulative sums (accumulated in float64); the first
+    # points average what is available
+    sums = np.cumsum(temps, axis=-1)
+    sums[..., ROLLING_POINTS:] -= sums[..., :-ROLLING_POINTS].copy()
+    sums /= np.minimum(np.arange(1, n + 1), ROLLING_POINTS)
+    features[..., 2] = np.maximum(sums, 0) / TEMP_SCALE
+    return features
+
+
+def window_view(features: np.ndarray, sequence_length: int = SEQUENCE_LENGTH) -> np.ndarray:
+    """Read-only (samples, sequence_length, 3) view of every window; no data is copied."""
+    features = np.ascontiguousarray(features)
+    samples = len(features) - sequence_length + 1
+    if samples < 1:
+        return np.empty((0, sequence_length, features.shape[1]), dtype=features.dtype)
+    row, column = features.strides
+    return np.lib.stride_tricks.as_strided(
+        features, shape=(samples, sequence_length, features.shape[1]),
+        strides=(row, row, column), writeable=False
+    )
+
+
+def hour_fraction(timestamps_ms, utc_offset_minutes: float = 0.0) -> np.ndarray:
+    """Local hour of day scaled to [0, 1), as the browser model's hour input."""
+    seconds = np.asarray(timestamps_ms, dtype=np.float64) / 1000 + utc_offset_minutes * 60
+    return np.floor((seconds % 86400) / 3600) / 24
+
+
+def context_vector(outdoor_temp: float, fill_level: float, wood_btu: float) -> np.ndarray:
+    """Outdoor temp, fill level and wood BTU normalized like generatePrediction."""
+    return np.array([
+        min(1.0, max(0.0, (outdoor_temp + 20) / 120)),
+        fill_level / 100,
+        wood_btu
+    ])
+
+
+def training_windows(features: np.ndarray, sequence_length: int = SEQUENCE_LENGTH, horizon: int = 1):
+    """Strided (windows, sequence_length * 3) inputs and (windows, horizon) targets.
+
+    Window i covers points i .. i+L-1 and its targets are the normalized
+    temperatures at i+L .. i+L+horizon-1. With horizon=1 this matches
+    prepareTrainingData.
+    """
+    count = len(features) - sequence_length - horizon
+    if count < 1:
+        raise ValueError(f"Need at least {sequence_length + horizon + 1} data points for training")
+    # Rows are contiguous, so each window is also one flat run of L * 3 values
+    windows = window_view(features, sequence_length)[:count]
+    inputs = np.lib.stride_tricks.as_strided(
+        windows, shape=(count, sequence_length * features.shape[1]),
+        strides=(windows.strides[0], windows.strides[2]), writeable=False
+    )
+    temps = features[sequence_length:, 0]
+    targets = np.lib.stride_tricks.as_strided(
+        temps, shape=(count, horizon), strides=(temps.strides[0], temps.strides[0]), writeable=False
+    )
+    return inputs, targets
+
+
+def ridge_batch(X: np.ndarray, Y: np.ndarray, counts: np.ndarray, ridge: float) -> np.ndarray:
+    """Solve one weighted ridge regression per row of counts in a single batched call.
+
+    X is (n, d) and Y is (n, h), both centered; counts is (k, n) sample weights
+    (bootstrap resample counts). Returns (k, d, h) weights. Uses the n x n dual
+    system when there are fewer windows than inputs.
+    """
+    n, d = X.shape
+    if n >= d:
+        # Weighted Gram matrices one member at a time keeps memory at d x d
+        gram = np.stack([(X.T * c) @ X for c in counts]) + ridge * np.eye(d)
+        return np.linalg.solve(gram, np.stack([(X.T * c) @ Y for c in counts]))
+    # (X'CX + rI)^-1 X'C = X'C (XX'C + rI)^-1
+    gram = (X @ X.T)[None, :, :] * counts[:, None, :] + ridge * np.eye(n)
+    alpha = np.linalg.solve(gram, np.broadcast_to(Y, (len(counts), n, Y.shape[1])))
+    return X.T @ (counts[:, :, None] * alpha)
+
+
+class Forecast(NamedTuple):
+    predictions: np.ndarray   # °F per step from the model fitted on all windows
+    lower: np.ndarray         # band quantiles over the sampled paths
+    upper: np.ndarray
+
+
+class BurnPredictor:
+    """Multi-output ridge regression from a feature window plus context to the next steps.
+
+    Each window predicts a block of up to ``horizon`` steps at once. When the
+    training selection is long enough the whole horizon is one forward pass;
+    otherwise blocks are fed back until the horizon is covered (block=1 is the
+    browser model's one-step rollout). Uncertainty comes from a bootstrap
+    ensemble of ``ensemble`` members, all solved in one batched call. Each
+    member's path also carries out-of-bag residual noise, and the bands are
+    quantiles over those paths.
+    """
+
+    def __init__(self, sequence_length: int = SEQUENCE_LENGTH, horizon: int = 96,
+                 block: Optional[int] = None, ridge: float = 1.0, ensemble: int = 50,
+                 min_windows: int = 12, seed: int = 0):
+        self.sequence_length = sequence_length
+        self.horizon = horizon
+        self.block = block
+        self.ridge = ridge
+        self.ensemble = ensemble
+        self.min_windows = min_windows
+        self.seed = seed
+        self.weights: Optional[np.ndarray] = None   # (1 + ensemble, d, block)
+        self.mean_x: Optional[np.ndarray] = None
+        self.mean_y: Optional[np.ndarray] = None
+        self.noise: Optional[np.ndarray] = None     # residual std per block step
+        self.training_windows = 0
+        self.rmse: Optional[float] = None
+
+    def _design(self, inputs: np.ndarray, context: np.ndarray, hours: np.ndarray) -> np.ndarray:
+        rows = len(inputs)
+        return np.hstack((inputs, np.broadcast_to(context, (rows, len(context))), hours.reshape(rows, 1)))
+
+    def fit(self, timestamps_ms, temperatures, context: np.ndarray,
+            utc_offset_minutes: float = 0.0) -> "BurnPredictor":
+        """Train on one selection of evenly spaced readings."""
+        features = engineer_features(temperatures)
+        L = self.sequence_length
+        if self.block is None:
+            # Longest block that still leaves min_windows training windows
+            self.block = int(np.clip(len(features) - L - self.min_windows, 1, self.horizon))
+        inputs, targets = training_windows(features, L, self.block)
+        count = len(targets)
+        target_ms = np.asarray(timestamps_ms, dtype=np.float64)[L:L + count]
+        X = self._design(inputs, context, hour_fraction(target_ms, utc_offset_minutes))
+
+        self.mean_x, self.mean_y = X.mean(axis=0), targets.mean(axis=0)
+        Xc, Yc = X - self.mean_x, targets - self.mean_y
+        rng = np.random.default_rng(self.seed)
+        counts = np.vstack((
+            np.ones(count),
+            rng.multinomial(count, np.full(count, 1 / count), size=self.ensemble)
+        ))
+        self.weights = ridge_batch(Xc, Yc, counts, self.ridge)
+        self.training_windows = count
+
+        residuals = Xc @ self.weights[0] - Yc
+        self.rmse = float(np.sqrt(np.mean(residuals ** 2)) * TEMP_SCALE)
+        # Out-of-bag residuals estimate each step's error on unseen windows
+        squares, oob = np.zeros(self.block), 0
+        for c, weights in zip(counts[1:], self.weights[1:]):
+            unseen = c == 0
+            squares += (((Xc[unseen] @ weights) - Yc[unseen]) ** 2).sum(axis=0)
+            oob += unseen.sum()
+        self.noise = np.sqrt(squares / oob) if oob > 1 else residuals.std(axis=0)
+        return self
+
+    def forecast(self, recent_temperatures, context: np.ndarray, start_ms: float,
+                 steps: int, utc_offset_minutes: float = 0.0, interval: float = 0.9) -> Forecast:
+        """Predict `steps` points (°F) after the recent readings with a central `interval` band."""
+        if self.weights is None:
+            raise ValueError("Model has not been trained")
+        L = self.sequence_length
+        recent = np.asarray(recent_temperatures, dtype=np.float64)[-(L + ROLLING_POINTS):]
+        if len(recent) < L:
+            raise ValueError(f"Need at least {L} recent data points")
+
+        # Path 0 is the full-data model; the rest are ensemble members with noise
+        paths = len(self.weights)
+        history = np.tile(recent, (paths, 1))
+        rng = np.random.default_rng(self.seed + 1)
+        blocks = -(-steps // self.block)
+        out = np.empty((paths, blocks * self.block))
+        n_inputs = L * 3
+        for b in range(blocks):
+            windows = engineer_features(history)[:, -L:, :].reshape(paths, n_inputs)
+            first_ms = start_ms + b * self.block * INTERVAL_MS
+            hour = hour_fraction(first_ms, utc_offset_minutes)
+            X = np.hstack((windows, np.broadcast_to(context, (paths, len(context))), np.full((paths, 1), hour)))
+            values = np.einsum('kd,kdh->kh', X - self.mean_x, self.weights) + self.mean_y
+            values[1:] += rng.normal(0.0, 1.0, values[1:].shape) * self.noise
+            values = np.maximum(values, 0.0) * TEMP_SCALE
+            out[:, b * self.block:(b + 1) * self.block] = values
+            history = np.hstack((history, values))[:, -(L + ROLLING_POINTS):]
+
+        out = out[:, :steps]
+        tail = (1 - interval) / 2
+        lower, upper = np.quantile(out[1:], [tail, 1 - tail], axis=0)
+        return Forecast(out[0], np.minimum(lower, out[0]), np.maximum(upper, out[0]))
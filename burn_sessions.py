@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Incremental burn-session detection for the catalyst temperature.
+
+A hysteresis state machine follows each fire through its phases:
+
+* ``out``: cold stove. Crossing ``ignition_f`` opens a session.
+* ``ignition``: warming up. Crossing ``active_f`` makes it an active burn.
+* ``active``: the catalyst is lit. Dropping below ``coaling_f`` means coaling.
+* ``coaling``: burning down. A rise of ``reload_rise`` above the coaling low
+  counts as a reload. Crossing ``active_f`` again without one is just the
+  fire recovering.
+* ``reload``: fresh wood is catching. Crossing ``active_f`` returns to active.
+
+Any phase closes the session once the temperature has stayed below ``out_f``
+for ``out_hold`` seconds, or when no readings arrive for ``max_gap`` seconds.
+The session ends when the temperature first dropped below ``out_f``.
+Sessions that never reached ``active`` are false starts and are not recorded.
+
+Closed sessions go into an indexed SQLite table, so "last fire", "fires this
+week" and "average burn length" are index lookups instead of scans over raw
+readings. The detector's in-progress state is stored alongside, which lets
+several worker processes feed it in turn and lets restarts resume mid-fire.
+"""
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Seconds spent above each of these temperatures (°F) is tracked per session
+ABOVE_THRESHOLDS = (400, 500, 1000)
+
+OUT, IGNITION, ACTIVE, COALING, RELOAD = "out", "ignition", "active", "coaling", "reload"
+
+
+class BurnSessionDetector:
+    """Hysteresis state machine turning temperature readings into burn sessions."""
+
+    def __init__(self, ignition_f: float = 250.0, active_f: float = 500.0, coaling_f: float = 450.0,
+                 out_f: float = 200.0, reload_rise: float = 100.0, out_hold: float = 900.0,
+                 max_gap: float = 3600.0):
+        self.ignition_f = ignition_f
+        self.active_f = active_f
+        self.coaling_f = coaling_f
+        self.out_f = out_f
+        self.reload_rise = reload_rise
+        self.out_hold = out_hold
+        self.max_gap = max_gap
+
+        self.state = OUT
+        self.last_time: Optional[float] = None
+        self.last_temp: Optional[float] = None
+        self.session: Optional[dict] = None
+        self.coal_low: Optional[float] = None
+        self.below_since: Optional[float] = None
+        self.false_starts = 0
+
+    def update(self, t: float, temp: float) -> List[dict]:
+        """Feed one reading (epoch seconds, °F) and return any sessions it closes."""
+        if self.last_time is not None and t <= self.last_time:
+            return []
+
+        closed = []
+        if self.session is not None and t - self.last_time > self.max_gap:
+            closed.extend(self._close(self.last_time))
+
+        if self.session is not None:
+            dt = t - self.last_time
+            for threshold in ABOVE_THRESHOLDS:
+                if self.last_temp > threshold:
+                    self.session["above"][str(threshold)] += dt
+            if temp > self.session["peak"]:
+                self.session["peak"], self.session["peak_time"] = temp, t
+
+        self.last_time, self.last_temp = t, temp
+
+        if self.state == OUT:
+            if temp >= self.ignition_f:
+                self.session = {
+                    "start": t, "peak": temp, "peak_time": t, "reloads": 0, "active": False,
+                    "above": {str(threshold): 0.0 for threshold in ABOVE_THRESHOLDS}
+                }
+                self.below_since = None
+                self.state = IGNITION
+                self._advance(temp)
+            return closed
+
+        if temp < self.out_f:
+            if self.below_since is None:
+                self.below_since = t
+            if t - self.below_since >= self.out_hold:
+                closed.extend(self._close(self.below_since))
+            return closed
+        self.below_since = None
+        self._advance(temp)
+        return closed
+
+    def _advance(self, temp: float):
+        if self.state in (IGNITION, RELOAD) and temp >= self.active_f:
+            self.state = ACTIVE
+            self.session["active"] = True
+        elif self.state == ACTIVE and temp < self.coaling_f:
+            self.state = COALING
+            self.coal_low = temp
+        elif self.state == COALING:
+            self.coal_low = min(self.coal_low, temp)
+            if temp >= self.coal_low + self.reload_rise:
+                self.state = RELOAD
+                self.session["reloads"] += 1
+            elif temp >= self.active_f:
+                self.state = ACTIVE
+        elif self.state == RELOAD and temp < self.coal_low:
+            # The new load never caught; back to burning down
+            self.state = COALING
+            self.coal_low = temp
+
+    def _close(self, end: float) -> List[dict]:
+        session, self.session = self.session, None
+        self.state = OUT
+        self.coal_low = self.below_since = None
+        if not session["active"]:
+            self.false_starts += 1
+            return []
+        return [{
+            "start": session["start"],
+            "end": end,
+            "duration": end - session["start"],
+            "peak": session["peak"],
+            "peak_time": session["peak_time"],
+            "reloads": session["reloads"],
+            **{f"above_{threshold}": session["above"][str(threshold)] for threshold in ABOVE_THRESHOLDS}
+        }]
+
+    def expire(self, now: float) -> List[dict]:
+        """Close the session in progress if no reading has arrived for max_gap seconds."""
+        if self.session is not None and now - self.last_time > self.max_gap:
+            return self._close(self.last_time)
+        return []
+
+    def current(self) -> Optional[dict]:
+        """The session in progress, or None when the stove is out."""
+        if self.session is None:
+            return None
+        return {
+            "state": self.state,
+            "start": self.session["start"],
+            "duration": self.last_time - self.session["start"],
+            "peak": self.session["peak"],
+            "reloads": self.session["reloads"],
+            "temperature": self.last_temp
+        }
+
+    def get_state(self) -> dict:
+        """Serializable snapshot of the in-progress state."""
+        return {
+            "state": self.state, "last_time": self.last_time, "last_temp": self.last_temp,
+            "session": self.session, "coal_low": self.coal_low, "below_since": self.below_since,
+            "false_starts": self.false_starts
+        }
+
+    def set_state(self, snapshot: dict):
+        """Restore a snapshot taken with get_state."""
+        for key, value in snapshot.items():
+            setattr(self, key, value)
+
+
+class BurnSessionIndex:
+    """SQLite table of closed burn sessions plus the detector's saved state.
+
+    ``ingest`` runs the detector inside a write transaction, so readings
+    posted to different gunicorn workers are applied one batch at a time.
+    """
+
+    def __init__(self, path: str, detector_factory=BurnSessionDetector):
+        self.path = path
+        self.detector_factory = detector_factory
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        above_columns = "".join(f" above_{threshold} REAL NOT NULL," for threshold in ABOVE_THRESHOLDS)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS burn_sessions ("
+            " start REAL PRIMARY KEY,"
+            " end REAL NOT NULL,"
+            " duration REAL NOT NULL,"
+            " peak REAL NOT NULL,"
+            " peak_time REAL NOT NULL,"
+            f"{above_columns}"
+            " reloads INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS burn_sessions_end ON burn_sessions (end)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS detector_state (id INTEGER PRIMARY KEY CHECK (id = 0), state TEXT NOT NULL)"
+        )
+
+    def _load_detector(self) -> BurnSessionDetector:
+        detector = self.detector_factory()
+        row = self._conn.execute("SELECT state FROM detector_state WHERE id = 0").fetchone()
+        if row:
+            detector.set_state(json.loads(row["state"]))
+        return detector
+
+    def has_state(self) -> bool:
+        """True once any reading has been ingested."""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM detector_state WHERE id = 0").fetchone() is not None
+
+    def ingest(self, timestamps, temperatures) -> List[dict]:
+        """Feed readings (epoch seconds, °F) in time order; returns the sessions closed."""
+        def feed(detector):
+            closed = []
+            for t, temp in zip(timestamps, temperatures):
+                closed.extend(detector.update(float(t), float(temp)))
+            return closed
+        with self._lock:
+            return self._apply(feed)
+
+    def _apply(self, step) -> List[dict]:
+        """Run step(detector) in a write transaction and store what it closes."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            detector = self._load_detector()
+            closed = step(detector)
+            columns = list(closed[0]) if closed else []
+            for session in closed:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO burn_sessions ({', '.join(columns)})"
+                    f" VALUES ({', '.join('?' for _ in columns)})",
+                    [session[column] for column in columns]
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO detector_state (id, state) VALUES (0, ?)",
+                (json.dumps(detector.get_state()),)
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return closed
+
+    def _expire_stale(self, now: float) -> BurnSessionDetector:
+        """Close a session whose readings stopped arriving; returns the current detector."""
+        detector = self._load_detector()
+        if detector.expire(now):
+            self._apply(lambda d: d.expire(now))
+            detector = self._load_detector()
+        return detector
+
+    def current(self) -> Optional[dict]:
+        """The session in progress, or None when the stove is out."""
+        with self._lock:
+            return self._expire_stale(time.time()).current()
+
+    def last(self) -> Optional[dict]:
+        """The most recently closed session."""
+        with self._lock:
+            self._expire_stale(time.time())
+            row = self._conn.execute("SELECT * FROM burn_sessions ORDER BY start DESC LIMIT 1").fetchone()
+        return dict(row) if row else None
+
+    def since(self, start: float) -> List[dict]:
+        """Closed sessions that ended at or after start, oldest first."""
+        with self._lock:
+            self._expire_stale(time.time())
+            rows = self._conn.execute(
+                "SELECT * FROM burn_sessions WHERE end >= ? ORDER BY start", (start,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def summary(self, start: float) -> Dict[str, Optional[float]]:
+        """Count, total and average duration, average peak and reloads of sessions ending since start."""
+        above = ", ".join(f"SUM(above_{threshold})" for threshold in ABOVE_THRESHOLDS)
+        with self._lock:
+            self._expire_stale(time.time())
+            row = self._conn.execute(
+                f"SELECT COUNT(*), SUM(duration), AVG(duration), AVG(peak), MAX(peak), SUM(reloads), {above}"
+                " FROM burn_sessions WHERE end >= ?", (start,)
+            ).fetchone()
+        count, total, mean, mean_peak, max_peak, reloads, *above_totals = row
+        return {
+            "count": count,
+            "total_duration": total,
+            "average_duration": mean,
+            "average_peak": mean_peak,
+            "max_peak": max_peak,
+            "reloads": reloads,
+            **{f"above_{threshold}": value for threshold, value in zip(ABOVE_THRESHOLDS, above_totals)}
+        }
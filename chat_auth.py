@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Cheap per-request authentication for the chat backend.
+
+Checking a password against its Werkzeug hash (scrypt, or PBKDF2 with
+hundreds of thousands of iterations on older versions) costs tens to
+hundreds of milliseconds of CPU on every request. Two shortcuts keep that
+cost to the first request:
+
+* ``TokenSigner`` issues short-lived bearer tokens after a successful Basic
+  login. A token is ``base64url(payload).base64url(HMAC-SHA256)`` with the
+  user name and expiry in the payload, so checking one takes microseconds
+  and needs no server-side state. Every worker that shares the secret
+  accepts it.
+* ``VerifiedCredentials`` remembers Basic credentials that already passed the
+  hash check, as keyed HMAC digests compared in constant time, for clients
+  such as the logger that keep sending Basic auth.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def derive_secret(password, configured=None):
+    """Signing key: the configured secret, or one stretched from the chat password.
+
+    Deriving it from the password gives every worker the same key without
+    extra configuration, and changing the password revokes old tokens. The
+    derivation is deliberately slow, like the password hash, so a leaked
+    token does not make the password quick to brute-force.
+    """
+    if configured:
+        return configured.encode()
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), b"stove-chat-token", 600_000)
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class TokenSigner:
+    """Issues and verifies HMAC-SHA256 signed tokens that expire after ttl seconds."""
+
+    def __init__(self, secret, ttl=3600.0):
+        self.secret = secret
+        self.ttl = ttl
+
+    def _sign(self, payload):
+        return hmac.new(self.secret, payload.encode(), hashlib.sha256).digest()
+
+    def issue(self, username):
+        """Return (token, expiry as epoch seconds) for username."""
+        expires = int(time.time() + self.ttl)
+        payload = _b64encode(json.dumps({"sub": username, "exp": expires}, separators=(",", ":")).encode())
+        return f"{payload}.{_b64encode(self._sign(payload))}", expires
+
+    def verify(self, token):
+        """Return the token's user name, or None when it is malformed, forged or expired."""
+        payload, _, signature = (token or "").partition(".")
+        try:
+            if not hmac.compare_digest(_b64decode(signature), self._sign(payload)):
+                return None
+            claims = json.loads(_b64decode(payload))
+        except ValueError:
+            return None
+        if claims.get("exp", 0) <= time.time():
+            return None
+        return claims.get("sub")
+
+
+class VerifiedCredentials:
+    """Bounded TTL cache of Basic credentials that already passed the password hash check.
+
+    Only keyed digests of the credentials are kept, never the passwords.
+    """
+
+    def __init__(self, secret, maxsize=64, ttl=300.0):
+        self.secret = secret
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _digest(self, username, password):
+        return hmac.new(self.secret, f"{username}\0{password}".encode(), hashlib.sha256).digest()
+
+    def contains(self, username, password):
+        """True when these exact credentials were verified less than ttl seconds ago."""
+        digest = self._digest(username, password)
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None:
+                return False
+            expires, verified = entry
+            if expires <= time.monotonic():
+                del self._entries[username]
+                return False
+        return hmac.compare_digest(verified, digest)
+
+    def add(self, username, password):
+        with self._lock:
+            self._entries[username] = (time.monotonic() + self.ttl, self._digest(username, password))
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
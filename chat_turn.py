@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+One chat turn, shared by the sync (Flask) and async (ASGI) chat front ends.
+
+A turn starts from the stored conversation and the user's message, answers
+from the response cache or through rounds of tool calls, and saves the
+conversation. The turn itself does no I/O. Like the Flux tool plans in
+stove_chat_app, its plans are generators that yield requests and receive
+their results, so each front end runs them on its own clients:
+
+* ("complete", kwargs) is sent the chat completion response;
+* ("stream", (messages, use_tools)) is sent each item of stream_completion
+  in turn, answering each ("token", text) with a "token" event;
+* ("tools", tool_calls) is sent run_tool_calls' (tool messages, timings).
+
+Anything else yielded is an (event, data) pair for the client. Both plans
+end with a "done" event.
+"""
+import time
+
+import metrics
+
+CHAT_TURN_SECONDS = metrics.histogram("stove_chat_turn_seconds", "Time to answer one chat message", ["endpoint", "cached"])
+
+
+def assistant_tool_message(content, tool_calls):
+    """History entry for an assistant turn that requested tool calls."""
+    return {
+        "role": "assistant",
+        "content": content,
+        "tool_calls": [
+            {
+                "id": tool_call.id,
+                "type": "function",
+                "function": {
+                    "name": tool_call.function.name,
+                    "arguments": tool_call.function.arguments
+                }
+            }
+            for tool_call in tool_calls
+        ]
+    }
+
+
+class ChatTurn:
+    """A user message and its answer, from the compacted history to the saved conversation."""
+
+    def __init__(self, message, conversation_id, history, legacy, fingerprint, cached, conversations,
+                 response_cache, system_prompt, tools, max_rounds):
+        self.message = message
+        self.conversation_id = conversation_id
+        self.messages = history + [{"role": "user", "content": message}]
+        self.legacy = legacy
+        self.fingerprint = fingerprint
+        self.cached = cached
+        self.conversations = conversations
+        self.response_cache = response_cache
+        self.system_prompt = system_prompt
+        self.tools = tools
+        self.max_rounds = max_rounds
+        self.started = time.perf_counter()
+        self.tool_timings = []
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def prompt(self):
+        return [{"role": "system", "content": self.system_prompt}] + self.messages
+
+    def _finish(self, answer):
+        """Save the answer to the conversation and, for an opening question, to the response cache."""
+        self.messages.append({"role": "assistant", "content": answer})
+        self.conversations.save(self.conversation_id, self.messages)
+        if self.cached is None and self.fingerprint is not None:
+            self.response_cache.set(self.message, self.fingerprint, answer, round(self.elapsed_ms(), 1))
+
+    def _body(self, **fields):
+        body = {
+            "conversation_id": self.conversation_id,
+            "tool_calls": self.tool_timings,
+            "tool_tokens_saved": sum(timing["tokens_saved"] for timing in self.tool_timings),
+            "cached": self.cached is not None,
+            **fields
+        }
+        if self.cached is not None:
+            body["similarity"] = self.cached["similarity"]
+            body["saved_ms"] = self.cached["latency_ms"]
+        if self.legacy:
+            body["history"] = self.messages
+        return body
+
+    def _run_tools(self, content, tool_calls):
+        """Record the assistant's tool calls and run them; yields the "tools" request."""
+        self.messages.append(assistant_tool_message(content, tool_calls))
+        tool_messages, timings = yield "tools", self.messages[-1]["tool_calls"]
+        self.messages.extend(tool_messages)
+        self.tool_timings.extend(timings)
+        return timings
+
+    def reply(self):
+        """Plan for /api/chat: answer with completions, ending with ("done", response body)."""
+        if self.cached is not None:
+            answer = self.cached["answer"]
+        else:
+            for _ in range(self.max_rounds):
+                response = yield "complete", {"messages": self.prompt(), "tools": self.tools, "tool_choice": "auto"}
+                response_message = response.choices[0].message
+
+                # Keep going until the model stops asking for data
+                if not response_message.tool_calls:
+                    break
+                yield from self._run_tools(response_message.content, response_message.tool_calls)
+            else:
+                # Tool round cap reached: ask for an answer from the data gathered so far
+                response = yield "complete", {"messages": self.prompt()}
+                response_message = response.choices[0].message
+            answer = response_message.content
+
+        self._finish(answer)
+        CHAT_TURN_SECONDS.observe(self.elapsed_ms() / 1000, endpoint="chat", cached=str(self.cached is not None).lower())
+        yield "done", self._body(response=answer)
+
+    def stream(self):
+        """Plan for /api/chat/stream: "tool_call", "tool_result" and "token" events, then "done"."""
+        first_token_ms = None
+        answer = []
+        if self.cached is not None:
+            first_token_ms = self.elapsed_ms()
+            answer.append(self.cached["answer"])
+            yield "token", {"text": self.cached["answer"]}
+        # A cached answer needs no completion rounds
+        for round_number in range(self.max_rounds + 1 if self.cached is None else 0):
+            # The last round offers no tools, forcing an answer
+            item = yield "stream", (self.messages, round_number < self.max_rounds)
+            while item[0] == "token":
+                if first_token_ms is None:
+                    first_token_ms = self.elapsed_ms()
+                answer.append(item[1])
+                item = yield "token", {"text": item[1]}
+            tool_calls = item[1]
+
+            if not tool_calls:
+                break
+
+            for tool_call in tool_calls:
+                yield "tool_call", {"name": tool_call.function.name}
+            timings = yield from self._run_tools("".join(answer) or None, tool_calls)
+            answer = []
+            for timing in timings:
+                yield "tool_result", timing
+
+        self._finish("".join(answer))
+        total_ms = round(self.elapsed_ms(), 1)
+        CHAT_TURN_SECONDS.observe(total_ms / 1000, endpoint="stream", cached=str(self.cached is not None).lower())
+        yield "done", self._body(
+            first_token_ms=round(first_token_ms, 1) if first_token_ms is not None else None,
+            total_ms=total_ms
+        )
+
+    def error_body(self, error):
+        """Response body for a turn that failed."""
+        body = {
+            "response": f"I encountered an error: {str(error)}",
+            "conversation_id": self.conversation_id
+        }
+        if self.legacy:
+            body["history"] = self.messages
+        return body
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Server-side chat conversation storage and history compaction.
+
+Clients send an opaque conversation id instead of echoing the whole history
+on every request. Two backends are available: an in-process LRU with TTL
+(the default, also handy as a stand-in in tests) and SQLite, which survives
+restarts and can be shared by several gunicorn workers.
+
+Before each model call the stored history is compacted: tool outputs from
+older turns are reduced to their scalar fields, and the oldest whole turns are
+dropped until the prompt fits a token budget.
+"""
+import json
+import secrets
+import sqlite3
+import threading
+import time
+
+from query_cache import TTLCache
+
+
+def new_conversation_id():
+    return secrets.token_urlsafe(16)
+
+
+class MemoryConversationStore:
+    """In-process conversation store with LRU eviction and TTL expiry."""
+
+    def __init__(self, maxsize=1000, ttl=86400.0):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def load(self, conversation_id):
+        """Return the stored messages, or None for an unknown or expired id."""
+        hit, messages = self._cache.get(conversation_id)
+        return list(messages) if hit else None
+
+    def save(self, conversation_id, messages):
+        self._cache.set(conversation_id, list(messages))
+
+
+class SQLiteConversationStore:
+    """SQLite-backed conversation store; expired conversations are pruned on write."""
+
+    def __init__(self, path, ttl=86400.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS conversations ("
+            " id TEXT PRIMARY KEY,"
+            " updated REAL NOT NULL,"
+            " messages TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS conversations_updated ON conversations (updated)")
+
+    def load(self, conversation_id):
+        """Return the stored messages, or None for an unknown or expired id."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT messages FROM conversations WHERE id = ? AND updated > ?",
+                (conversation_id, time.time() - self.ttl)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, conversation_id, messages):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO conversations (id, updated, messages) VALUES (?, ?, ?)",
+                (conversation_id, now, json.dumps(messages))
+            )
+            self._conn.execute("DELETE FROM conversations WHERE updated <= ?", (now - self.ttl,))
+
+
+def estimate_tokens(messages):
+    """Rough prompt token count (about four characters per token)."""
+    return len(json.dumps(messages)) // 4
+
+
+def summarize_tool_output(content):
+    """Keep a tool result's scalar fields; lists are reduced to their length."""
+    try:
+        result = json.loads(content)
+    except (TypeError, ValueError):
+        return (content or "")[:200]
+    if not isinstance(result, dict):
+        return (content or "")[:200]
+    summary = {}
+    for key, value in result.items():
+        if isinstance(value, list):
+            summary[f"{key}_count"] = len(value)
+        elif isinstance(value, dict):
+            # Compactly encoded series and tables (see tool_encoding) count their rows
+            columns = [column for column in value.values() if isinstance(column, list)]
+            if columns:
+                summary[f"{key}_count"] = max(len(column) for column in columns)
+        else:
+            summary[key] = value
+    summary["summarized"] = True
+    return json.dumps(summary)
+
+
+def split_turns(messages):
+    """Split a history into turns, each starting at a user message."""
+    turns = []
+    for message in messages:
+        if message.get("role") == "user" or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def compact_history(messages, keep_turns=2, token_budget=4000):
+    """Summarize old tool outputs and drop the oldest turns to fit the token budget.
+
+    Whole turns are dropped so tool results always stay paired with the
+    assistant message that requested them. The newest turn is always kept.
+    """
+    turns = split_turns(messages)
+    for turn in turns[:-keep_turns] if keep_turns else turns:
+        for i, message in enumerate(turn):
+            if message.get("role") == "tool":
+                turn[i] = {**message, "content": summarize_tool_output(message.get("content"))}
+
+    sizes = [estimate_tokens(turn) for turn in turns]
+    total = sum(sizes)
+    while len(turns) > 1 and total > token_budget:
+        total -= sizes.pop(0)
+        turns.pop(0)
+    return [message for turn in turns for message in turn]
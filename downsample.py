@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Shape-preserving downsampling of temperature series.
+
+Window means flatten a fire into a smooth hump. These selectors instead keep
+a subset of the actual points, chosen so the peaks, the ignition ramps and
+the reload spikes survive:
+
+* ``minmax`` keeps the lowest and highest point of each bucket. It is fully
+  vectorized and never drops an extreme.
+* ``lttb`` (Largest-Triangle-Three-Buckets) keeps the point of each bucket
+  that forms the largest triangle with the previously kept point and the
+  next bucket's average. That traces the visual shape with one point per
+  bucket. The area scan over each bucket is vectorized. Long inputs are
+  first reduced with ``minmax`` (MinMaxLTTB), so the per-bucket loop only
+  sees a few points per bucket.
+
+All functions take x (e.g. timestamps) and y in time order and return the
+sorted indices of the points to keep, so callers can slice any parallel
+columns with them.
+"""
+import numpy as np
+
+# minmax preselection ratio before LTTB (points per output point)
+PRESELECT_RATIO = 4
+
+
+def _bucket_edges(start: int, stop: int, buckets: int) -> np.ndarray:
+    """buckets + 1 edges splitting [start, stop) into nearly equal runs."""
+    return np.linspace(start, stop, buckets + 1).astype(np.int64)
+
+
+def minmax(y, budget: int) -> np.ndarray:
+    """Indices of the min and max of each of (budget - 2) // 2 buckets, plus the first and last point."""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if budget >= n or n < 3:
+        return np.arange(n)
+    if budget < 4:
+        # No room for a min and a max: keep the endpoints and, given room, the widest interior swing
+        if budget < 3:
+            return np.array([0, n - 1][:max(0, budget)], dtype=np.int64)
+        swing = np.abs(y[1:-1] - (y[0] + y[-1]) / 2)
+        return np.array([0, 1 + int(swing.argmax()), n - 1])
+    buckets = (budget - 2) // 2
+    edges = _bucket_edges(1, n - 1, buckets)
+    lengths = np.diff(edges)
+    # Bucket lengths differ by at most one, so pad them into a (buckets, longest) matrix
+    index = edges[:-1, None] + np.arange(lengths.max())
+    valid = index < edges[1:, None]
+    index = np.minimum(index, n - 1)
+    values = y[index]
+    lows = index[np.arange(buckets), np.where(valid, values, np.inf).argmin(axis=1)]
+    highs = index[np.arange(buckets), np.where(valid, values, -np.inf).argmax(axis=1)]
+    return np.unique(np.concatenate(([0], lows, highs, [n - 1])))
+
+
+def lttb(x, y, budget: int) -> np.ndarray:
+    """Indices of budget points chosen by Largest-Triangle-Three-Buckets."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if budget >= n or n < 3:
+        return np.arange(n)
+    if budget < 3:
+        return np.array([0, n - 1][:max(0, budget)], dtype=np.int64)
+
+    buckets = budget - 2
+    edges = _bucket_edges(1, n - 1, buckets)
+    # Average of every bucket from prefix sums; the last bucket looks ahead to the final point
+    cx, cy = np.concatenate(([0.0], np.cumsum(x))), np.concatenate(([0.0], np.cumsum(y)))
+    counts = np.diff(edges)
+    mean_x = (cx[edges[1:]] - cx[edges[:-1]]) / counts
+    mean_y = (cy[edges[1:]] - cy[edges[:-1]]) / counts
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    keep = np.empty(budget, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for b in range(buckets):
+        lo, hi = edges[b], edges[b + 1]
+        # Twice the triangle area (a, candidate, next bucket average) for every candidate
+        area = np.abs((x[a] - next_x[b]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[b] - y[a]))
+        a = lo + int(area.argmax())
+        keep[b + 1] = a
+    return keep
+
+
+def downsample(x, y, budget: int, method: str = "lttb") -> np.ndarray:
+    """Indices of at most budget points selected with `method` ("lttb" or "minmax")."""
+    if method == "minmax":
+        return minmax(y, budget)
+    if method != "lttb":
+        raise ValueError(f"Unknown downsampling method '{method}'")
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(y) > PRESELECT_RATIO * 2 * budget:
+        candidates = minmax(y, PRESELECT_RATIO * budget)
+        return candidates[lttb(x[candidates], y[candidates], budget)]
+    return lttb(x, y, budget)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Edge-side reduction of thermocouple readings before upload.
+
+Two independent reductions are available:
+
+* Compression filters decide which raw readings are worth uploading. The
+  deadband filter keeps a reading when it moves more than a fixed amount from
+  the last kept one; the swinging-door filter keeps the fewest points whose
+  straight-line interpolation stays within a deviation of every reading. Both
+  force a heartbeat point after ``max_gap`` seconds so "latest reading" queries
+  still find recent data while the stove is cold.
+* Rollups fold every reading into aligned per-minute min/mean/max/count
+  windows, written to the ``temperature_1m`` measurement that the dashboard
+  and chat backend can query instead of the raw series.
+"""
+import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Measurement holding the per-minute rollups
+ROLLUP_MEASUREMENT = "temperature_1m"
+
+# (epoch seconds, temperature)
+Reading = Tuple[float, float]
+
+
+class DeadbandFilter:
+    """Keep a reading when it moves at least ``deadband`` from the last kept value."""
+
+    def __init__(self, deadband: float, max_gap: float = 300.0):
+        self.deadband = deadband
+        self.max_gap = max_gap
+        self._last: Optional[Reading] = None
+        self._pending: Optional[Reading] = None
+
+    def update(self, t: float, value: float) -> List[Reading]:
+        """Feed one reading and return the readings to upload."""
+        if self._last is None or abs(value - self._last[1]) >= self.deadband \
+                or t - self._last[0] >= self.max_gap:
+            self._last = (t, value)
+            self._pending = None
+            return [(t, value)]
+        self._pending = (t, value)
+        return []
+
+    def flush(self) -> List[Reading]:
+        """Return the last suppressed reading so the series ends where the data did."""
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return []
+        self._last = pending
+        return [pending]
+
+
+class SwingingDoorFilter:
+    """Swinging-door trending compression with a fixed deviation in °F."""
+
+    def __init__(self, deviation: float, max_gap: float = 300.0):
+        self.deviation = deviation
+        self.max_gap = max_gap
+        self._archived: Optional[Reading] = None
+        self._snapshot: Optional[Reading] = None
+        self._slope_upper = 0.0
+        self._slope_lower = 0.0
+
+    def update(self, t: float, value: float) -> List[Reading]:
+        """Feed one reading and return the readings to upload."""
+        if self._archived is None:
+            return self._archive((t, value))
+
+        ta, va = self._archived
+        dt = t - ta
+        if dt <= 0:
+            return []
+
+        out: List[Reading] = []
+        if self._snapshot is not None:
+            slope = (value - va) / dt
+            if not self._slope_lower <= slope <= self._slope_upper:
+                # A line from the archive to this reading would miss an earlier
+                # reading by more than the deviation, so archive the last one.
+                out.extend(self._archive(self._snapshot))
+                ta, va = self._archived
+                dt = t - ta
+
+        upper = (value + self.deviation - va) / dt
+        lower = (value - self.deviation - va) / dt
+        if self._snapshot is None:
+            self._slope_upper, self._slope_lower = upper, lower
+        else:
+            self._slope_upper = min(self._slope_upper, upper)
+            self._slope_lower = max(self._slope_lower, lower)
+
+        self._snapshot = (t, value)
+        if t - self._archived[0] >= self.max_gap:
+            out.extend(self._archive(self._snapshot))
+        return out
+
+    def flush(self) -> List[Reading]:
+        """Archive the last reading so the series ends where the data did."""
+        if self._snapshot is None:
+            return []
+        return self._archive(self._snapshot)
+
+    def _archive(self, reading: Reading) -> List[Reading]:
+        self._archived = reading
+        self._snapshot = None
+        return [reading]
+
+
+class WindowRollup:
+    """Aggregate readings into aligned fixed-length windows of min/mean/max/count."""
+
+    def __init__(self, period: float = 60.0):
+        self.period = period
+        self._start: Optional[float] = None
+        self._min = self._max = self._sum = 0.0
+        self._count = 0
+
+    def update(self, t: float, value: float) -> List[dict]:
+        """Feed one reading and return any windows it completes."""
+        start = t - (t % self.period)
+        out = []
+        if self._start is not None and start != self._start:
+            out = self.flush()
+        if self._start is None:
+            self._start = start
+            self._min = self._max = value
+            self._sum = 0.0
+            self._count = 0
+        self._min = min(self._min, value)
+        self._max = max(self._max, value)
+        self._sum += value
+        self._count += 1
+        return out
+
+    def flush(self) -> List[dict]:
+        """Return the current partial window, if any."""
+        if self._start is None:
+            return []
+        window = {
+            "start": self._start,
+            "min": self._min,
+            "mean": self._sum / self._count,
+            "max": self._max,
+            "count": self._count
+        }
+        self._start = None
+        return [window]
+
+
+class EdgeReducer:
+    """Per-location compression and rollup state for the logger."""
+
+    def __init__(self, compression: str = "none", deviation: float = 1.0,
+                 max_gap: float = 300.0, rollup_period: Optional[float] = None):
+        if compression not in ("none", "deadband", "swinging_door"):
+            raise ValueError(f"Unknown edge compression '{compression}'")
+        self.compression = compression
+        self.deviation = deviation
+        self.max_gap = max_gap
+        self.rollup_period = rollup_period
+        self._filters: Dict[str, object] = {}
+        self._rollups: Dict[str, WindowRollup] = {}
+        self.readings_in = 0
+        self.readings_out = 0
+
+    def process(self, readings: Dict[str, float], timestamp: datetime.datetime
+                ) -> Tuple[List[Tuple[str, float, float]], List[Tuple[str, dict]]]:
+        """Return (raw readings to upload, completed rollup windows) for one sample.
+
+        Raw readings are (location, epoch seconds, temperature); rollup windows
+        are (location, window dict).
+        """
+        t = timestamp.timestamp()
+        raw, windows = [], []
+        for location, value in readings.items():
+            self.readings_in += 1
+            for rt, rv in self._filter(location).update(t, value):
+                raw.append((location, rt, rv))
+            if self.rollup_period:
+                rollup = self._rollups.setdefault(location, WindowRollup(self.rollup_period))
+                windows.extend((location, w) for w in rollup.update(t, value))
+        self.readings_out += len(raw)
+        return raw, windows
+
+    def flush(self) -> Tuple[List[Tuple[str, float, float]], List[Tuple[str, dict]]]:
+        """Return everything still held back, e.g. on shutdown."""
+        raw = [(location, rt, rv)
+               for location, f in self._filters.items() for rt, rv in f.flush()]
+        windows = [(location, w)
+                   for location, rollup in self._rollups.items() for w in rollup.flush()]
+        self.readings_out += len(raw)
+        return raw, windows
+
+    def _filter(self, location: str):
+        if location not in self._filters:
+            if self.compression == "deadband":
+                self._filters[location] = DeadbandFilter(self.deviation, self.max_gap)
+            elif self.compression == "swinging_door":
+                self._filters[location] = SwingingDoorFilter(self.deviation, self.max_gap)
+            else:
+                self._filters[location] = DeadbandFilter(0.0, 0.0)
+        return self._filters[location]
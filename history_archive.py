@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Bulk export and import of temperature history as Parquet or Arrow IPC files.
+
+Export walks a time range of the InfluxDB bucket one chunk at a time. Each
+chunk is a Flux query answered as plain CSV, which is parsed as it streams
+in, straight into Arrow record batches, and appended to the output file. Memory
+stays bounded by the chunk and row-group size however long the range is.
+
+Import reads such a file batch by batch, turns each batch into line protocol
+with Arrow compute kernels and bulk-loads it through the logger's batched
+write path (BatchWriter, with its spool) into InfluxDB or the chat backend's
+/api/ingest. It can also append the catalyst series straight to a local
+store. This reseeds a new bucket or a local store from an archive.
+
+Every file has the columns time (ns, UTC), measurement, location, sensor,
+field and value. Values are exported as floats; the rollup count field is
+written back as an integer.
+
+Requires pyarrow (``pip install pyarrow``).
+
+Usage:
+    python history_archive.py export history.parquet --start 2026-01-01 --stop 2026-02-01
+    python history_archive.py export history.arrow --start=-30d --measurement temperature_1m
+    python history_archive.py import history.parquet --bucket new_bucket
+    python history_archive.py import history.parquet --to local-store --path local_store.bin
+"""
+import argparse
+import io
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import influxdb_client
+import numpy as np
+from dotenv import load_dotenv
+from influxdb_client import Dialect
+from influxdb_client.client.write_api import SYNCHRONOUS
+
+from edge_reduction import ROLLUP_MEASUREMENT
+from influx_batch_writer import BatchWriter, HttpIngestWriteApi, WriteSpool
+from local_store import RingStore
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("parquet", "arrow")
+MEDIA_TYPES = {"parquet": "application/vnd.apache.parquet", "arrow": "application/vnd.apache.arrow.file"}
+DEFAULT_CHUNK_SECONDS = 86400
+DEFAULT_ROW_GROUP_ROWS = 1 << 18
+DEFAULT_POINTS_PER_WRITE = 5000
+TAGS = ("location", "sensor")
+INTEGER_FIELDS = ((ROLLUP_MEASUREMENT, "count"),)
+
+# Flux column -> archive column
+COLUMNS = (("_time", "time"), ("_measurement", "measurement"), ("location", "location"),
+           ("sensor", "sensor"), ("_field", "field"), ("_value", "value"))
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+# Measurement names that may be put in a Flux filter (they arrive as request parameters)
+MEASUREMENT_NAME = re.compile(r"[A-Za-z0-9_.-]+")
+
+if pa is not None:
+    SCHEMA = pa.schema([
+        ("time", pa.timestamp("ns", tz="UTC")),
+        ("measurement", pa.string()),
+        ("location", pa.string()),
+        ("sensor", pa.string()),
+        ("field", pa.string()),
+        ("value", pa.float64()),
+    ])
+    CSV_TYPES = {flux: SCHEMA.field(name).type for flux, name in COLUMNS}
+
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError("pyarrow is required for history export and import: pip install pyarrow")
+
+
+def format_for(path: str, default: str = "parquet") -> str:
+    """Archive format from a file name: .arrow/.arrows/.ipc/.feather are Arrow IPC, anything else Parquet."""
+    suffix = os.path.splitext(path)[1].lower()
+    return "arrow" if suffix in (".arrow", ".arrows", ".ipc", ".feather") else default
+
+
+def check_measurements(measurements: Optional[Sequence[str]]):
+    """Raise ValueError unless every measurement name is plain letters, digits, '_', '.' or '-'."""
+    for m in measurements or ():
+        if not MEASUREMENT_NAME.fullmatch(m):
+            raise ValueError(f"invalid measurement name {m!r}: use only letters, digits, '_', '.' and '-'")
+
+
+def parse_time(value: str, now: Optional[float] = None) -> float:
+    """Epoch seconds from epoch seconds, an ISO 8601 time (UTC unless it has an offset) or -30d style offsets."""
+    value = value.strip()
+    now = time.time() if now is None else now
+    if value == "now":
+        return now
+    if value.startswith("-") and value[-1:] in UNITS:
+        return now - float(value[1:-1]) * UNITS[value[-1]]
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def export_query(bucket: str, start_s: int, stop_s: int,
+                 measurements: Optional[Sequence[str]] = None) -> str:
+    """Flux for the raw points of one chunk, with values as floats and only the archive columns."""
+    check_measurements(measurements)
+    measurement_filter = ""
+    if measurements:
+        condition = " or ".join(f'r["_measurement"] == "{m}"' for m in measurements)
+        measurement_filter = f"|> filter(fn: (r) => {condition})"
+    columns = ", ".join(f'"{flux}"' for flux, _ in COLUMNS)
+    return f'''
+    from(bucket: "{bucket}")
+        |> range(start: {start_s}, stop: {stop_s})
+        {measurement_filter}
+        |> toFloat()
+        |> keep(columns: [{columns}])
+    '''
+
+
+def csv_batches(stream, block_size: int = 1 << 20) -> Iterator["pa.RecordBatch"]:
+    """Record batches in the archive schema from a plain (unannotated) Flux CSV response."""
+    try:
+        reader = pa_csv.open_csv(
+            stream,
+            read_options=pa_csv.ReadOptions(block_size=block_size),
+            convert_options=pa_csv.ConvertOptions(column_types=CSV_TYPES, include_columns=list(CSV_TYPES),
+                                                  include_missing_columns=True)
+        )
+    except pa.ArrowInvalid as e:
+        # InfluxDB answers a range without data with an empty body
+        if "Empty CSV" in str(e):
+            return
+        raise
+    for batch in reader:
+        if batch.num_rows:
+            yield pa.RecordBatch.from_arrays([batch.column(flux) for flux, _ in COLUMNS], schema=SCHEMA)
+
+
+def export_batches(query_api, bucket: str, start_s: float, stop_s: float,
+                   chunk_seconds: int = DEFAULT_CHUNK_SECONDS,
+                   measurements: Optional[Sequence[str]] = None,
+                   org: Optional[str] = None) -> Iterator["pa.RecordBatch"]:
+    """Stream [start_s, stop_s) from the bucket as record batches, one Flux query per chunk."""
+    require_pyarrow()
+    dialect = Dialect(header=True, annotations=[], date_time_format="RFC3339Nano")
+    chunk_start = int(start_s)
+    while chunk_start < stop_s:
+        chunk_stop = int(min(chunk_start + chunk_seconds, np.ceil(stop_s)))
+        response = query_api.query_raw(export_query(bucket, chunk_start, chunk_stop, measurements),
+                                       org=org, dialect=dialect)
+        try:
+            yield from csv_batches(response)
+        finally:
+            response.close()
+        chunk_start = chunk_stop
+
+
+class ArchiveWriter:
+    """Append record batches to a Parquet or Arrow IPC file; Parquet row groups are buffered to row_group_rows."""
+
+    def __init__(self, sink, fmt: str = "parquet", row_group_rows: int = DEFAULT_ROW_GROUP_ROWS):
+        require_pyarrow()
+        if fmt not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+        self.fmt = fmt
+        self.row_group_rows = row_group_rows
+        self.rows = 0
+        self._pending: List["pa.RecordBatch"] = []
+        self._pending_rows = 0
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(sink, SCHEMA, compression="zstd")
+        else:
+            self._writer = ipc.new_file(sink, SCHEMA, options=ipc.IpcWriteOptions(compression="zstd"))
+
+    def write(self, batch: "pa.RecordBatch"):
+        self.rows += batch.num_rows
+        if self.fmt == "arrow":
+            self._writer.write_batch(batch)
+            return
+        self._pending.append(batch)
+        self._pending_rows += batch.num_rows
+        if self._pending_rows >= self.row_group_rows:
+            self.flush()
+
+    def flush(self):
+        """Write buffered batches out as one Parquet row group."""
+        if self._pending:
+            self._writer.write_table(pa.Table.from_batches(self._pending, SCHEMA), row_group_size=self._pending_rows)
+            self._pending, self._pending_rows = [], 0
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+
+def export_range(query_api, bucket: str, start_s: float, stop_s: float, sink, fmt: Optional[str] = None,
+                 chunk_seconds: int = DEFAULT_CHUNK_SECONDS, measurements: Optional[Sequence[str]] = None,
+                 row_group_rows: int = DEFAULT_ROW_GROUP_ROWS, org: Optional[str] = None) -> int:
+    """Export [start_s, stop_s) to sink (a path or writable file); return the number of rows."""
+    if fmt is None:
+        fmt = format_for(sink) if isinstance(sink, str) else "parquet"
+    writer = ArchiveWriter(sink, fmt, row_group_rows)
+    try:
+        for batch in export_batches(query_api, bucket, start_s, stop_s, chunk_seconds, measurements, org):
+            writer.write(batch)
+    finally:
+        writer.close()
+    return writer.rows
+
+
+class _ByteQueue(io.RawIOBase):
+    """Write-only file that keeps what was written until take() hands it on."""
+
+    def __init__(self):
+        super().__init__()
+        self._parts: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+def stream_export(query_api, bucket: str, start_s: float, stop_s: float, fmt: str = "parquet",
+                  chunk_seconds: int = DEFAULT_CHUNK_SECONDS, measurements: Optional[Sequence[str]] = None,
+                  row_group_rows: int = DEFAULT_ROW_GROUP_ROWS, org: Optional[str] = None) -> Iterator[bytes]:
+    """Yield an export file's bytes as they are written, for HTTP streaming responses."""
+    buffer = _ByteQueue()
+    writer = ArchiveWriter(pa.PythonFile(buffer, mode="w"), fmt, row_group_rows)
+    for batch in export_batches(query_api, bucket, start_s, stop_s, chunk_seconds, measurements, org):
+        writer.write(batch)
+        data = buffer.take()
+        if data:
+            yield data
+    writer.close()
+    yield buffer.take()
+
+
+def read_batches(path: str, batch_rows: int = 65536) -> Iterator["pa.RecordBatch"]:
+    """Record batches of a Parquet or Arrow IPC (file or stream format) archive."""
+    require_pyarrow()
+    if format_for(path) == "parquet":
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_rows)
+        return
+    with pa.memory_map(path) as source:
+        try:
+            reader = ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+        except pa.ArrowInvalid:
+            source.seek(0)
+            yield from ipc.open_stream(source)
+
+
+def select(batch: "pa.RecordBatch", measurement: Optional[str] = None, location: Optional[str] = None,
+           field: Optional[str] = None) -> "pa.RecordBatch":
+    """Rows of batch matching every given column value, without null or NaN values.
+
+    Rows without a time, measurement or field are dropped too: none of them
+    can be written as line protocol.
+    """
+    value = batch.column("value")
+    mask = pc.and_(pc.is_valid(value), pc.invert(pc.fill_null(pc.is_nan(value), True)))
+    for name in ("time", "measurement", "field"):
+        mask = pc.and_(mask, pc.is_valid(batch.column(name)))
+    for name, value in (("measurement", measurement), ("location", location), ("field", field)):
+        if value is not None:
+            mask = pc.and_(mask, pc.equal(batch.column(name), value))
+    return batch.filter(mask)
+
+
+def _escape(values: "pa.Array") -> "pa.Array":
+    return pc.replace_substring_regex(values, r"([ ,=])", r"\\\1")
+
+
+def line_protocol(batch: "pa.RecordBatch") -> str:
+    """Line protocol for every row of batch, built with vectorized string kernels.
+
+    Every row needs a value, as select() leaves them; a null makes the whole result None.
+    """
+    tag_parts = [pc.coalesce(pc.binary_join_element_wise(f",{tag}=", _escape(batch.column(tag)), ""), "")
+                 for tag in TAGS]
+    measurement, field, value = batch.column("measurement"), batch.column("field"), batch.column("value")
+    is_integer = pc.is_in(pc.binary_join_element_wise(measurement, field, "\0"),
+                          value_set=pa.array([f"{m}\0{f}" for m, f in INTEGER_FIELDS]))
+    values = pc.if_else(
+        is_integer,
+        pc.binary_join_element_wise(pc.cast(pc.round(value), pa.int64()).cast(pa.string()), "i", ""),
+        pc.cast(value, pa.string())
+    )
+    timestamps = pc.cast(pc.cast(batch.column("time"), pa.int64()), pa.string())
+    lines = pc.binary_join_element_wise(
+        _escape(measurement), *tag_parts, " ", _escape(field), "=", values, " ", timestamps, ""
+    )
+    return pc.binary_join(pa.ListArray.from_arrays([0, len(lines)], lines), "\n")[0].as_py()
+
+
+def import_batches(batches: Iterable["pa.RecordBatch"], writer,
+                   points_per_write: int = DEFAULT_POINTS_PER_WRITE) -> int:
+    """Submit batches to a BatchWriter as line-protocol records of points_per_write points; return the points queued.
+
+    Submits block while the writer's queue is full, so the load runs at the
+    speed of the write target and nothing is dropped.
+    """
+    points = 0
+    for batch in batches:
+        for offset in range(0, batch.num_rows, points_per_write):
+            part = batch.slice(offset, points_per_write)
+            writer.submit(line_protocol(part), block=True)
+            points += part.num_rows
+    return points
+
+
+def selected(batches: Iterable["pa.RecordBatch"], **criteria) -> Iterator["pa.RecordBatch"]:
+    """The non-empty results of select() over batches."""
+    for batch in batches:
+        batch = select(batch, **criteria)
+        if batch.num_rows:
+            yield batch
+
+
+def load_file(path: str, write_api, bucket: str, org: Optional[str], spool_path: str = "import_spool.db",
+              points_per_write: int = DEFAULT_POINTS_PER_WRITE, **criteria) -> Tuple[int, int]:
+    """Bulk-load an archive through a spooled BatchWriter; return (points read, points accepted).
+
+    criteria (measurement, location, field) restrict the load to matching rows;
+    rows without a value (null or NaN) are always skipped and not counted.
+    Points the target has not accepted when the load ends stay in the spool
+    and go out first on the next load with the same spool.
+    """
+    batches = selected(read_batches(path), **criteria)
+    writer = BatchWriter(write_api, bucket=bucket, org=org, spool_path=spool_path, batch_size=1,
+                         flush_interval=1.0, max_queue=8, name="import")
+    writer.start()
+    try:
+        points = import_batches(batches, writer, points_per_write)
+    finally:
+        writer.close(timeout=None)
+    return points, writer.flushed_points
+
+
+def import_to_store(batches: Iterable["pa.RecordBatch"], store) -> Tuple[int, int]:
+    """Append the catalyst temperature series to a RingStore; return (rows read, readings stored)."""
+    read = stored = 0
+    for batch in batches:
+        batch = select(batch, "temperature_measurement", "catalyst", "temperature")
+        read += batch.num_rows
+        if batch.num_rows:
+            timestamps = pc.cast(batch.column("time"), pa.int64()).to_numpy()
+            stored += store.append(timestamps, batch.column("value").to_numpy())
+    return read, stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="stream a time range from the bucket to a file")
+    export.add_argument("path", help="output file; .arrow/.ipc/.feather for Arrow IPC, else Parquet")
+    export.add_argument("--start", required=True, help="ISO 8601 time, epoch seconds or an offset like --start=-30d")
+    export.add_argument("--stop", default="now")
+    export.add_argument("--format", choices=FORMATS, help="override the format picked from the file name")
+    export.add_argument("--measurement", action="append", help="export only this measurement (repeatable)")
+    export.add_argument("--chunk-hours", type=float, default=DEFAULT_CHUNK_SECONDS / 3600,
+                        help="hours of data per Flux query")
+    export.add_argument("--row-group-rows", type=int, default=DEFAULT_ROW_GROUP_ROWS)
+    export.add_argument("--bucket", help="default: INFLUXDB_BUCKET")
+
+    load = commands.add_parser("import", help="bulk-load a file back into InfluxDB or a local store")
+    load.add_argument("path")
+    load.add_argument("--to", choices=("influxdb", "ingest", "local-store"), default="influxdb",
+                      help="InfluxDB (default), the chat backend's /api/ingest, or a local store file")
+    load.add_argument("--bucket", help="InfluxDB bucket to load into (default: INFLUXDB_BUCKET)")
+    load.add_argument("--url", help="/api/ingest URL for --to ingest (default: LOCAL_INGEST_URL)")
+    load.add_argument("--path", dest="store_path", help="local store file for --to local-store "
+                                                        "(default: LOCAL_STORE_PATH)")
+    load.add_argument("--capacity", type=int, default=int(os.getenv("LOCAL_STORE_CAPACITY", "1000000")),
+                      help="capacity of a new local store")
+    load.add_argument("--measurement", help="load only this measurement")
+    load.add_argument("--location", help="load only this location")
+    load.add_argument("--points-per-write", type=int, default=DEFAULT_POINTS_PER_WRITE)
+    load.add_argument("--spool-path", default="import_spool.db", help="spool for batches not yet accepted")
+    args = parser.parse_args()
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    require_pyarrow()
+    started = time.perf_counter()
+
+    if args.command == "export":
+        start_s, stop_s = parse_time(args.start), parse_time(args.stop)
+        with influxdb_client.InfluxDBClient(url=os.getenv("INFLUXDB_URL"), token=os.getenv("INFLUXDB_TOKEN"),
+                                            org=os.getenv("INFLUXDB_ORG"), timeout=300_000) as client:
+            rows = export_range(client.query_api(), args.bucket or os.getenv("INFLUXDB_BUCKET"), start_s, stop_s,
+                                args.path, args.format, int(args.chunk_hours * 3600), args.measurement,
+                                args.row_group_rows)
+        elapsed = time.perf_counter() - started
+        logger.info(f"Exported {rows} rows to {args.path} in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):.0f} rows/s)")
+        return
+
+    if args.to == "local-store":
+        store = RingStore(args.store_path or os.getenv("LOCAL_STORE_PATH", "local_store.bin"), args.capacity)
+        rows, stored = import_to_store(read_batches(args.path), store)
+        store.flush()
+        logger.info(f"Stored {stored} of {rows} catalyst readings in {store.path} "
+                    f"in {time.perf_counter() - started:.1f}s")
+        return
+
+    if args.to == "ingest":
+        # /api/ingest keeps only the raw catalyst series
+        write_api = HttpIngestWriteApi(args.url or os.getenv("LOCAL_INGEST_URL"),
+                                       os.getenv("LOCAL_INGEST_USERNAME", ""),
+                                       os.getenv("LOCAL_INGEST_PASSWORD", ""), timeout=60.0)
+        criteria = {"measurement": "temperature_measurement", "location": "catalyst"}
+        client = None
+    else:
+        client = influxdb_client.InfluxDBClient(url=os.getenv("INFLUXDB_URL"), token=os.getenv("INFLUXDB_TOKEN"),
+                                                org=os.getenv("INFLUXDB_ORG"), timeout=60_000)
+        write_api = client.write_api(write_options=SYNCHRONOUS)
+        criteria = {"measurement": args.measurement, "location": args.location}
+    try:
+        points, accepted = load_file(args.path, write_api, args.bucket or os.getenv("INFLUXDB_BUCKET"),
+                                     os.getenv("INFLUXDB_ORG"), args.spool_path, args.points_per_write, **criteria)
+    finally:
+        if client is not None:
+            client.close()
+    elapsed = time.perf_counter() - started
+    logger.info(f"Loaded {accepted} of {points} points in {elapsed:.1f}s ({accepted / max(elapsed, 1e-9):.0f} points/s)")
+    spool = WriteSpool(args.spool_path)
+    _, unsent = spool.size()
+    spool.close()
+    if unsent:
+        logger.warning(f"{unsent} points are still in {args.spool_path}; "
+                       f"the next import with the same spool uploads them first")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Batched, asynchronous InfluxDB writer with a durable local spool.
+
+Readings are queued in memory, grouped into line-protocol batches by size or
+age on a background thread, and appended to a SQLite spool before upload.
+Batches leave the spool only after InfluxDB accepts them, so readings survive
+network outages and Pi reboots and are replayed in order on reconnect.
+"""
+import base64
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import urllib.request
+from typing import List, Optional, Tuple
+
+from influxdb_client import WritePrecision
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+WRITE_SECONDS = metrics.histogram("stove_write_seconds", "Latency of one batch upload", ["writer"])
+WRITE_FAILURES = metrics.counter("stove_write_failures_total", "Uploads that failed (batches are retried)", ["writer"])
+POINTS_WRITTEN = metrics.counter("stove_points_written_total", "Points accepted by the write target", ["writer"])
+POINTS_DROPPED = metrics.counter("stove_points_dropped_total", "Readings lost to a full queue or spool error", ["writer"])
+SPOOL_POINTS = metrics.gauge("stove_spool_points", "Points spooled locally awaiting upload", ["writer"])
+
+
+class WriteSpool:
+    """Append-only SQLite spool of line-protocol batches awaiting upload."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS batches ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " created REAL NOT NULL,"
+            " points INTEGER NOT NULL,"
+            " payload TEXT NOT NULL)"
+        )
+
+    def append(self, payload: str, points: int) -> int:
+        """Persist a batch and return its spool id."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO batches (created, points, payload) VALUES (?, ?, ?)",
+                (time.time(), points, payload)
+            )
+            return cursor.lastrowid
+
+    def peek(self, limit: int = 10) -> List[Tuple[int, int, str]]:
+        """Return the oldest (id, points, payload) batches in write order."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, points, payload FROM batches ORDER BY id LIMIT ?",
+                (limit,)
+            ).fetchall()
+
+    def remove(self, batch_id: int):
+        """Drop a batch once it has been accepted by InfluxDB."""
+        with self._lock:
+            self._conn.execute("DELETE FROM batches WHERE id = ?", (batch_id,))
+
+    def size(self) -> Tuple[int, int]:
+        """Return (batches, points) currently held in the spool."""
+        with self._lock:
+            batches, points = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(points), 0) FROM batches"
+            ).fetchone()
+        return batches, points
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class HttpIngestWriteApi:
+    """Stand-in for an InfluxDB write_api that posts line protocol to the chat backend's /api/ingest."""
+
+    def __init__(self, url: str, username: str, password: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+        credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+        self._headers = {
+            "Content-Type": "text/plain; charset=utf-8",
+            "Authorization": f"Basic {credentials}"
+        }
+
+    def write(self, bucket: str, org: str, record: str, write_precision=None):
+        request = urllib.request.Request(self.url, data=record.encode(), headers=self._headers, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class BatchWriter:
+    """Background writer that flushes queued line-protocol records in batches."""
+
+    def __init__(self, write_api, bucket: str, org: str, spool_path: str,
+                 batch_size: int = 500, flush_interval: float = 10.0,
+                 max_queue: int = 10000, max_backoff: float = 300.0,
+                 name: str = "influxdb"):
+        self.write_api = write_api
+        self.name = name
+        self.bucket = bucket
+        self.org = org
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.spool = WriteSpool(spool_path)
+        SPOOL_POINTS.set(self.spool.size()[1], writer=name)
+
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._backoff = 0.0
+        self._retry_at = 0.0
+
+        self.dropped = 0
+        self.flushed_points = 0
+        self.failed_flushes = 0
+        self.last_flush_latency: Optional[float] = None
+
+    def start(self):
+        """Start the background flush thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="influx-batch-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, record: str, block: bool = False) -> bool:
+        """Queue line-protocol record(s); without block, drop them rather than wait when the queue is full."""
+        try:
+            self._queue.put(record, block=block)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            POINTS_DROPPED.inc(record.count("\n") + 1, writer=self.name)
+            logger.warning("InfluxDB write queue full, dropping reading")
+            return False
+
+    def stats(self) -> dict:
+        """Return queue depth, flush latency and spool size."""
+        spool_batches, spool_points = self.spool.size()
+        return {
+            "queue_depth": self._queue.qsize(),
+            "spool_batches": spool_batches,
+            "spool_points": spool_points,
+            "last_flush_latency": self.last_flush_latency,
+            "flushed_points": self.flushed_points,
+            "failed_flushes": self.failed_flushes,
+            "dropped": self.dropped
+        }
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Flush pending records to the spool, try one last upload and stop.
+
+        The flush thread closes the spool once it is done. If it is still
+        uploading after timeout, it is left to finish on its own; whatever it
+        has not uploaded stays in the spool for the next run.
+        """
+        self._stop.set()
+        if self._thread is None:
+            self.spool.close()
+            return
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"{self.name} writer still uploading after {timeout}s, leaving it to finish")
+            return
+        self._thread = None
+
+    def _run(self):
+        try:
+            self._flush_loop()
+        finally:
+            self.spool.close()
+
+    def _flush_loop(self):
+        pending: List[str] = []
+        oldest = 0.0
+        # Replay anything left in the spool by a previous run
+        drain_due = True
+
+        while not (self._stop.is_set() and self._queue.empty()):
+            now = time.monotonic()
+            if pending:
+                wait = oldest + self.flush_interval - now
+            else:
+                wait = self.flush_interval
+            if self._retry_at > now:
+                wait = min(wait, self._retry_at - now)
+
+            try:
+                record = self._queue.get(timeout=max(0.0, min(wait, 1.0)))
+                if not pending:
+                    oldest = time.monotonic()
+                pending.append(record)
+            except queue.Empty:
+                pass
+
+            now = time.monotonic()
+            if pending and (len(pending) >= self.batch_size or now - oldest >= self.flush_interval):
+                self._spool_pending(pending)
+                pending = []
+                drain_due = True
+            if (drain_due or self._backoff) and now >= self._retry_at:
+                self._drain()
+                drain_due = False
+
+        if pending:
+            self._spool_pending(pending)
+        self._drain(final=True)
+
+    def _spool_pending(self, pending: List[str]):
+        try:
+            points = sum(record.count("\n") + 1 for record in pending)
+            self.spool.append("\n".join(pending), points)
+            SPOOL_POINTS.inc(points, writer=self.name)
+        except sqlite3.Error as e:
+            self.dropped += len(pending)
+            POINTS_DROPPED.inc(len(pending), writer=self.name)
+            logger.error(f"Failed to spool {len(pending)} readings: {e}")
+
+    def _drain(self, final: bool = False):
+        """Upload spooled batches oldest-first until the spool is empty or a write fails.
+
+        While stopping, a failed upload is not retried until the final drain,
+        which tries once more regardless of the backoff.
+        """
+        if self._stop.is_set() and self._backoff and not final:
+            return
+        while True:
+            batches = self.spool.peek()
+            if not batches:
+                return
+            for batch_id, points, payload in batches:
+                start = time.perf_counter()
+                try:
+                    self.write_api.write(
+                        bucket=self.bucket,
+                        org=self.org,
+                        record=payload,
+                        write_precision=WritePrecision.NS
+                    )
+                except Exception as e:
+                    WRITE_SECONDS.observe(time.perf_counter() - start, writer=self.name)
+                    WRITE_FAILURES.inc(writer=self.name)
+                    self.failed_flushes += 1
+                    self._backoff = min(max(self._backoff * 2, 1.0), self.max_backoff)
+                    self._retry_at = time.monotonic() + self._backoff
+                    logger.warning(f"InfluxDB batch write failed, retrying in {self._backoff:.0f}s: {e}")
+                    return
+                self.last_flush_latency = time.perf_counter() - start
+                WRITE_SECONDS.observe(self.last_flush_latency, writer=self.name)
+                POINTS_WRITTEN.inc(points, writer=self.name)
+                self.flushed_points += points
+                self.spool.remove(batch_id)
+                SPOOL_POINTS.inc(-points, writer=self.name)
+                self._backoff = 0.0
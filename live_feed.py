@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Fan-out of new catalyst readings to live dashboard subscribers.
+
+Each subscriber gets a bounded queue of reading batches. Publishing never
+blocks: a subscriber whose queue is full has fallen behind, so it is dropped
+and told to reconnect. Reconnecting clients pass the timestamp of the last
+reading they saw and are backfilled from a short in-memory history (or the
+local store), so a client downloads the full chart window only once.
+
+Readings reach the feed either from ``/api/ingest`` directly or, when the
+local store is enabled, from a thread tailing the store. Without a local store
+a subscriber only sees readings ingested by its own worker process. Workers
+can share one store file on platforms with flock (see local_store), in which
+case tailing it lets subscribers on any worker see readings ingested by
+another; on Windows run a single worker.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+# Queued in place of a batch when a subscriber is dropped
+OVERFLOW = None
+
+
+class Subscriber:
+    """One client's bounded queue of (timestamps ms, temperatures) batches."""
+
+    def __init__(self, max_batches: int):
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max_batches)
+        self.dropped = False
+
+    def offer(self, batch) -> bool:
+        """Queue a batch without blocking; returns False once the subscriber has fallen behind."""
+        if self.dropped:
+            return False
+        try:
+            self.queue.put_nowait(batch)
+            return True
+        except queue.Full:
+            self.dropped = True
+            # Make room for the overflow marker so the reader wakes up and ends the stream
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.queue.put_nowait(OVERFLOW)
+            return False
+
+    def get(self, timeout: float):
+        """Next batch, OVERFLOW after being dropped, or raises queue.Empty after timeout."""
+        return self.queue.get(timeout=timeout)
+
+
+class LiveFeed:
+    """Publishes reading batches to every subscriber and keeps a short history for resumes."""
+
+    def __init__(self, max_batches: int = 64, history: int = 2048):
+        self.max_batches = max_batches
+        self._history: deque = deque(maxlen=history)
+        self._subscribers: List[Subscriber] = []
+        self._lock = threading.Lock()
+        self._tail_thread: Optional[threading.Thread] = None
+        self.started_ms = int(time.time() * 1000)
+        self.dropped = 0
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.max_batches)
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, timestamps_ms, temperatures) -> int:
+        """Send readings newer than the last published one; returns how many were sent."""
+        with self._lock:
+            newest = self._history[-1][0] if self._history else -1
+            batch = [(int(t), round(float(v), 1)) for t, v in zip(timestamps_ms, temperatures) if t > newest]
+            if not batch:
+                return 0
+            batch.sort()
+            self._history.extend(batch)
+            columns = ([t for t, _ in batch], [v for _, v in batch])
+            for subscriber in list(self._subscribers):
+                if not subscriber.offer(columns):
+                    self._subscribers.remove(subscriber)
+                    self.dropped += 1
+        return len(batch)
+
+    def newest_ms(self) -> Optional[int]:
+        """Timestamp (ms) of the newest published reading, or None before the first."""
+        with self._lock:
+            return self._history[-1][0] if self._history else None
+
+    def since(self, since_ms: int) -> Optional[Tuple[List[int], List[float]]]:
+        """Readings after since_ms, or None when some of them may have left the history."""
+        with self._lock:
+            oldest_known = self._history[0][0] if len(self._history) == self._history.maxlen else self.started_ms
+            if since_ms < oldest_known:
+                return None
+            batch = [(t, v) for t, v in self._history if t > since_ms]
+        return [t for t, _ in batch], [v for _, v in batch]
+
+    def tail(self, read_since: Callable[[int], Tuple[np.ndarray, np.ndarray]], interval: float = 1.0):
+        """Start a daemon thread publishing whatever read_since(last ms) returns every interval seconds."""
+        with self._lock:
+            if self._tail_thread is not None:
+                return
+            self._tail_thread = threading.Thread(target=self._tail, args=(read_since, interval), daemon=True)
+        self._tail_thread.start()
+
+    def _tail(self, read_since, interval):
+        last_ms = int(time.time() * 1000)
+        while True:
+            try:
+                timestamps, temperatures = read_since(last_ms)
+                if len(timestamps):
+                    self.publish(timestamps, temperatures)
+                    last_ms = int(timestamps[-1])
+            except Exception as e:
+                print(f"Live feed tail failed: {e}")
+            time.sleep(interval)
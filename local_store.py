@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Local embedded time-series store for recent catalyst readings.
+
+A fixed-capacity ring buffer of (timestamp, temperature) kept in a single
+memory-mapped file as two fixed-width columns: int64 nanosecond timestamps and
+float32 temperatures. Appends overwrite the oldest readings once the buffer is
+full. Queries are NumPy reductions over the chronological slices, so the chat
+backend can answer recent-range questions without a round trip to InfluxDB
+Cloud. Several processes (e.g. gunicorn workers) may open the same file:
+appends take an exclusive flock on it and reads a shared one, so concurrent
+writers serialize and readers see whole appends. Windows has no flock, so
+there the file must have a single writer.
+
+Also includes a minimal line-protocol parser for the ``/api/ingest`` endpoint,
+which receives the same batches the logger uploads to InfluxDB.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+MAGIC = 0x574F4F4453544F56  # "WOODSTOV"
+HEADER_BYTES = 64
+NS_PER_S = 1_000_000_000
+
+
+class RingStore:
+    """Memory-mapped ring buffer of timestamped temperatures."""
+
+    def __init__(self, path: str, capacity: int = 1_000_000):
+        self.path = path
+        self._lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        # Another worker may be creating the same file right now
+        with self._locked():
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, HEADER_BYTES + capacity * (8 + 4))
+                header = np.memmap(path, dtype=np.int64, mode='r+', shape=(4,))
+                header[:] = (MAGIC, capacity, 0, 0)
+                header.flush()
+            else:
+                header = np.memmap(path, dtype=np.int64, mode='r', shape=(4,))
+                if header[0] != MAGIC:
+                    os.close(self._fd)
+                    raise ValueError(f"{path} is not a local temperature store")
+                capacity = int(header[1])
+            del header
+
+        self.capacity = capacity
+        self._header = np.memmap(path, dtype=np.int64, mode='r+', shape=(4,))
+        self._ts = np.memmap(path, dtype=np.int64, mode='r+',
+                             offset=HEADER_BYTES, shape=(capacity,))
+        self._temp = np.memmap(path, dtype=np.float32, mode='r+',
+                               offset=HEADER_BYTES + capacity * 8, shape=(capacity,))
+
+    @contextmanager
+    def _locked(self, exclusive: bool = True):
+        """Hold the thread lock and an flock on the file, shared by every process using it."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def __len__(self) -> int:
+        return int(self._header[3])
+
+    def append(self, timestamps, temperatures) -> int:
+        """Append readings in time order; readings older than the newest stored one are skipped."""
+        ts = np.asarray(timestamps, dtype=np.int64)
+        temps = np.asarray(temperatures, dtype=np.float32)
+        with self._locked():
+            head, count = int(self._header[2]), int(self._header[3])
+            if count:
+                newest = self._ts[(head - 1) % self.capacity]
+                keep = ts > newest
+                ts, temps = ts[keep], temps[keep]
+            if len(ts) > 1 and np.any(np.diff(ts) <= 0):
+                order = np.argsort(ts, kind='stable')
+                ts, temps = ts[order], temps[order]
+                unique = np.concatenate(([True], np.diff(ts) > 0))
+                ts, temps = ts[unique], temps[unique]
+            if len(ts) == 0:
+                return 0
+            if len(ts) > self.capacity:
+                ts, temps = ts[-self.capacity:], temps[-self.capacity:]
+
+            n = len(ts)
+            first = min(n, self.capacity - head)
+            self._ts[head:head + first] = ts[:first]
+            self._temp[head:head + first] = temps[:first]
+            if first < n:
+                self._ts[:n - first] = ts[first:]
+                self._temp[:n - first] = temps[first:]
+            self._header[2] = (head + n) % self.capacity
+            self._header[3] = min(count + n, self.capacity)
+            return n
+
+    def flush(self):
+        """Flush mapped pages to disk."""
+        with self._locked():
+            self._ts.flush()
+            self._temp.flush()
+            self._header.flush()
+
+    def oldest_time(self) -> Optional[int]:
+        """Timestamp (ns) of the oldest stored reading, or None when empty."""
+        with self._locked(exclusive=False):
+            head, count = int(self._header[2]), int(self._header[3])
+            if not count:
+                return None
+            return int(self._ts[0 if count < self.capacity else head])
+
+    def latest(self) -> Optional[Tuple[int, float]]:
+        """Return the newest (timestamp ns, temperature), or None when empty."""
+        with self._locked(exclusive=False):
+            head, count = int(self._header[2]), int(self._header[3])
+            if not count:
+                return None
+            i = (head - 1) % self.capacity
+            return int(self._ts[i]), float(self._temp[i])
+
+    def covers(self, start_ns: int) -> bool:
+        """True when the store holds every reading since start_ns."""
+        oldest = self.oldest_time()
+        return oldest is not None and oldest <= start_ns
+
+    def range(self, start_ns: int, end_ns: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (timestamps, temperatures) with start_ns <= t < end_ns in time order."""
+        ts_parts, temp_parts = [], []
+        with self._locked(exclusive=False):
+            head, count = int(self._header[2]), int(self._header[3])
+            if count < self.capacity:
+                segments = [(0, count)]
+            else:
+                segments = [(head, self.capacity), (0, head)]
+
+            for lo, hi in segments:
+                ts = self._ts[lo:hi]
+                a = int(np.searchsorted(ts, start_ns, side='left'))
+                b = len(ts) if end_ns is None else int(np.searchsorted(ts, end_ns, side='left'))
+                if b > a:
+                    ts_parts.append(np.array(ts[a:b]))
+                    temp_parts.append(np.array(self._temp[lo + a:lo + b]))
+        if not ts_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return np.concatenate(ts_parts), np.concatenate(temp_parts)
+
+    def window_means(self, start_ns: int, window_ns: int,
+                     end_ns: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Mean per aligned window, stamped at the window stop like Flux aggregateWindow."""
+        ts, temps = self.range(start_ns, end_ns)
+        if len(ts) == 0:
+            return ts, temps.astype(np.float64)
+        bins = ts // window_ns
+        edges = np.flatnonzero(np.diff(bins)) + 1
+        starts = np.concatenate(([0], edges))
+        sums = np.add.reduceat(temps.astype(np.float64), starts)
+        counts = np.diff(np.append(starts, len(ts)))
+        stops = (bins[starts] + 1) * window_ns
+        if end_ns is not None:
+            stops = np.minimum(stops, end_ns)
+        return stops, sums / counts
+
+    def last_above(self, threshold: float, start_ns: int) -> Optional[Tuple[int, float]]:
+        """Newest (timestamp ns, temperature) above threshold since start_ns."""
+        ts, temps = self.range(start_ns)
+        hits = np.flatnonzero(temps > threshold)
+        if len(hits) == 0:
+            return None
+        i = hits[-1]
+        return int(ts[i]), float(temps[i])
+
+
+def parse_line_protocol(payload: str, measurement: str = "temperature_measurement",
+                        field: str = "temperature",
+                        tags: Optional[dict] = None,
+                        rejected: Optional[List[str]] = None) -> Tuple[List[int], List[float]]:
+    """Extract (timestamps ns, values) for one measurement/field from line protocol.
+
+    Only handles the unescaped line protocol written by the logger. Malformed
+    lines are skipped rather than failing the whole payload; pass a list as
+    rejected to collect them.
+    """
+    timestamps, values = [], []
+    for line in payload.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            parts = line.split(' ')
+            if len(parts) != 3:
+                raise ValueError(f"expected 3 space-separated parts, got {len(parts)}")
+            series, fields, ts = parts
+            name, *tag_pairs = series.split(',')
+            if name != measurement:
+                continue
+            if tags:
+                line_tags = dict(pair.split('=', 1) for pair in tag_pairs)
+                if any(line_tags.get(k) != v for k, v in tags.items()):
+                    continue
+            for pair in fields.split(','):
+                key, _, value = pair.partition('=')
+                if key == field:
+                    # Convert both before appending either, so a bad value leaves no orphan
+                    t, v = int(ts), float(value.rstrip('i'))
+                    timestamps.append(t)
+                    values.append(v)
+                    break
+        except ValueError:
+            if rejected is not None:
+                rejected.append(line)
+    return timestamps, values
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+TTL + LRU cache for chat tool results.
+
+Entries are keyed by (function name, normalized arguments, time bucket), so a
+repeated question within the same bucket costs no InfluxDB query, and results
+age out after the TTL or when the least recently used entry is evicted.
+SingleFlight lets concurrent identical misses share one upstream query.
+"""
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after ttl seconds."""
+
+    def __init__(self, maxsize=256, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return (True, value) for a live entry, otherwise (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+def cached_tool(cache, bucket_seconds=60):
+    """Cache a tool function's results per normalized arguments and time bucket.
+
+    Results containing an "error" key are not cached.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        def cache_key(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return (fn.__name__, tuple(sorted(bound.arguments.items())), int(time.time() // bucket_seconds))
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = cache_key(*args, **kwargs)
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            value = fn(*args, **kwargs)
+            if not (isinstance(value, dict) and "error" in value):
+                cache.set(key, value)
+            return value
+
+        # Exposed so callers that run the tool some other way can share the cache
+        wrapper.cache = cache
+        wrapper.cache_key = cache_key
+        return wrapper
+    return decorator
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    runs wait and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def do(self, key, fn):
+        """Return (value, shared), where shared is True if another caller did the work."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = SimpleNamespace(done=threading.Event(), value=None, error=None)
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+        try:
+            call.value = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
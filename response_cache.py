@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Cache of chat answers for repeated questions.
+
+Questions are normalized (lowercase, punctuation and filler words removed),
+so "Is the stove hot?" and "is stove hot" share one entry. A near-miss such as
+"is the stove hot right now" is matched by cosine similarity of a local
+hashed n-gram embedding. No model or network call is involved. Questions
+whose numbers or time words differ ("last 24 hours" vs "last 48 hours",
+"today" vs "yesterday", "first" vs "last") never match.
+
+Every entry is tied to a data fingerprint supplied by the caller, such as the
+time bucket of the newest reading. New data changes the fingerprint, so a
+stale answer is never served. Entries also expire after a TTL.
+"""
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+FILLER_WORDS = frozenset(
+    "a an the please can could would you tell me my our is are was were right now currently "
+    "hey hi ok okay so just s".split()
+)
+# Words that change the answer however similar the rest of the question is
+ANCHOR_WORDS = frozenset(
+    "today yesterday tonight morning evening night hour hours day days week weeks month months year "
+    "first last previous next latest oldest highest lowest max min peak average mean hot cold not".split()
+)
+EMBEDDING_DIM = 1024
+
+
+def normalize_question(text):
+    """Lowercase words without punctuation or filler words."""
+    words = re.findall(r"[a-z0-9]+(?:\.[0-9]+)?", (text or "").lower())
+    return " ".join(word for word in words if word not in FILLER_WORDS)
+
+
+def anchors(normalized):
+    """Numbers and anchor words of a normalized question, in order."""
+    return [word for word in normalized.split() if word in ANCHOR_WORDS or word[0].isdigit()]
+
+
+def embed(normalized):
+    """L2-normalized hashed embedding of word unigrams, bigrams and character trigrams."""
+    words = normalized.split()
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    padded = f" {normalized} "
+    features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+    vector = np.zeros(EMBEDDING_DIM)
+    for feature in features:
+        vector[zlib.crc32(feature.encode()) % EMBEDDING_DIM] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class ResponseCache:
+    """Thread-safe LRU of answers keyed by normalized question and data fingerprint."""
+
+    def __init__(self, maxsize=256, ttl=300.0, similarity=0.9):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.similarity = similarity
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+
+    def get(self, question, fingerprint):
+        """Cached entry ({"answer", "latency_ms", "question", "similarity"}) or None."""
+        normalized = normalize_question(question)
+        if not normalized:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry["expires"] <= now]:
+                del self._entries[key]
+            entry = self._entries.get((normalized, fingerprint))
+            similarity = 1.0
+            if entry is None and self.similarity < 1.0:
+                entry, similarity = self._nearest(normalized, fingerprint)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((entry["normalized"], fingerprint))
+            if similarity == 1.0:
+                self.exact_hits += 1
+            else:
+                self.similar_hits += 1
+            self.saved_ms += entry["latency_ms"]
+            return {"answer": entry["answer"], "latency_ms": entry["latency_ms"],
+                    "question": entry["question"], "similarity": round(similarity, 3)}
+
+    def _nearest(self, normalized, fingerprint):
+        required = anchors(normalized)
+        candidates = [entry for (_, entry_fingerprint), entry in self._entries.items()
+                      if entry_fingerprint == fingerprint and entry["anchors"] == required]
+        if not candidates:
+            return None, 0.0
+        scores = np.stack([entry["vector"] for entry in candidates]) @ embed(normalized)
+        best = int(scores.argmax())
+        if scores[best] < self.similarity:
+            return None, 0.0
+        return candidates[best], float(scores[best])
+
+    def set(self, question, fingerprint, answer, latency_ms):
+        """Store the answer to question, produced in latency_ms, under fingerprint."""
+        normalized = normalize_question(question)
+        if not normalized or not answer:
+            return
+        with self._lock:
+            self._entries[(normalized, fingerprint)] = {
+                "question": question,
+                "normalized": normalized,
+                "anchors": anchors(normalized),
+                "vector": embed(normalized),
+                "answer": answer,
+                "latency_ms": latency_ms,
+                "expires": time.monotonic() + self.ttl
+            }
+            self._entries.move_to_end((normalized, fingerprint))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits
+            lookups = hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": hits,
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else None,
+                "saved_ms": round(self.saved_ms, 1)
+            }
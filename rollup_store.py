@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Multi-resolution rollups of the catalyst temperature.
+
+Readings are folded into aligned 1-minute, 5-minute, 1-hour and 1-day windows
+of min/max/sum/count as they arrive. Each batch is one upsert per touched
+window, so the tiers are always current and never rebuilt. A history query
+first picks a window that keeps the result within a point budget. It then
+reads the coarsest tier that divides that window, so a whole season comes
+back from a few hundred daily rows instead of millions of readings.
+
+Windows are UTC-aligned like Flux aggregateWindow and stamped at their stop.
+Fine tiers are pruned after a retention period. Each tier covers the range
+from the later of the first ingested reading and its retention cutoff.
+"""
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+NS_PER_S = 1_000_000_000
+
+# (name, seconds) from finest to coarsest
+TIERS = (("1m", 60), ("5m", 300), ("1h", 3600), ("1d", 86400))
+
+# Query windows offered by history_window, in seconds
+WINDOWS = (("1m", 60), ("5m", 300), ("15m", 900), ("30m", 1800), ("1h", 3600), ("2h", 7200),
+           ("3h", 10800), ("4h", 14400), ("6h", 21600), ("12h", 43200), ("1d", 86400),
+           ("2d", 172800), ("7d", 604800))
+
+# Seconds each tier is kept; None keeps it forever
+DEFAULT_RETENTION = {60: 14 * 86400, 300: 120 * 86400, 3600: None, 86400: None}
+
+
+def history_window(seconds: float, budget: int) -> Tuple[str, int]:
+    """Smallest query window (name, seconds) that covers `seconds` in at most `budget` points."""
+    for name, window in WINDOWS:
+        if seconds / window <= budget:
+            return name, window
+    return WINDOWS[-1]
+
+
+class RollupStore:
+    """SQLite table of min/max/sum/count per tier and aligned window start.
+
+    Readings at or before the newest one already ingested are skipped, so
+    retried uploads are not counted twice.
+    """
+
+    def __init__(self, path: str, retention: Optional[Dict[int, Optional[float]]] = None):
+        self.path = path
+        self.retention = dict(DEFAULT_RETENTION if retention is None else retention)
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rollups ("
+            " period INTEGER NOT NULL,"
+            " start INTEGER NOT NULL,"
+            " min REAL NOT NULL,"
+            " max REAL NOT NULL,"
+            " sum REAL NOT NULL,"
+            " count INTEGER NOT NULL,"
+            " PRIMARY KEY (period, start)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rollup_meta (id INTEGER PRIMARY KEY CHECK (id = 0),"
+            " first_ns INTEGER NOT NULL, last_ns INTEGER NOT NULL)"
+        )
+
+    def _meta(self) -> Optional[Tuple[int, int]]:
+        return self._conn.execute("SELECT first_ns, last_ns FROM rollup_meta WHERE id = 0").fetchone()
+
+    def has_data(self) -> bool:
+        with self._lock:
+            return self._meta() is not None
+
+    def ingest(self, timestamps_ns, temperatures) -> int:
+        """Fold readings (epoch ns, °F) into every tier; returns how many were new."""
+        ts = np.asarray(timestamps_ns, dtype=np.int64)
+        temps = np.asarray(temperatures, dtype=np.float64)
+        order = np.argsort(ts, kind="stable")
+        ts, temps = ts[order], temps[order]
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                meta = self._meta()
+                if meta is not None:
+                    new = ts > meta[1]
+                    ts, temps = ts[new], temps[new]
+                if len(ts) == 0:
+                    self._conn.execute("COMMIT")
+                    return 0
+                seconds = ts // NS_PER_S
+                for _, period in TIERS:
+                    starts = seconds - seconds % period
+                    first = np.concatenate(([0], np.flatnonzero(np.diff(starts)) + 1))
+                    self._conn.executemany(
+                        "INSERT INTO rollups (period, start, min, max, sum, count) VALUES (?, ?, ?, ?, ?, ?)"
+                        " ON CONFLICT (period, start) DO UPDATE SET"
+                        " min = MIN(min, excluded.min), max = MAX(max, excluded.max),"
+                        " sum = sum + excluded.sum, count = count + excluded.count",
+                        zip([period] * len(first), starts[first].tolist(),
+                            np.minimum.reduceat(temps, first).tolist(),
+                            np.maximum.reduceat(temps, first).tolist(),
+                            np.add.reduceat(temps, first).tolist(),
+                            np.diff(np.append(first, len(ts))).tolist())
+                    )
+                self._conn.execute(
+                    "INSERT INTO rollup_meta (id, first_ns, last_ns) VALUES (0, ?, ?)"
+                    " ON CONFLICT (id) DO UPDATE SET last_ns = excluded.last_ns",
+                    (int(ts[0]), int(ts[-1]))
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            if time.time() - self._last_prune > 3600:
+                self._prune(time.time())
+        return len(ts)
+
+    def _prune(self, now: float):
+        for period, keep in self.retention.items():
+            if keep is not None:
+                self._conn.execute("DELETE FROM rollups WHERE period = ? AND start < ?", (period, int(now - keep)))
+        self._last_prune = now
+
+    def tier_start(self, period: int) -> Optional[float]:
+        """Epoch seconds from which a tier holds every window, or None when empty."""
+        with self._lock:
+            meta = self._meta()
+        if meta is None:
+            return None
+        keep = self.retention.get(period)
+        first = meta[0] / NS_PER_S
+        return first if keep is None else max(first, time.time() - keep)
+
+    def tier_for(self, window: int, start: float) -> Optional[int]:
+        """Coarsest tier period dividing `window` that covers everything since `start`."""
+        for _, period in reversed(TIERS):
+            if window % period == 0:
+                covered = self.tier_start(period)
+                if covered is not None and covered <= start:
+                    return period
+        return None
+
+    def query(self, start: float, stop: float, window: int, period: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Aggregates per aligned `window` seconds between start and stop (epoch seconds).
+
+        Returns arrays "stop" (window stop, epoch seconds), "min", "mean", "max"
+        and "count". Windows without readings are left out. Reads the given
+        tier, or the coarsest one that divides the window.
+        """
+        if period is None:
+            period = next(p for _, p in reversed(TIERS) if window % p == 0)
+        first = int(start) - int(start) % period
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT start, min, max, sum, count FROM rollups"
+                " WHERE period = ? AND start >= ? AND start < ? ORDER BY start",
+                (period, first, int(stop))
+            ).fetchall()
+        if not rows:
+            empty = np.empty(0)
+            return {"stop": empty, "min": empty, "mean": empty, "max": empty, "count": empty}
+        starts, mins, maxs, sums, counts = (np.array(column) for column in zip(*rows))
+        windows = starts - starts % window
+        edges = np.concatenate(([0], np.flatnonzero(np.diff(windows)) + 1))
+        count = np.add.reduceat(counts, edges)
+        return {
+            "stop": np.minimum(windows[edges] + window, stop),
+            "min": np.minimum.reduceat(mins, edges),
+            "mean": np.add.reduceat(sums, edges) / count,
+            "max": np.maximum.reduceat(maxs, edges),
+            "count": count
+        }
+
+    def summary(self) -> List[dict]:
+        """Rows and covered range per tier."""
+        with self._lock:
+            rows = dict(self._conn.execute("SELECT period, COUNT(*) FROM rollups GROUP BY period").fetchall())
+        return [{"tier": name, "rows": rows.get(period, 0), "since": self.tier_start(period)}
+                for name, period in TIERS]
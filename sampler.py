@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Fixed-cadence sampler that decouples sensor reads from logging and uploads.
+
+Reads are scheduled against the monotonic clock (tick n fires at
+start + n * interval) so slow reads or I/O never accumulate drift. Each sample
+is stamped with the wall-clock time it was taken and handed to the consumer
+through a bounded queue; when the consumer falls behind the oldest sample is
+dropped. Ticks that pass while a read is still running are skipped and counted
+rather than fired late in a burst.
+"""
+import datetime
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_JITTER = metrics.histogram("stove_sample_jitter_seconds", "Delay of each sample behind its scheduled tick")
+MISSED_TICKS = metrics.counter("stove_sample_missed_ticks_total", "Ticks skipped because a read overran")
+
+
+class Sample(NamedTuple):
+    timestamp: datetime.datetime
+    value: Any
+
+
+class FixedRateSampler:
+    """Run a read function on a drift-free cadence in its own thread."""
+
+    def __init__(self, read_fn: Callable[[], Any], interval: float, max_queue: int = 1000):
+        if interval <= 0:
+            raise ValueError("Sample interval must be positive")
+        self.read_fn = read_fn
+        self.interval = interval
+        self._queue: "queue.Queue[Sample]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.samples = 0
+        self.missed_ticks = 0
+        self.dropped = 0
+        self._jitter_sum = 0.0
+        self._jitter_max = 0.0
+        self._read_time_max = 0.0
+
+    def start(self):
+        """Start sampling in a background thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sensor-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop sampling and wait for the thread to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Sample]:
+        """Return the next sample, or None if none arrived within timeout."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def stats(self) -> dict:
+        """Return sample counts, missed ticks and scheduling jitter (seconds)."""
+        return {
+            "samples": self.samples,
+            "missed_ticks": self.missed_ticks,
+            "dropped": self.dropped,
+            "queue_depth": self._queue.qsize(),
+            "jitter_mean": self._jitter_sum / self.samples if self.samples else 0.0,
+            "jitter_max": self._jitter_max,
+            "read_time_max": self._read_time_max
+        }
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            delay = next_tick - time.monotonic()
+            if delay > 0 and self._stop.wait(delay):
+                break
+
+            started = time.monotonic()
+            timestamp = datetime.datetime.now(datetime.timezone.utc)
+            try:
+                value = self.read_fn()
+            except Exception as e:
+                logger.error(f"Sensor read failed: {e}")
+                value = None
+            finished = time.monotonic()
+
+            jitter = started - next_tick
+            self.samples += 1
+            self._jitter_sum += jitter
+            self._jitter_max = max(self._jitter_max, jitter)
+            SAMPLE_JITTER.observe(jitter)
+            self._read_time_max = max(self._read_time_max, finished - started)
+            self._put(Sample(timestamp, value))
+
+            next_tick += self.interval
+            if finished >= next_tick:
+                missed = int((finished - next_tick) // self.interval) + 1
+                self.missed_ticks += missed
+                MISSED_TICKS.inc(missed)
+                next_tick += missed * self.interval
+
+    def _put(self, sample: Sample):
+        while True:
+            try:
+                self._queue.put_nowait(sample)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Array of MAX31855 thermocouple amplifiers sharing one SPI bus.
+
+Each channel has its own chip-select pin and location tag, configured as a
+comma-separated list of ``pin:location`` pairs, e.g.
+``THERMOCOUPLE_CHANNELS=D5:catalyst,D6:flue,D13:stovetop,D19:room``.
+
+All channels are read in a single pass. A failing channel retries immediately
+a couple of times and then backs off exponentially, skipping its reads until
+the backoff expires, so one bad probe never delays the others.
+
+The board layer is injected through a hardware object, so the array can run
+on a plain Linux box with a stand-in for the Blinka/Adafruit modules.
+"""
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+READ_SECONDS = metrics.histogram("stove_sensor_read_seconds", "Thermocouple read latency per attempt", ["location"])
+READ_RETRIES = metrics.counter("stove_sensor_read_retries_total", "Thermocouple reads retried after a failure", ["location"])
+READ_FAILURES = metrics.counter("stove_sensor_read_failures_total", "Thermocouple reads failing every retry", ["location"])
+
+DEFAULT_CHANNELS = "D5:catalyst"
+
+
+def parse_channel_config(config: str) -> List[Tuple[str, str]]:
+    """Parse ``pin:location`` pairs into a list of (pin, location) tuples."""
+    channels = []
+    for entry in config.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        pin, sep, location = entry.partition(':')
+        if not sep or not pin.strip() or not location.strip():
+            raise ValueError(f"Invalid thermocouple channel '{entry}', expected pin:location")
+        channels.append((pin.strip(), location.strip()))
+
+    locations = [location for _, location in channels]
+    if len(set(locations)) != len(locations):
+        raise ValueError("Thermocouple locations must be unique")
+    if not channels:
+        raise ValueError("No thermocouple channels configured")
+    return channels
+
+
+class Max31855Hardware:
+    """Blinka-backed hardware layer; imports the board modules on first use."""
+
+    def __init__(self):
+        import board
+        import busio
+        import digitalio
+        import adafruit_max31855
+        self._board = board
+        self._digitalio = digitalio
+        self._driver = adafruit_max31855.MAX31855
+        self._spi = busio.SPI(board.SCK, MOSI=board.MOSI, MISO=board.MISO)
+
+    def open_sensor(self, pin: str):
+        """Return a MAX31855 driver on the shared bus for the given chip-select pin."""
+        cs = self._digitalio.DigitalInOut(getattr(self._board, pin))
+        return self._driver(self._spi, cs)
+
+
+class ThermocoupleChannel:
+    """One thermocouple with non-blocking retry and exponential backoff.
+
+    A read tries the sensor once plus up to retry_count retries before the
+    channel backs off.
+    """
+
+    def __init__(self, location: str, sensor, retry_count: int = 2,
+                 base_backoff: float = 1.0, max_backoff: float = 60.0):
+        self.location = location
+        self.sensor = sensor
+        self.retry_count = retry_count
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.consecutive_failures = 0
+        self.failures = 0
+        self.next_attempt = 0.0
+
+    def read(self, now: float) -> Optional[float]:
+        """Read the temperature in °F, or None if the channel is failing or backing off."""
+        if now < self.next_attempt:
+            return None
+
+        error = None
+        for attempt in range(self.retry_count + 1):
+            if attempt:
+                READ_RETRIES.inc(location=self.location)
+            try:
+                with READ_SECONDS.time(location=self.location):
+                    temp_c = self.sensor.temperature
+                self.consecutive_failures = 0
+                return (temp_c * 9/5) + 32
+            except Exception as e:
+                error = e
+
+        self.failures += 1
+        READ_FAILURES.inc(location=self.location)
+        self.consecutive_failures += 1
+        backoff = min(self.base_backoff * 2 ** (self.consecutive_failures - 1), self.max_backoff)
+        self.next_attempt = now + backoff
+        logger.warning(f"Thermocouple '{self.location}' read failed, backing off {backoff:.0f}s: {error}")
+        return None
+
+
+class SensorArray:
+    """Reads every configured thermocouple channel in one pass."""
+
+    def __init__(self, channels: List[ThermocoupleChannel]):
+        self.channels = channels
+
+    @classmethod
+    def from_config(cls, config: str, hardware=None) -> "SensorArray":
+        """Build an array from a ``pin:location`` config string."""
+        if hardware is None:
+            hardware = Max31855Hardware()
+        channels = [
+            ThermocoupleChannel(location, hardware.open_sensor(pin))
+            for pin, location in parse_channel_config(config)
+        ]
+        return cls(channels)
+
+    def read_all(self) -> Dict[str, Optional[float]]:
+        """Return {location: temperature °F or None} for every channel."""
+        now = time.monotonic()
+        return {channel.location: channel.read(now) for channel in self.channels}
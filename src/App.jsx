@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import {
   LineChart,
   Line,
@@ -11,18 +11,18 @@ import {
   ReferenceArea,
   Area
 } from 'recharts';
-import { fetchTemperatureData, getTemperatureStats } from './influxService';
+import { fetchTemperatureData, getTemperatureStats, subscribeTemperatureUpdates } from './influxService';
 import ChatWidget from './ChatWidget';
 import PredictionPanel from './PredictionPanel';
-import { trainModel, generatePrediction, formatPredictions, calculateConfidenceBands, disposeModel } from './predictionModel';
+import { requestPrediction, formatPredictions, formatConfidenceBands } from './predictionModel';
 import { analyzePrediction, generatePredictionSummary, generateQuickSummary, formatForChatAssistant } from './predictionAnalyzer';
 
 function App() {
   const [temperatureData, setTemperatureData] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
-  const [pollingInterval, setPollingInterval] = useState(30); // seconds
-  const [isPolling, setIsPolling] = useState(true);
+  const [isLive, setIsLive] = useState(true);
+  const [liveSince, setLiveSince] = useState(null);
   const [lastUpdate, setLastUpdate] = useState(null);
   const [timeWindow, setTimeWindow] = useState(24); // hours
   const [isDarkMode, setIsDarkMode] = useState(false);
@@ -34,14 +34,16 @@ function App() {
   const [selectedData, setSelectedData] = useState(null);
   const [predictedData, setPredictedData] = useState([]);
   const [confidenceBands, setConfidenceBands] = useState([]);
-  const [trainedModel, setTrainedModel] = useState(null);
   const [isTraining, setIsTraining] = useState(false);
-  const [trainingProgress, setTrainingProgress] = useState(null);
   const [mouseDownTimestamp, setMouseDownTimestamp] = useState(null);
   const [predictionAnalysis, setPredictionAnalysis] = useState(null);
   const [showAnalysis, setShowAnalysis] = useState(false);
   const [isPredictionPanelExpanded, setIsPredictionPanelExpanded] = useState(false);
 
+  // Running sum/count of live readings per 5-minute chart point, keyed by window stop
+  const liveBuckets = useRef(new Map());
+  const lastLiveReading = useRef(null);
+
   // Fetch real data from InfluxDB
   const fetchData = useCallback(async () => {
     try {
@@ -49,6 +51,9 @@ function App() {
       const data = await fetchTemperatureData(timeWindow); // Use selected time window
       setTemperatureData(data);
       setLastUpdate(new Date());
+      liveBuckets.current = new Map();
+      // Live updates pick up from here
+      setLiveSince(since => since ?? Date.now());
     } catch (err) {
       setError(err.message);
       console.error('Failed to fetch data:', err);
@@ -68,16 +73,61 @@ function App() {
     loadData();
   }, [loadData]);
 
-  // Polling effect
-  useEffect(() => {
-    if (!isPolling) return;
+  // Fold pushed raw readings into the 5-minute points, like aggregateWindow
+  // (points are stamped at the window stop) and drop points older than the window
+  const mergeReadings = useCallback((timestamps, temperatures) => {
+    const bucketMs = 5 * 60 * 1000;
+    lastLiveReading.current = timestamps[timestamps.length - 1];
+    setTemperatureData(data => {
+      const points = [...data];
+      timestamps.forEach((timestamp, i) => {
+        const stop = Math.ceil(timestamp / bucketMs) * bucketMs;
+        const newest = points[points.length - 1];
+        if (newest && newest.timestamp > stop) return; // Older than the chart's newest window
+
+        let bucket = liveBuckets.current.get(stop);
+        if (!bucket) {
+          // A window already loaded from history counts as one reading
+          bucket = newest && newest.timestamp === stop ? { sum: newest.temperature, count: 1 } : { sum: 0, count: 0 };
+          liveBuckets.current.set(stop, bucket);
+        }
+        bucket.sum += temperatures[i];
+        bucket.count += 1;
+
+        const point = {
+          time: new Date(stop).toLocaleTimeString('en-US', { hour12: false, hour: '2-digit', minute: '2-digit' }),
+          temperature: Math.round(bucket.sum / bucket.count * 10) / 10,
+          timestamp: stop
+        };
+        if (newest && newest.timestamp === stop) {
+          points[points.length - 1] = point;
+        } else {
+          points.push(point);
+        }
+      });
+      const cutoff = Date.now() - timeWindow * 60 * 60 * 1000;
+      return points.filter(point => point.timestamp >= cutoff);
+    });
+    setLastUpdate(new Date());
+  }, [timeWindow]);
 
-    const interval = setInterval(() => {
-      loadData();
-    }, pollingInterval * 1000);
+  // Live updates: the backend pushes only new readings; a reset reloads the history
+  useEffect(() => {
+    if (!isLive || liveSince === null) return;
+    // Resubscribing (e.g. after a window change) resumes from the last reading received
+    return subscribeTemperatureUpdates(lastLiveReading.current ?? liveSince, {
+      onPoints: mergeReadings,
+      onReset: fetchData,
+      onError: (err) => console.error('Live updates interrupted:', err)
+    });
+  }, [isLive, liveSince, mergeReadings, fetchData]);
 
-    return () => clearInterval(interval);
-  }, [loadData, isPolling, pollingInterval]);
+  // Retry while the history could not be loaded (e.g. before logging in)
+  useEffect(() => {
+    if (!isLive || !error) return;
+    const retry = setInterval(loadData, 30000);
+    return () => clearInterval(retry);
+  }, [isLive, error, loadData]);
 
   // Get statistics
   const stats = getTemperatureStats(temperatureData);
@@ -132,12 +182,6 @@ function App() {
     setPredictedData([]);
     setConfidenceBands([]);
     setMouseDownTimestamp(null);
-    
-    // Dispose of old model
-    if (trainedModel) {
-      disposeModel(trainedModel);
-      setTrainedModel(null);
-    }
   };
 
   const handleGeneratePrediction = async (params) => {
@@ -147,45 +191,28 @@ function App() {
     }
 
     setIsTraining(true);
-    setTrainingProgress({ epoch: 0, totalEpochs: 50 });
     setPredictedData([]);
     setConfidenceBands([]);
 
     try {
-      // Dispose of old model
-      if (trainedModel) {
-        disposeModel(trainedModel);
-      }
-
-      // Train model on selected data
-      const model = await trainModel(selectedData, (progress) => {
-        setTrainingProgress(progress);
-      });
-      
-      setTrainedModel(model);
-
-      // Generate prediction
-      const predictions = await generatePrediction(
-        model,
+      // Train on the selected data and predict on the backend
+      const result = await requestPrediction(
+        selectedData,
         temperatureData,
         params.outdoorTemp,
         params.fillLevel,
         params.woodBTU,
         params.predictionHours
       );
+      const predictions = result.predictions;
 
-      // Format predictions for chart
-      const lastDataPoint = temperatureData[temperatureData.length - 1];
-      const intervalMs = 5 * 60 * 1000; // 5 minutes
-      const formattedPredictions = formatPredictions(
-        predictions,
-        lastDataPoint.timestamp + intervalMs // Start from next interval
-      );
+      // Format predictions for chart (starting at the next interval)
+      const formattedPredictions = formatPredictions(predictions, result.start);
 
       setPredictedData(formattedPredictions);
 
-      // Calculate confidence bands
-      const bands = calculateConfidenceBands(predictions);
+      // Confidence bands from the backend's ensemble
+      const bands = formatConfidenceBands(result);
       setConfidenceBands(bands);
 
       // Generate analysis
@@ -210,7 +237,6 @@ function App() {
       alert(`Prediction failed: ${error.message}`);
     } finally {
       setIsTraining(false);
-      setTrainingProgress(null);
     }
   };
 
@@ -317,25 +343,10 @@ function App() {
           <label style={{ display: 'flex', alignItems: 'center', gap: '8px' }}>
             <input
               type="checkbox"
-              checked={isPolling}
-              onChange={(e) => setIsPolling(e.target.checked)}
+              checked={isLive}
+              onChange={(e) => setIsLive(e.target.checked)}
             />
-            Auto-refresh
-          </label>
-
-          <label style={{ display: 'flex', alignItems: 'center', gap: '8px' }}>
-            <span>Interval:</span>
-            <select
-              value={pollingInterval}
-              onChange={(e) => setPollingInterval(Number(e.target.value))}
-              disabled={!isPolling}
-            >
-              <option value={10}>10s</option>
-              <option value={30}>30s</option>
-              <option value={60}>1m</option>
-              <option value={300}>5m</option>
-              <option value={600}>10m</option>
-            </select>
+            Live updates
           </label>
 
           <label style={{ display: 'flex', alignItems: 'center', gap: '8px' }}>
@@ -423,7 +434,6 @@ function App() {
               <PredictionPanel
                 onGeneratePrediction={handleGeneratePrediction}
                 isTraining={isTraining}
-                trainingProgress={trainingProgress}
                 isPredictionMode={isPredictionMode}
                 onTogglePredictionMode={handleTogglePredictionMode}
                 hasSelection={selectedData !== null}
@@ -1,9 +1,21 @@
 import React, { useState, useEffect, useRef } from 'react';
+import { getAuthHeader } from './authService';
 
 // API URL - uses environment variable in production, localhost in development
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
 console.log('ChatWidget using API_URL:', API_URL);
 
+// Parse one Server-Sent Event block ("event: ...\ndata: ...") from /api/chat/stream
+const parseSSE = (block) => {
+  let event = 'message';
+  let data = '';
+  block.split('\n').forEach(line => {
+    if (line.startsWith('event: ')) event = line.slice(7);
+    else if (line.startsWith('data: ')) data += line.slice(6);
+  });
+  return { event, data: data ? JSON.parse(data) : null };
+};
+
 const ChatWidget = () => {
   const [isOpen, setIsOpen] = useState(false);
   const [messages, setMessages] = useState([
@@ -14,7 +26,7 @@ const ChatWidget = () => {
   ]);
   const [inputValue, setInputValue] = useState('');
   const [isLoading, setIsLoading] = useState(false);
-  const [conversationHistory, setConversationHistory] = useState([]);
+  const [conversationId, setConversationId] = useState(null);
   const [isAuthenticated, setIsAuthenticated] = useState(false);
   const [authPassword, setAuthPassword] = useState('');
   const [showAuthPrompt, setShowAuthPrompt] = useState(false);
@@ -45,18 +57,15 @@ const ChatWidget = () => {
     setIsLoading(true);
 
     try {
-      // Create Basic Auth header
-      const credentials = btoa(`admin:${authPassword}`);
-      
-      const response = await fetch(`${API_URL}/api/chat`, {
+      const response = await fetch(`${API_URL}/api/chat/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
-          'Authorization': `Basic ${credentials}`
+          'Authorization': await getAuthHeader(authPassword)
         },
         body: JSON.stringify({
           message: message,
-          history: conversationHistory
+          conversation_id: conversationId
         })
       });
 
@@ -72,11 +81,38 @@ const ChatWidget = () => {
         return;
       }
 
-      const data = await response.json();
+      if (!response.ok) {
+        throw new Error(`Chat request failed: ${response.status}`);
+      }
+
+      // Show tool progress and answer tokens as they stream in
+      const showAnswer = (content) => setMessages([...newMessages, { role: 'assistant', content }]);
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let answer = '';
 
-      // Add assistant response to UI
-      setMessages([...newMessages, { role: 'assistant', content: data.response }]);
-      setConversationHistory(data.history);
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const blocks = buffer.split('\n\n');
+        buffer = blocks.pop();
+
+        blocks.forEach(block => {
+          const { event, data } = parseSSE(block);
+          if (event === 'token') {
+            answer += data.text;
+            showAnswer(answer);
+          } else if (event === 'tool_call' && !answer) {
+            showAnswer(`Checking ${data.name.replace(/_/g, ' ')}...`);
+          } else if (event === 'done') {
+            setConversationId(data.conversation_id);
+          } else if (event === 'error') {
+            showAnswer(data.message);
+          }
+        });
+      }
 
     } catch (error) {
       setMessages([...newMessages, { 
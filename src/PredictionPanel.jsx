@@ -5,7 +5,6 @@ import { getSpeciesList, calculateMixBTU, normalizeBTU, getDefaultMix } from './
 function PredictionPanel({ 
   onGeneratePrediction, 
   isTraining, 
-  trainingProgress,
   isPredictionMode,
   onTogglePredictionMode,
   hasSelection,
@@ -379,45 +378,10 @@ function PredictionPanel({
             fontWeight: 'bold'
           }}
         >
-          {isTraining ? 'Training Model...' : 'Generate Prediction'}
+          {isTraining ? 'Predicting...' : 'Generate Prediction'}
         </button>
       </div>
 
-      {/* Training Progress */}
-      {isTraining && trainingProgress && (
-        <div style={{ marginTop: '20px' }}>
-          <div style={{ 
-            display: 'flex', 
-            justifyContent: 'space-between',
-            marginBottom: '8px',
-            fontSize: '13px',
-            color: theme.textSecondary
-          }}>
-            <span>Training Progress</span>
-            <span>Epoch {trainingProgress.epoch} / {trainingProgress.totalEpochs}</span>
-          </div>
-          <div style={{
-            width: '100%',
-            height: '8px',
-            backgroundColor: isDarkMode ? '#404040' : '#e9ecef',
-            borderRadius: '4px',
-            overflow: 'hidden'
-          }}>
-            <div style={{
-              width: `${(trainingProgress.epoch / trainingProgress.totalEpochs) * 100}%`,
-              height: '100%',
-              backgroundColor: '#007bff',
-              transition: 'width 0.3s ease'
-            }} />
-          </div>
-          {trainingProgress.loss && (
-            <div style={{ fontSize: '11px', color: theme.textSecondary, marginTop: '4px' }}>
-              Loss: {trainingProgress.loss.toFixed(4)} | Val Loss: {trainingProgress.valLoss?.toFixed(4)}
-            </div>
-          )}
-        </div>
-      )}
-
       {/* Disclaimer */}
       <div style={{
         marginTop: '20px',
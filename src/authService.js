@@ -0,0 +1,43 @@
+// Authorization headers for the chat backend
+// The chat password is exchanged once for a short-lived signed token
+// (/api/token), so the backend skips its slow password hash on later
+// requests. The token is renewed a minute before it expires.
+
+const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
+const RENEW_BEFORE_MS = 60 * 1000;
+
+let current = null;  // { password, token, expiresAt }
+let pending = null;
+
+const requestToken = async (password) => {
+  const response = await fetch(`${API_URL}/api/token`, {
+    method: 'POST',
+    headers: { 'Authorization': `Basic ${btoa(`admin:${password}`)}` }
+  });
+  if (!response.ok) {
+    throw new Error(`Token request failed: ${response.status}`);
+  }
+  const { token, expires_at } = await response.json();
+  return { password, token, expiresAt: expires_at * 1000 };
+};
+
+// Authorization header value for password: a bearer token, or Basic auth when
+// no token could be issued (the request then fails or succeeds as before)
+export const getAuthHeader = async (password = sessionStorage.getItem('chatAuth')) => {
+  if (!password) return null;
+  if (current && current.password === password && current.expiresAt - RENEW_BEFORE_MS > Date.now()) {
+    return `Bearer ${current.token}`;
+  }
+  try {
+    // Concurrent callers share one token request
+    pending = pending || requestToken(password).finally(() => { pending = null; });
+    current = await pending;
+    if (current.password === password) {
+      return `Bearer ${current.token}`;
+    }
+  } catch (error) {
+    current = null;
+    console.error('Error requesting auth token:', error);
+  }
+  return `Basic ${btoa(`admin:${password}`)}`;
+};
@@ -1,91 +1,121 @@
-// InfluxDB API service for querying temperature data
-// This queries InfluxDB directly from the frontend (requires CORS configuration)
-
-const INFLUXDB_CONFIG = {
-  url: import.meta.env.VITE_INFLUXDB_URL || 'https://us-east-1-1.aws.cloud2.influxdata.com',
-  token: import.meta.env.VITE_INFLUXDB_TOKEN,
-  org: import.meta.env.VITE_INFLUXDB_ORG,
-  bucket: import.meta.env.VITE_INFLUXDB_BUCKET || 'temperature_bucket'
-};
+// Temperature data service
+// Queries the chat backend's /api/temperature proxy, which holds the InfluxDB
+// token and shares one cached query between every open dashboard
+
+import { getAuthHeader } from './authService';
+
+const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
 
-// InfluxDB API query to get temperature data
-export const fetchTemperatureData = async (hoursBack = 24) => {
+// Fetch 5-minute means of the catalyst temperature for the last N hours.
+// Uses the chat password from this session (the chat widget stores it after login).
+export const fetchTemperatureData = async (hoursBack = 24, every = '5m') => {
   try {
-    // Calculate time range
-    const startTime = new Date(Date.now() - (hoursBack * 60 * 60 * 1000)).toISOString();
-
-    // InfluxDB Flux query
-    const fluxQuery = `
-      from(bucket: "${INFLUXDB_CONFIG.bucket}")
-        |> range(start: ${startTime})
-        |> filter(fn: (r) => r["_measurement"] == "temperature_measurement")
-        |> filter(fn: (r) => r["location"] == "catalyst")
-        |> filter(fn: (r) => r["_field"] == "temperature")
-        |> aggregateWindow(every: 5m, fn: mean, createEmpty: false)
-        |> yield(name: "mean")
-    `;
-
-    const response = await fetch(`${INFLUXDB_CONFIG.url}/api/v2/query?org=${INFLUXDB_CONFIG.org}`, {
-      method: 'POST',
-      headers: {
-        'Authorization': `Token ${INFLUXDB_CONFIG.token}`,
-        'Content-Type': 'application/vnd.flux',
-        'Accept': 'application/csv'
-      },
-      body: fluxQuery
+    const authorization = await getAuthHeader();
+    if (!authorization) {
+      throw new Error('Log in to the chat assistant to load temperature data');
+    }
+
+    const params = new URLSearchParams({ hours: hoursBack, every, fn: 'mean' });
+    const response = await fetch(`${API_URL}/api/temperature?${params}`, {
+      headers: { 'Authorization': authorization }
     });
 
     if (!response.ok) {
-      throw new Error(`InfluxDB query failed: ${response.status} ${response.statusText}`);
+      const result = await response.json().catch(() => ({}));
+      throw new Error(result.error || `Temperature query failed: ${response.status} ${response.statusText}`);
     }
 
-    const csvData = await response.text();
-    return parseInfluxCSV(csvData);
+    return fromColumns(await response.json());
   } catch (error) {
     console.error('Error fetching temperature data:', error);
     throw error;
   }
 };
 
-// Parse InfluxDB CSV response into chart-friendly format
-const parseInfluxCSV = (csvText) => {
-  const lines = csvText.trim().split('\n');
-  if (lines.length < 2) return [];
-
-  // Skip header lines and parse data
-  const dataLines = lines.filter(line => !line.startsWith('#') && line.trim());
-
-  return dataLines.slice(1).map(line => {
-    const columns = line.split(',');
-
-    if (columns.length < 7) { // Need at least 7 columns now
-      console.warn('Not enough columns:', columns.length, columns);
-      return null;
-    }
-
-    const timestamp = columns[5]; // _time column
-    const temperature = parseFloat(columns[6]); // _value column (corrected index)
-
-    if (!timestamp || isNaN(temperature)) {
-      console.warn('Invalid data - timestamp:', timestamp, 'temperature:', temperature);
-      return null;
-    }
-
-    // Convert timestamp to readable format
-    const date = new Date(timestamp);
-    const timeString = date.toLocaleTimeString('en-US', {
+// Turn the columnar response ({timestamps: [ms], temperatures: [°F]}, sorted
+// by time) into chart-friendly points
+const fromColumns = ({ timestamps, temperatures }) =>
+  timestamps.map((timestamp, i) => ({
+    time: new Date(timestamp).toLocaleTimeString('en-US', {
       hour12: false,
       hour: '2-digit',
       minute: '2-digit'
-    });
+    }),
+    temperature: temperatures[i],
+    timestamp
+  }));
+
+const parseSSE = (block) => {
+  let event = 'message';
+  let data = '';
+  block.split('\n').forEach(line => {
+    if (line.startsWith('event: ')) event = line.slice(7);
+    else if (line.startsWith('data: ')) data += line.slice(6);
+  });
+  return { event, data: data ? JSON.parse(data) : null };
+};
 
-    return {
-      time: timeString,
-      temperature: Math.round(temperature * 10) / 10, // Round to 1 decimal
-      timestamp: date.getTime()
-    };
-  }).filter(item => item !== null)
-  .sort((a, b) => a.timestamp - b.timestamp); // Sort by time
+// Stream new readings pushed by the backend (/api/temperature/live).
+// Calls onPoints(timestamps, temperatures) for each batch of raw readings and
+// onReset() when readings after `since` can no longer be replayed (reload the
+// history). Reconnects with the last timestamp seen, so only missed readings
+// are sent again. Returns a function that stops the stream.
+export const subscribeTemperatureUpdates = (since, { onPoints, onReset, onError }) => {
+  const controller = new AbortController();
+  let last = since;
+
+  const run = async () => {
+    let retryMs = 1000;
+    while (!controller.signal.aborted) {
+      try {
+        const authorization = await getAuthHeader();
+        if (!authorization) {
+          throw new Error('Log in to the chat assistant to receive live updates');
+        }
+        const response = await fetch(`${API_URL}/api/temperature/live?since=${last}`, {
+          headers: { 'Authorization': authorization },
+          signal: controller.signal
+        });
+        if (!response.ok) {
+          throw new Error(`Live updates failed: ${response.status} ${response.statusText}`);
+        }
+        retryMs = 1000;
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let overflow = false;
+        while (!overflow) {
+          const { done, value } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          const blocks = buffer.split('\n\n');
+          buffer = blocks.pop();
+          blocks.forEach(block => {
+            const { event, data } = parseSSE(block);
+            if (event === 'points' && data.timestamps.length) {
+              last = data.timestamps[data.timestamps.length - 1];
+              onPoints(data.timestamps, data.temperatures);
+            } else if (event === 'reset') {
+              onReset();
+            } else if (event === 'overflow') {
+              // We fell behind; reconnect and resume from the last reading
+              overflow = true;
+            }
+          });
+        }
+        reader.cancel().catch(() => {});
+      } catch (error) {
+        if (controller.signal.aborted) return;
+        if (onError) onError(error);
+        await new Promise(resolve => setTimeout(resolve, retryMs));
+        retryMs = Math.min(retryMs * 2, 30000);
+      }
+    }
+  };
+
+  run();
+  return () => controller.abort();
 };
 
 // Get current temperature (latest reading)
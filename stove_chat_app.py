@@ -1,16 +1,42 @@
 #!/usr/bin/env python3
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-from flask_httpauth import HTTPBasicAuth
+from flask_httpauth import HTTPBasicAuth, HTTPTokenAuth, MultiAuth
 from werkzeug.security import generate_password_hash, check_password_hash
 from openai import OpenAI
 import influxdb_client
 from influxdb_client.client.query_api import QueryApi
 import os
 import json
-from datetime import datetime, timedelta
+import time
+import queue
+import functools
+import hashlib
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 from pathlib import Path
+from types import SimpleNamespace
+import numpy as np
+from alerts import AlertLog, Rule
+from burn_prediction import INTERVAL_MS, BurnPredictor, context_vector
+from burn_sessions import BurnSessionIndex
+from chat_auth import TokenSigner, VerifiedCredentials, derive_secret
+from chat_turn import ChatTurn
+from conversation_store import (MemoryConversationStore, SQLiteConversationStore,
+                                compact_history, new_conversation_id)
+from downsample import downsample
+from edge_reduction import ROLLUP_MEASUREMENT
+from history_archive import FORMATS, MEDIA_TYPES, check_measurements, parse_time, require_pyarrow, stream_export
+from live_feed import OVERFLOW, LiveFeed
+from local_store import NS_PER_S, RingStore, parse_line_protocol
+import metrics
+from query_cache import SingleFlight, TTLCache, cached_tool
+from response_cache import ResponseCache
+from rollup_store import RollupStore, history_window
+from temperature_stats import PERCENTILES, summarize
+from tool_encoding import encode_result
 
 # Load environment variables
 env_path = Path(__file__).parent / '.env'
@@ -37,7 +63,10 @@ print("✓ All required environment variables found")
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React app
-auth = HTTPBasicAuth()
+basic_auth = HTTPBasicAuth()
+token_auth = HTTPTokenAuth(scheme='Bearer')
+# Routes accept either Basic credentials or a token from /api/token
+auth = MultiAuth(basic_auth, token_auth)
 client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
 # Store hashed password for authentication
@@ -45,12 +74,39 @@ users = {
     os.getenv('CHAT_USERNAME'): generate_password_hash(os.getenv('CHAT_PASSWORD'))
 }
 
-@auth.verify_password
+# The password hash is slow by design; tokens and verified credentials skip it after the first check
+auth_secret = derive_secret(os.getenv('CHAT_PASSWORD'), os.getenv('CHAT_TOKEN_SECRET'))
+token_signer = TokenSigner(auth_secret, ttl=float(os.getenv('CHAT_TOKEN_TTL', '3600')))
+verified_credentials = VerifiedCredentials(
+    auth_secret,
+    ttl=float(os.getenv('CHAT_AUTH_CACHE_TTL', '300'))
+)
+
+@basic_auth.verify_password
 def verify_password(username, password):
+    if verified_credentials.contains(username, password):
+        return username
     if username in users and check_password_hash(users.get(username), password):
+        verified_credentials.add(username, password)
         return username
     return None
 
+@token_auth.verify_token
+def verify_token(token):
+    return token_signer.verify(token)
+
+@app.route('/api/token', methods=['POST'])
+@basic_auth.login_required
+def issue_token():
+    """Exchange Basic credentials for a short-lived bearer token."""
+    token, expires = token_signer.issue(basic_auth.current_user())
+    return jsonify({
+        "token": token,
+        "token_type": "Bearer",
+        "expires_at": expires,
+        "expires_in": int(token_signer.ttl)
+    })
+
 # InfluxDB setup with increased timeout
 influx_client = influxdb_client.InfluxDBClient(
     url=os.getenv('INFLUXDB_URL'),
@@ -60,6 +116,121 @@ influx_client = influxdb_client.InfluxDBClient(
 )
 query_api = influx_client.query_api()
 
+# Where the seconds of a chat turn go, served in Prometheus format at /metrics
+FLUX_SECONDS = metrics.histogram("stove_flux_query_seconds", "InfluxDB Flux query latency", ["tool"])
+FLUX_FAILURES = metrics.counter("stove_flux_query_failures_total", "Flux queries that raised", ["tool"])
+TOOL_SECONDS = metrics.histogram("stove_tool_seconds", "Chat tool latency, including cached results", ["tool"])
+TOOL_FAILURES = metrics.counter("stove_tool_failures_total", "Chat tool calls that failed or timed out", ["tool"])
+OPENAI_SECONDS = metrics.histogram("stove_openai_completion_seconds", "OpenAI completion latency", ["model", "stream"])
+OPENAI_FAILURES = metrics.counter("stove_openai_failures_total", "OpenAI completions that raised", ["model"])
+OPENAI_TOKENS = metrics.counter("stove_openai_tokens_total", "OpenAI tokens used", ["model", "kind"])
+
+# Tool results are cached per (function, arguments, time bucket)
+query_cache = TTLCache(
+    maxsize=int(os.getenv('QUERY_CACHE_SIZE', '256')),
+    ttl=float(os.getenv('QUERY_CACHE_TTL', '60'))
+)
+
+# Optional local store of recent readings, kept up to date through /api/ingest
+local_store = None
+if os.getenv('LOCAL_STORE_PATH'):
+    local_store = RingStore(
+        os.getenv('LOCAL_STORE_PATH'),
+        capacity=int(os.getenv('LOCAL_STORE_CAPACITY', '1000000'))
+    )
+    print(f"✓ Local store at {local_store.path} ({len(local_store)} readings)")
+
+# Optional index of burn sessions, fed by /api/ingest
+burn_index = None
+if os.getenv('BURN_SESSION_DB'):
+    burn_index = BurnSessionIndex(os.getenv('BURN_SESSION_DB'))
+    if local_store is not None and len(local_store) and not burn_index.has_state():
+        # Detect sessions in the readings the local store already holds
+        ts, temps = local_store.range(0)
+        burn_index.ingest(ts / NS_PER_S, temps)
+    print(f"✓ Burn session index at {burn_index.path}")
+
+# Optional 1m/5m/1h/1d rollups of the catalyst series, fed by /api/ingest
+rollup_store = None
+if os.getenv('ROLLUP_DB'):
+    rollup_store = RollupStore(os.getenv('ROLLUP_DB'))
+    if local_store is not None and len(local_store) and not rollup_store.has_data():
+        rollup_store.ingest(*local_store.range(0))
+    print(f"✓ Rollup store at {rollup_store.path}")
+
+# Optional record of the logger's edge alerts, fed by its webhook sink through /api/alerts
+alert_log = None
+if os.getenv('ALERT_DB'):
+    alert_log = AlertLog(os.getenv('ALERT_DB'))
+    print(f"✓ Alert log at {alert_log.path}")
+
+# Target number of points returned by get_temperature_history. They are
+# picked (LTTB) from HISTORY_OVERSAMPLE times as many finer window averages.
+HISTORY_POINT_BUDGET = int(os.getenv('HISTORY_POINT_BUDGET', '50'))
+HISTORY_OVERSAMPLE = 8
+
+def local_store_covers(seconds_back):
+    """True when the local store holds every reading from the last seconds_back seconds."""
+    return local_store is not None and local_store.covers(time.time_ns() - seconds_back * NS_PER_S)
+
+def ns_to_iso(ns):
+    return datetime.fromtimestamp(ns / NS_PER_S, tz=timezone.utc).isoformat()
+
+def format_session(session):
+    """Burn session row as ISO times and minutes for tool results and the API."""
+    formatted = {
+        "start": ns_to_iso(session["start"] * NS_PER_S),
+        "duration_minutes": round(session["duration"] / 60, 1),
+        "peak_temperature": round(session["peak"], 1),
+        "reloads": session["reloads"]
+    }
+    if "end" in session:
+        formatted["end"] = ns_to_iso(session["end"] * NS_PER_S)
+        formatted["minutes_above_500F"] = round(session["above_500"] / 60, 1)
+    else:
+        formatted["state"] = session["state"]
+        formatted["temperature"] = round(session["temperature"], 1)
+    return formatted
+
+# Read the per-minute rollups written by the logger (EDGE_ROLLUP=true) instead of raw readings
+use_rollups = os.getenv('INFLUXDB_USE_ROLLUPS', 'false').lower() in ('1', 'true', 'yes')
+
+def series_filter(rollup_field, rollups=None):
+    """Flux filters selecting the catalyst series, from the rollups when enabled (or when rollups=True)."""
+    if use_rollups if rollups is None else rollups:
+        measurement, field = ROLLUP_MEASUREMENT, rollup_field
+    else:
+        measurement, field = "temperature_measurement", "temperature"
+    return f'''|> filter(fn: (r) => r["_measurement"] == "{measurement}")
+            |> filter(fn: (r) => r["location"] == "catalyst")
+            |> filter(fn: (r) => r["_field"] == "{field}")'''
+
+def flux_tool(plan):
+    """Run a tool written as a generator that yields Flux queries and receives their results.
+
+    The decorated function runs the queries on the shared sync query_api. The
+    generator itself stays available as .plan so an async server can drive it
+    with an async query client instead.
+    """
+    @functools.wraps(plan)
+    def wrapper(*args, **kwargs):
+        steps = plan(*args, **kwargs)
+        try:
+            query = next(steps)
+            while True:
+                try:
+                    with FLUX_SECONDS.time(tool=plan.__name__):
+                        result = query_api.query(query=query)
+                except Exception as e:
+                    FLUX_FAILURES.inc(tool=plan.__name__)
+                    query = steps.throw(e)
+                else:
+                    query = steps.send(result)
+        except StopIteration as done:
+            return done.value
+    wrapper.plan = plan
+    return wrapper
+
 # Tool definitions for OpenAI (using modern tools API instead of legacy functions)
 tools = [
     {
@@ -78,7 +249,7 @@ tools = [
         "type": "function",
         "function": {
             "name": "get_temperature_history",
-            "description": "Get summarized temperature history for a specified time range. Returns aggregated data points (30-min averages) to show trends without overwhelming detail.",
+            "description": f"Get summarized temperature history for a specified time range, from hours to a whole season. Returns up to {HISTORY_POINT_BUDGET} shape-preserving samples covering the full range, picked from window averages to keep peaks and reloads, so they are at irregular times; the averaging window grows with the range.",
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -95,7 +266,7 @@ tools = [
         "type": "function",
         "function": {
             "name": "get_temperature_stats",
-            "description": "Get statistical analysis (min, max, average) for a time period",
+            "description": "Get statistical analysis (count, min, max, average, standard deviation, 50th/90th/95th percentiles) for a time period",
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -127,17 +298,28 @@ tools = [
     }
 ]
 
+@cached_tool(query_cache, bucket_seconds=5)
+@flux_tool
 def get_current_temperature():
     """Query InfluxDB for the most recent temperature."""
+    if local_store is not None:
+        latest = local_store.latest()
+        if latest and latest[0] >= time.time_ns() - 3600 * NS_PER_S:
+            return {
+                "temperature": round(latest[1], 2),
+                "time": ns_to_iso(latest[0]),
+                "location": "catalyst"
+            }
     try:
         query = f'''
         from(bucket: "{os.getenv('INFLUXDB_BUCKET')}")
             |> range(start: -1h)
             |> filter(fn: (r) => r["_measurement"] == "temperature_measurement")
+            |> filter(fn: (r) => r["location"] == "catalyst")
             |> filter(fn: (r) => r["_field"] == "temperature")
             |> last()
         '''
-        result = query_api.query(query=query)
+        result = yield query
         
         if result and len(result) > 0 and len(result[0].records) > 0:
             record = result[0].records[0]
@@ -150,42 +332,52 @@ def get_current_temperature():
     except Exception as e:
         return {"error": f"Failed to fetch current temperature: {str(e)}"}
 
+@cached_tool(query_cache)
+@flux_tool
 def get_temperature_history(hours=24):
-    """Query InfluxDB for temperature history (summarized to avoid token limits)."""
+    """Query temperature history as about HISTORY_POINT_BUDGET points that keep its peaks and reloads.
+
+    Averages over finer windows are read first and then downsampled with
+    LTTB, so a short reload spike survives instead of vanishing into a wide
+    window mean.
+    """
     try:
-        # Use larger aggregation windows for longer time periods
-        if hours > 48:
-            window = "2h"
-        elif hours > 24:
-            window = "1h"
+        window, window_s = history_window(hours * 3600, HISTORY_POINT_BUDGET * HISTORY_OVERSAMPLE)
+        now = time.time()
+        start = now - hours * 3600
+
+        period = rollup_store.tier_for(window_s, start) if rollup_store is not None else None
+        if period is not None:
+            rollups = rollup_store.query(start, now, window_s, period)
+            stops, means = rollups["stop"], rollups["mean"]
+        elif local_store_covers(hours * 3600):
+            stops, means = local_store.window_means(time.time_ns() - hours * 3600 * NS_PER_S, window_s * NS_PER_S)
+            stops = stops / NS_PER_S
         else:
-            window = "30m"
-        
-        query = f'''
-        from(bucket: "{os.getenv('INFLUXDB_BUCKET')}")
-            |> range(start: -{hours}h)
-            |> filter(fn: (r) => r["_measurement"] == "temperature_measurement")
-            |> filter(fn: (r) => r["_field"] == "temperature")
-            |> aggregateWindow(every: {window}, fn: mean, createEmpty: false)
-            |> limit(n: 50)
-        '''
-        result = query_api.query(query=query)
-        
-        readings = []
-        if result:
-            for table in result:
-                for record in table.records:
-                    readings.append({
-                        "temperature": round(record.get_value(), 2),
-                        "time": record.get_time().isoformat()
-                    })
-        
+            query = f'''
+            from(bucket: "{os.getenv('INFLUXDB_BUCKET')}")
+                |> range(start: -{hours}h)
+                {series_filter("mean")}
+                |> aggregateWindow(every: {window}, fn: mean, createEmpty: false)
+            '''
+            result = yield query
+            points = sorted(
+                (record.get_time().timestamp(), record.get_value())
+                for table in result or [] for record in table.records
+            )
+            stops, means = (np.array(column) for column in zip(*points)) if points else (np.empty(0), np.empty(0))
+
+        keep = downsample(stops, means, HISTORY_POINT_BUDGET)
+        readings = [
+            {"temperature": round(float(means[i]), 2), "time": ns_to_iso(int(stops[i] * NS_PER_S))}
+            for i in keep
+        ]
         return {
-            "readings": readings, 
-            "count": len(readings), 
+            "readings": readings,
+            "count": len(readings),
             "hours": hours,
             "aggregation_window": window,
-            "note": f"Data aggregated in {window} windows for efficiency"
+            "note": f"{len(readings)} of {len(means)} {window} averages, selected to keep peaks and reloads"
         }
     except Exception as e:
         return {
@@ -194,52 +386,104 @@ def get_temperature_history(hours=24):
             "count": 0
         }
 
+@cached_tool(query_cache)
+@flux_tool
 def get_temperature_stats(hours=24):
-    """Query InfluxDB for temperature statistics."""
-    queries = {
-        "mean": f'''
-            from(bucket: "{os.getenv('INFLUXDB_BUCKET')}")
-                |> range(start: -{hours}h)
-                |> filter(fn: (r) => r["_measurement"] == "temperature_measurement")
-                |> filter(fn: (r) => r["_field"] == "temperature")
-                |> mean()
-        ''',
-        "max": f'''
-            from(bucket: "{os.getenv('INFLUXDB_BUCKET')}")
-                |> range(start: -{hours}h)
-                |> filter(fn: (r) => r["_measurement"] == "temperature_measurement")
-                |> filter(fn: (r) => r["_field"] == "temperature")
-                |> max()
-        ''',
-        "min": f'''
-            from(bucket: "{os.getenv('INFLUXDB_BUCKET')}")
-                |> range(start: -{hours}h)
-                |> filter(fn: (r) => r["_measurement"] == "temperature_measurement")
-                |> filter(fn: (r) => r["_field"] == "temperature")
-                |> min()
-        '''
-    }
-    
-    stats = {"hours": hours}
-    for stat_name, query in queries.items():
-        result = query_api.query(query=query)
-        if result and len(result) > 0 and len(result[0].records) > 0:
-            stats[stat_name] = round(result[0].records[0].get_value(), 2)
-    
-    return stats
+    """Temperature statistics (count, mean, min, max, stddev, percentiles) from a single scan.
+
+    Always scans the raw readings, even with INFLUXDB_USE_ROLLUPS: over
+    per-minute means the count, spread and percentiles would all be wrong.
+    """
+    if local_store_covers(hours * 3600):
+        _, temps = local_store.range(time.time_ns() - hours * 3600 * NS_PER_S)
+        return {"hours": hours, **summarize(temps)}
+
+    # One round trip: a single-pass reduce for the moments and extremes, plus
+    # t-digest percentile estimates, each returned as its own yield.
+    quantiles = "\n".join(
+        f'''data |> quantile(q: {q / 100}, method: "estimate_tdigest") |> yield(name: "p{q}")'''
+        for q in PERCENTILES
+    )
+    query = f'''
+        import "math"
 
+        data = from(bucket: "{os.getenv('INFLUXDB_BUCKET')}")
+            |> range(start: -{hours}h)
+            {series_filter("mean", rollups=False)}
+        data
+            |> reduce(
+                identity: {{count: 0.0, sum: 0.0, sumsq: 0.0, min: math.maxfloat, max: -math.maxfloat}},
+                fn: (r, accumulator) => ({{
+                    count: accumulator.count + 1.0,
+                    sum: accumulator.sum + r._value,
+                    sumsq: accumulator.sumsq + r._value * r._value,
+                    min: if r._value < accumulator.min then r._value else accumulator.min,
+                    max: if r._value > accumulator.max then r._value else accumulator.max
+                }})
+            )
+            |> yield(name: "summary")
+        {quantiles}
+    '''
+
+    try:
+        result = yield query
+        stats = {"hours": hours, "count": 0}
+        for table in result:
+            for record in table.records:
+                name = record.values.get("result")
+                if name == "summary":
+                    count = record.values["count"]
+                    if not count:
+                        continue
+                    mean = record.values["sum"] / count
+                    variance = max(record.values["sumsq"] / count - mean * mean, 0.0)
+                    stats.update({
+                        "count": int(count),
+                        "mean": round(mean, 2),
+                        "stddev": round(variance ** 0.5, 2),
+                        "min": round(record.values["min"], 2),
+                        "max": round(record.values["max"], 2)
+                    })
+                elif record.get_value() is not None:
+                    # Percentile yields
+                    stats[name] = round(record.get_value(), 2)
+        return stats
+    except Exception as e:
+        return {"error": f"Failed to fetch stats: {str(e)}", "hours": hours}
+
+@cached_tool(query_cache)
+@flux_tool
 def find_last_fire(days_back=7):
     """Find the last time the stove was used (temperature > 400°F indicates active fire)."""
+    if burn_index is not None:
+        current = burn_index.current()
+        if current is not None:
+            return {"fire_in_progress": True, "current_fire": format_session(current)}
+        last = burn_index.last()
+        if last is not None and last["end"] >= time.time() - days_back * 86400:
+            return {"fire_in_progress": False, "last_fire": format_session(last)}
+    if local_store_covers(days_back * 86400):
+        hit = local_store.last_above(400.0, time.time_ns() - days_back * 86400 * NS_PER_S)
+        if hit:
+            return {
+                "last_fire_time": ns_to_iso(hit[0]),
+                "temperature_at_that_time": round(hit[1], 2),
+                "days_searched": days_back,
+                "note": "Fire detected when temperature exceeded 400°F"
+            }
+        return {
+            "last_fire_time": None,
+            "note": f"No fire detected in the last {days_back} days (no temps > 400°F)"
+        }
     try:
         query = f'''
         from(bucket: "{os.getenv('INFLUXDB_BUCKET')}")
             |> range(start: -{days_back}d)
-            |> filter(fn: (r) => r["_measurement"] == "temperature_measurement")
-            |> filter(fn: (r) => r["_field"] == "temperature")
+            {series_filter("max")}
             |> filter(fn: (r) => r._value > 400.0)
             |> last()
         '''
-        result = query_api.query(query=query)
+        result = yield query
         
         if result and len(result) > 0 and len(result[0].records) > 0:
             record = result[0].records[0]
@@ -259,6 +503,49 @@ def find_last_fire(days_back=7):
             "last_fire_time": None
         }
 
+def get_burn_sessions(days_back=7):
+    """List burn sessions from the session index with their count and average length."""
+    start = time.time() - days_back * 86400
+    summary = burn_index.summary(start)
+    current = burn_index.current()
+    result = {
+        "days_searched": days_back,
+        "fire_count": summary["count"],
+        "sessions": [format_session(session) for session in burn_index.since(start)],
+        "current_fire": format_session(current) if current else None
+    }
+    if summary["count"]:
+        result["average_burn_hours"] = round(summary["average_duration"] / 3600, 2)
+        result["total_burn_hours"] = round(summary["total_duration"] / 3600, 2)
+        result["average_peak_temperature"] = round(summary["average_peak"], 1)
+        result["total_reloads"] = summary["reloads"]
+    return result
+
+def format_alert(alert):
+    """Alert row with an ISO time for tool results and the API."""
+    return {
+        "rule": alert["rule"],
+        "state": alert["state"],
+        "severity": alert["severity"],
+        "temperature": alert["value"],
+        "time": ns_to_iso(alert["time"] * NS_PER_S),
+        "message": alert["message"]
+    }
+
+def get_alerts(hours=24):
+    """Edge alert rules, the alerts firing now and the alerts raised or cleared in the last hours."""
+    recent = alert_log.since(time.time() - hours * 3600)
+    return {
+        "hours": hours,
+        "rules": [
+            {"name": rule["name"], "condition": Rule.from_dict(rule).describe(), "severity": rule.get("severity")}
+            for rule in alert_log.rules()
+        ],
+        "active": [format_alert(alert) for alert in alert_log.active()],
+        "recent": [format_alert(alert) for alert in recent],
+        "count": len(recent)
+    }
+
 # Map function names to actual functions
 available_functions = {
     "get_current_temperature": get_current_temperature,
@@ -267,116 +554,704 @@ available_functions = {
     "find_last_fire": find_last_fire
 }
 
+if burn_index is not None:
+    tools.append({
+        "type": "function",
+        "function": {
+            "name": "get_burn_sessions",
+            "description": "List detected fires (burn sessions) with start, end, duration, peak temperature and reload count, plus the number of fires and average burn length. Use for questions like 'how many fires this week' or 'how long do my burns last'.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "days_back": {
+                        "type": "integer",
+                        "description": "Number of days to look back (default 7)"
+                    }
+                },
+                "required": []
+            }
+        }
+    })
+    available_functions["get_burn_sessions"] = get_burn_sessions
+
+if alert_log is not None:
+    tools.append({
+        "type": "function",
+        "function": {
+            "name": "get_alerts",
+            "description": "List the stove alert rules (over-firing, fast temperature rise, time to reload, fire out), the alerts active right now and the alerts raised or cleared recently. Use for questions like 'any alerts?', 'did it over-fire last night' or 'what alerts are set up'.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "hours": {
+                        "type": "integer",
+                        "description": "Number of hours of alert history to return (default 24)"
+                    }
+                },
+                "required": []
+            }
+        }
+    })
+    available_functions["get_alerts"] = get_alerts
+
+# Model options: "gpt-4o", "gpt-4o-mini", "gpt-4-turbo", "gpt-3.5-turbo", "gpt-5-nano", "gpt-5-mini"
+# Note: Using modern tools API (works with all current models)
+CHAT_MODEL = "gpt-5-mini"  # GPT-5 mini - good balance of speed and capability
+
+SYSTEM_PROMPT = """You are a specialized assistant for wood stove temperature monitoring and operation. 
+The data comes from a K-type thermocouple monitoring the catalyst temperature. 
+You can query current temperatures, historical data, and provide insights about burning efficiency and safety.
+Typical catalyst temperatures range from 500-1500°F during active burning.
+When the stove is not in use, temperatures will be close to room temperature.
+
+SCOPE: You ONLY answer questions about:
+- Wood stove operation, temperature, and safety
+- Burning firewood (techniques, efficiency, problems)
+- Wood species and their burning characteristics
+- Catalyst operation and maintenance
+- Fire management and heating
+
+If asked about anything outside this scope, politely decline and state you only assist with wood stove related questions.
+
+IMPORTANT: Provide direct, concise answers. Answer the question asked, then STOP. 
+Do NOT offer follow-up suggestions, additional options, or ask what they'd prefer next."""
+
+# Tool calls requested in one model turn run concurrently on a shared pool
+MAX_TOOL_ROUNDS = int(os.getenv('CHAT_MAX_TOOL_ROUNDS', '4'))
+TOOL_TIMEOUT = float(os.getenv('CHAT_TOOL_TIMEOUT', '35'))
+# Tokens one tool result may take in the prompt (series are downsampled to fit)
+TOOL_RESULT_TOKEN_BUDGET = int(os.getenv('CHAT_TOOL_TOKEN_BUDGET', '800'))
+tool_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('CHAT_TOOL_WORKERS', '8')),
+    thread_name_prefix="chat-tool"
+)
+
+def execute_tool(function_name, arguments):
+    """Run one tool function from its JSON arguments.
+
+    Returns (result, latency in ms); failures become error results.
+    """
+    started = time.perf_counter()
+    function = available_functions.get(function_name)
+    if function is None:
+        result = {"error": f"Unknown tool: {function_name}"}
+    else:
+        try:
+            function_args = json.loads(arguments) if arguments else {}
+            result = function(**function_args)
+        except Exception as e:
+            result = {"error": f"{function_name} failed: {str(e)}"}
+    return result, (time.perf_counter() - started) * 1000
+
+def record_tool(function_name, result, latency_ms):
+    """Add one tool call to the tool latency and failure metrics."""
+    name = function_name if function_name in available_functions else "unknown"
+    TOOL_SECONDS.observe(latency_ms / 1000, tool=name)
+    if isinstance(result, dict) and "error" in result:
+        TOOL_FAILURES.inc(tool=name)
+
+def run_tool_calls(tool_calls):
+    """Run all tool calls concurrently with a per-call timeout.
+
+    tool_calls are in the assistant message format ({"id", "function": {"name",
+    "arguments"}}). Returns the tool messages (in request order) and per-call
+    timings, which include the result's prompt tokens and the tokens saved by
+    its compact encoding.
+    """
+    started = time.perf_counter()
+    futures = [
+        (tool_call, tool_executor.submit(execute_tool, tool_call["function"]["name"], tool_call["function"]["arguments"]))
+        for tool_call in tool_calls
+    ]
+
+    tool_messages, timings = [], []
+    for tool_call, future in futures:
+        function_name = tool_call["function"]["name"]
+        try:
+            result, latency_ms = future.result(timeout=max(0.0, started + TOOL_TIMEOUT - time.perf_counter()))
+        except FutureTimeoutError:
+            future.cancel()
+            result = {"error": f"{function_name} timed out after {TOOL_TIMEOUT:.0f}s"}
+            latency_ms = TOOL_TIMEOUT * 1000
+        record_tool(function_name, result, latency_ms)
+        content, tokens = encode_result(result, TOOL_RESULT_TOKEN_BUDGET, CHAT_MODEL)
+        timings.append({"name": function_name, "latency_ms": round(latency_ms, 1), **tokens})
+        app.logger.info(f"Tool {function_name} finished in {latency_ms:.0f}ms, "
+                        f"{tokens['tokens']} tokens ({tokens['tokens_saved']} saved)")
+        tool_messages.append({
+            "role": "tool",
+            "tool_call_id": tool_call["id"],
+            "content": content
+        })
+    return tool_messages, timings
+
+# Conversations are kept server-side and referenced by an opaque id
+if os.getenv('CHAT_SESSION_BACKEND', 'memory') == 'sqlite':
+    conversations = SQLiteConversationStore(
+        os.getenv('CHAT_SESSION_DB', 'conversations.db'),
+        ttl=float(os.getenv('CHAT_SESSION_TTL', '86400'))
+    )
+else:
+    conversations = MemoryConversationStore(
+        maxsize=int(os.getenv('CHAT_SESSION_MAX', '1000')),
+        ttl=float(os.getenv('CHAT_SESSION_TTL', '86400'))
+    )
+HISTORY_TOKEN_BUDGET = int(os.getenv('CHAT_HISTORY_TOKEN_BUDGET', '4000'))
+HISTORY_KEEP_TURNS = int(os.getenv('CHAT_HISTORY_KEEP_TURNS', '2'))
+
+def load_conversation(body):
+    """Return (conversation id, compacted history, whether the client sent its own history).
+
+    Clients that still post a full "history" array get it echoed back; others
+    send the "conversation_id" returned by a previous response.
+    """
+    legacy = 'history' in body
+    conversation_id = body.get('conversation_id')
+    history = conversations.load(conversation_id) if conversation_id else None
+    if history is None:
+        if not conversation_id:
+            conversation_id = new_conversation_id()
+        history = body.get('history', []) if legacy else []
+    return conversation_id, compact_history(history, HISTORY_KEEP_TURNS, HISTORY_TOKEN_BUDGET), legacy
+
+def record_completion(seconds, usage, streamed):
+    """Add one completion to the OpenAI latency and token metrics."""
+    OPENAI_SECONDS.observe(seconds, model=CHAT_MODEL, stream=str(streamed).lower())
+    if usage is not None:
+        OPENAI_TOKENS.inc(usage.prompt_tokens, model=CHAT_MODEL, kind="prompt")
+        OPENAI_TOKENS.inc(usage.completion_tokens, model=CHAT_MODEL, kind="completion")
+
+def create_completion(**kwargs):
+    """Non-streaming chat completion with the chat model, recorded in the metrics."""
+    started = time.perf_counter()
+    try:
+        response = client.chat.completions.create(model=CHAT_MODEL, **kwargs)
+    except Exception:
+        OPENAI_FAILURES.inc(model=CHAT_MODEL)
+        raise
+    record_completion(time.perf_counter() - started, response.usage, False)
+    return response
+
+def sse_event(event, data):
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def stream_completion(messages, use_tools):
+    """Stream one completion, yielding ("token", text) and finally ("tool_calls", [...]).
+
+    Tool call fragments are reassembled into SimpleNamespace objects shaped like
+    the non-streaming response's tool_calls.
+    """
+    kwargs = {"tools": tools, "tool_choice": "auto"} if use_tools else {}
+    started = time.perf_counter()
+    try:
+        stream = client.chat.completions.create(
+            model=CHAT_MODEL,
+            messages=[{"role": "system", "content": SYSTEM_PROMPT}] + messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            **kwargs
+        )
+    except Exception:
+        OPENAI_FAILURES.inc(model=CHAT_MODEL)
+        raise
+    calls = {}
+    usage = None
+    try:
+        for chunk in stream:
+            # The final chunk carries the token usage and no choices
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                yield "token", delta.content
+            for fragment in delta.tool_calls or []:
+                call = calls.setdefault(fragment.index, SimpleNamespace(
+                    id="", function=SimpleNamespace(name="", arguments="")
+                ))
+                if fragment.id:
+                    call.id = fragment.id
+                if fragment.function and fragment.function.name:
+                    call.function.name += fragment.function.name
+                if fragment.function and fragment.function.arguments:
+                    call.function.arguments += fragment.function.arguments
+    except Exception:
+        OPENAI_FAILURES.inc(model=CHAT_MODEL)
+        raise
+    finally:
+        # Closing the stream aborts the upstream request if the client went away
+        stream.close()
+        record_completion(time.perf_counter() - started, usage, True)
+    yield "tool_calls", [calls[i] for i in sorted(calls)]
+
+# New readings pushed to open dashboards
+live_feed = LiveFeed(
+    max_batches=int(os.getenv('LIVE_FEED_BUFFER', '64')),
+    history=int(os.getenv('LIVE_FEED_HISTORY', '2048'))
+)
+LIVE_KEEPALIVE = float(os.getenv('LIVE_FEED_KEEPALIVE', '15'))
+
+def local_store_since(since_ms):
+    ts, temps = local_store.range((since_ms + 1) * 1_000_000)
+    return ts // 1_000_000, temps
+
+@app.route('/api/ingest', methods=['POST'])
+@auth.login_required
+def ingest():
+    """Append catalyst readings (InfluxDB line protocol from the logger) to the local store, rollups, session index and live feed."""
+    # Malformed lines are skipped: failing the batch would only make the logger resend it forever
+    rejected = []
+    timestamps, temperatures = parse_line_protocol(
+        request.get_data(as_text=True),
+        tags={"location": "catalyst"},
+        rejected=rejected
+    )
+    result = {"received": len(timestamps)}
+    if rejected:
+        result["rejected"] = len(rejected)
+        print(f"⚠ Skipped {len(rejected)} malformed ingest lines, first: {rejected[0][:200]!r}")
+    if local_store is not None:
+        result["stored"] = local_store.append(timestamps, temperatures)
+    else:
+        # With a local store the feed tails the store instead, which also sees other workers' ingests
+        result["published"] = live_feed.publish([t // 1_000_000 for t in timestamps], temperatures)
+    if rollup_store is not None:
+        result["rolled_up"] = rollup_store.ingest(timestamps, temperatures)
+    if burn_index is not None:
+        order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+        closed = burn_index.ingest([timestamps[i] / NS_PER_S for i in order], [temperatures[i] for i in order])
+        result["sessions_closed"] = len(closed)
+    return jsonify(result)
+
+# Trained prediction models, keyed by their training data
+prediction_models = TTLCache(
+    maxsize=int(os.getenv('PREDICTION_CACHE_SIZE', '32')),
+    ttl=float(os.getenv('PREDICTION_CACHE_TTL', '3600'))
+)
+
+@app.route('/api/predict', methods=['POST'])
+@auth.login_required
+def predict():
+    """Train on a selected burn (or reuse the cached model) and forecast the next hours.
+
+    Returns the forecast with a 90% band from the model's bootstrap ensemble.
+
+    Body: {"training": {"timestamps": [ms...], "temperatures": [...]},
+           "recent": {"timestamps": [...], "temperatures": [...]},
+           "outdoor_temp", "fill_level", "wood_btu", "hours", "utc_offset_minutes"}
+    Readings are the dashboard's 5-minute means.
+    """
+    body = request.get_json()
+    try:
+        training, recent = body['training'], body['recent']
+        train_ts = np.asarray(training['timestamps'], dtype=np.float64)
+        train_temps = np.asarray(training['temperatures'], dtype=np.float64)
+        recent_ts = np.asarray(recent['timestamps'], dtype=np.float64)
+        recent_temps = np.asarray(recent['temperatures'], dtype=np.float64)
+        context = context_vector(float(body.get('outdoor_temp', 32)), float(body.get('fill_level', 75)),
+                                 float(body.get('wood_btu', 0.5)))
+        hours = float(body.get('hours', 8))
+        utc_offset = float(body.get('utc_offset_minutes', 0))
+        for name, ts, temps in (("training", train_ts, train_temps), ("recent", recent_ts, recent_temps)):
+            if ts.ndim != 1 or not len(ts) or ts.shape != temps.shape:
+                raise ValueError(f"{name} timestamps and temperatures must be non-empty and the same length")
+        if not 0 < hours <= 24:
+            raise ValueError("hours must be more than 0 and at most 24")
+        steps = int(hours * 3600 * 1000 // INTERVAL_MS)
+        if steps < 1:
+            raise ValueError(f"hours must cover at least one {INTERVAL_MS // 60000}-minute interval")
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid prediction request: {str(e)}"}), 400
+
+    digest = hashlib.blake2b(train_ts.tobytes() + train_temps.tobytes(), digest_size=16).hexdigest()
+    key = (int(train_ts[0]), int(train_ts[-1]), len(train_ts), digest, utc_offset, steps)
+    started = time.perf_counter()
+    cached, model = prediction_models.get(key)
+    try:
+        if not cached:
+            model = BurnPredictor(horizon=steps).fit(train_ts, train_temps, context, utc_offset)
+            prediction_models.set(key, model)
+        train_ms = (time.perf_counter() - started) * 1000
+        start_ms = float(recent_ts[-1]) + INTERVAL_MS
+        forecast = model.forecast(recent_temps, context, start_ms, steps, utc_offset)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "start": start_ms,
+        "interval_ms": INTERVAL_MS,
+        "predictions": np.round(forecast.predictions, 1).tolist(),
+        "lower": np.round(forecast.lower, 1).tolist(),
+        "upper": np.round(forecast.upper, 1).tolist(),
+        "model": {
+            "cached": cached,
+            "block_steps": model.block,
+            "ensemble": model.ensemble,
+            "training_windows": model.training_windows,
+            "rmse": round(model.rmse, 2),
+            "train_ms": round(train_ms, 1),
+            "total_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+    })
+
+@app.route('/api/sessions', methods=['GET'])
+@auth.login_required
+def sessions():
+    """Burn sessions of the last ?days=7 days with the fire in progress and a summary."""
+    if burn_index is None:
+        return jsonify({"error": "Burn session index is not enabled (set BURN_SESSION_DB)"}), 404
+    days = request.args.get('days', 7, type=float)
+    start = time.time() - days * 86400
+    current = burn_index.current()
+    return jsonify({
+        "current": format_session(current) if current else None,
+        "sessions": [format_session(session) for session in burn_index.since(start)],
+        "summary": burn_index.summary(start)
+    })
+
+@app.route('/api/sessions/last', methods=['GET'])
+@auth.login_required
+def last_session():
+    """The most recently completed burn session."""
+    if burn_index is None:
+        return jsonify({"error": "Burn session index is not enabled (set BURN_SESSION_DB)"}), 404
+    last = burn_index.last()
+    return jsonify({"session": format_session(last) if last else None})
+
+@app.route('/api/alerts', methods=['POST'])
+@auth.login_required
+def record_alert():
+    """Store an alert or the rule list posted by the logger's webhook alert sink."""
+    if alert_log is None:
+        return jsonify({"error": "Alert log is not enabled (set ALERT_DB)"}), 404
+    event = request.get_json(silent=True)
+    try:
+        recorded = isinstance(event, dict) and alert_log.record(event)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not recorded:
+        return jsonify({"error": "Expected an alert or rules event"}), 400
+    return jsonify({"recorded": True})
+
+@app.route('/api/alerts', methods=['GET'])
+@auth.login_required
+def alerts():
+    """Alert rules, active alerts and the alerts of the last ?hours=24 hours."""
+    if alert_log is None:
+        return jsonify({"error": "Alert log is not enabled (set ALERT_DB)"}), 404
+    return jsonify(get_alerts(request.args.get('hours', 24, type=float)))
+
+@app.route('/api/export', methods=['GET'])
+@auth.login_required
+def export_history():
+    """Stream a range of the bucket as a file: ?start=-7d&stop=now&format=parquet|arrow[&measurement=...].
+
+    start and stop are ISO 8601 times, epoch seconds or offsets like -30d.
+    The range is queried a day at a time and written out as it arrives, so
+    memory stays flat however long the range is.
+    """
+    try:
+        require_pyarrow()
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 501
+    fmt = request.args.get('format', 'parquet')
+    try:
+        start_s = parse_time(request.args.get('start', '-1d'))
+        stop_s = parse_time(request.args.get('stop', 'now'))
+    except ValueError:
+        return jsonify({"error": "start and stop must be ISO 8601 times, epoch seconds or offsets like -30d"}), 400
+    if fmt not in FORMATS or not start_s < stop_s:
+        return jsonify({"error": f"format must be one of {', '.join(FORMATS)} and start before stop"}), 400
+    measurements = request.args.getlist('measurement') or None
+    try:
+        check_measurements(measurements)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    chunks = stream_export(query_api, os.getenv('INFLUXDB_BUCKET'), start_s, stop_s, fmt,
+                           measurements=measurements)
+    filename = f"stove-history-{int(start_s)}-{int(stop_s)}.{fmt}"
+    return Response(stream_with_context(chunks), mimetype=MEDIA_TYPES[fmt],
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+# Dashboard series, shared by every viewer: cached per aligned time bucket,
+# with concurrent identical misses coalesced into one InfluxDB query
+TEMPERATURE_WINDOWS = {"1m": 60, "5m": 300, "15m": 900, "30m": 1800, "1h": 3600}
+TEMPERATURE_FUNCTIONS = ("mean", "min", "max", "last")
+TEMPERATURE_MAX_HOURS = 24 * 30
+temperature_bucket = float(os.getenv('TEMPERATURE_CACHE_BUCKET', '30'))
+temperature_cache = TTLCache(
+    maxsize=int(os.getenv('TEMPERATURE_CACHE_SIZE', '64')),
+    ttl=temperature_bucket * 2
+)
+temperature_flights = SingleFlight()
+
+def query_temperature_series(start_s, stop_s, every, fn):
+    """Window aggregates of the catalyst series as (timestamps ms, temperatures) columns."""
+    window_s = TEMPERATURE_WINDOWS[every]
+    period = rollup_store.tier_for(window_s, start_s) if rollup_store is not None and fn != "last" else None
+    if period is not None:
+        rollups = rollup_store.query(start_s, stop_s, window_s, period)
+        return (rollups["stop"] * 1000).astype(np.int64).tolist(), np.round(rollups[fn], 1).tolist(), "rollups"
+    if fn == "mean" and local_store_covers(time.time() - start_s):
+        stops, means = local_store.window_means(int(start_s * NS_PER_S), window_s * NS_PER_S,
+                                                int(stop_s * NS_PER_S))
+        return (stops // 1_000_000).tolist(), np.round(means, 1).tolist(), "local_store"
+
+    query = f'''
+    from(bucket: "{os.getenv('INFLUXDB_BUCKET')}")
+        |> range(start: {int(start_s)}, stop: {int(stop_s)})
+        {series_filter(fn if fn in ("min", "max") else "mean")}
+        |> aggregateWindow(every: {every}, fn: {fn}, createEmpty: false)
+    '''
+    timestamps, temperatures = [], []
+    for table in query_api.query(query=query):
+        for record in table.records:
+            timestamps.append(int(record.get_time().timestamp() * 1000))
+            temperatures.append(round(record.get_value(), 1))
+    order = np.argsort(timestamps, kind="stable")
+    return [timestamps[i] for i in order], [temperatures[i] for i in order], "influxdb"
+
+@app.route('/api/temperature', methods=['GET'])
+@auth.login_required
+def temperature():
+    """Catalyst temperature for the dashboard: ?hours=24&every=5m&fn=mean[&points=N&downsample=lttb].
+
+    Returns columns {"timestamps": [ms...], "temperatures": [...]} of window
+    aggregates stamped at the window stop, like Flux aggregateWindow. The range
+    ends at the next TEMPERATURE_CACHE_BUCKET boundary, so every viewer polling
+    within one bucket gets the same cached result. With points, the series
+    is reduced to at most that many points with LTTB or per-bucket min/max,
+    which keeps peaks that coarser windows would average away.
+    """
+    hours = request.args.get('hours', 24, type=float)
+    every = request.args.get('every', '5m')
+    fn = request.args.get('fn', 'mean')
+    points = request.args.get('points', type=int)
+    method = request.args.get('downsample', 'lttb')
+    if points is not None and (points < 3 or method not in ("lttb", "minmax")):
+        return jsonify({"error": "points must be at least 3 and downsample one of lttb, minmax"}), 400
+    if every not in TEMPERATURE_WINDOWS or fn not in TEMPERATURE_FUNCTIONS or not 0 < hours <= TEMPERATURE_MAX_HOURS:
+        return jsonify({
+            "error": f"hours must be in (0, {TEMPERATURE_MAX_HOURS}], every one of "
+                     f"{', '.join(TEMPERATURE_WINDOWS)} and fn one of {', '.join(TEMPERATURE_FUNCTIONS)}"
+        }), 400
+
+    stop_s = (time.time() // temperature_bucket + 1) * temperature_bucket
+    start_s = stop_s - hours * 3600
+    key = (hours, every, fn, stop_s)
+    hit, series = temperature_cache.get(key)
+    coalesced = False
+    if not hit:
+        def load():
+            series = query_temperature_series(start_s, stop_s, every, fn)
+            temperature_cache.set(key, series)
+            return series
+        try:
+            series, coalesced = temperature_flights.do(key, load)
+        except Exception as e:
+            return jsonify({"error": f"Failed to fetch temperature data: {str(e)}"}), 502
+
+    timestamps, temperatures, source = series
+    total = len(timestamps)
+    if points is not None and total > points:
+        keep = downsample(timestamps, temperatures, points, method).tolist()
+        timestamps = [timestamps[i] for i in keep]
+        temperatures = [temperatures[i] for i in keep]
+    return jsonify({
+        "start": int(start_s * 1000),
+        "stop": int(stop_s * 1000),
+        "every": every,
+        "fn": fn,
+        "count": len(timestamps),
+        "total": total,
+        "timestamps": timestamps,
+        "temperatures": temperatures,
+        "source": source,
+        "cached": hit,
+        "coalesced": coalesced
+    })
+
+@app.route('/api/temperature/live', methods=['GET'])
+@auth.login_required
+def temperature_live():
+    """Server-Sent Events stream of new catalyst readings: ?since=<ms of the last reading seen>.
+
+    Starts with a "points" event backfilling readings after since (or a
+    "reset" event when they are no longer available and the client should
+    reload /api/temperature), then one "points" event per new batch. Clients
+    that fall behind get an "overflow" event and should reconnect with since.
+    """
+    since = request.args.get('since', type=int)
+    if local_store is not None:
+        live_feed.tail(local_store_since)
+    subscriber = live_feed.subscribe()
+
+    def generate():
+        last = since if since is not None else int(time.time() * 1000)
+        try:
+            if since is not None:
+                if local_store is not None and local_store.covers((since + 1) * 1_000_000):
+                    backfill = tuple(column.tolist() for column in local_store_since(since))
+                else:
+                    backfill = live_feed.since(since)
+                if backfill is None:
+                    yield sse_event("reset", {"since": since})
+                elif backfill[0]:
+                    timestamps, temperatures = backfill
+                    last = timestamps[-1]
+                    yield sse_event("points", {"timestamps": timestamps,
+                                               "temperatures": [round(t, 1) for t in temperatures]})
+            while True:
+                try:
+                    batch = subscriber.get(timeout=LIVE_KEEPALIVE)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if batch is OVERFLOW:
+                    yield sse_event("overflow", {"since": last})
+                    return
+                # Skip readings the backfill already sent
+                timestamps, temperatures = batch
+                start = next((i for i, t in enumerate(timestamps) if t > last), len(timestamps))
+                if start < len(timestamps):
+                    last = timestamps[-1]
+                    yield sse_event("points", {"timestamps": timestamps[start:], "temperatures": temperatures[start:]})
+        finally:
+            live_feed.unsubscribe(subscriber)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# Answers to repeated opening questions, valid until newer readings arrive
+response_cache = None
+if int(os.getenv('RESPONSE_CACHE_SIZE', '256')) > 0:
+    response_cache = ResponseCache(
+        maxsize=int(os.getenv('RESPONSE_CACHE_SIZE', '256')),
+        ttl=float(os.getenv('RESPONSE_CACHE_TTL', '300')),
+        similarity=float(os.getenv('RESPONSE_CACHE_SIMILARITY', '0.9'))
+    )
+RESPONSE_CACHE_BUCKET = float(os.getenv('RESPONSE_CACHE_BUCKET', '60'))
+
+def data_fingerprint():
+    """Time bucket of the newest reading, or of the clock when nothing is ingested here."""
+    newest_s = None
+    if local_store is not None and local_store.latest() is not None:
+        newest_s = local_store.latest()[0] / NS_PER_S
+    elif live_feed.newest_ms() is not None:
+        newest_s = live_feed.newest_ms() / 1000
+    if newest_s is None:
+        newest_s = time.time()
+    return int(newest_s // RESPONSE_CACHE_BUCKET)
+
+def lookup_response(message, history):
+    """Return (fingerprint, cached answer or None) for a conversation's opening question.
+
+    Follow-ups depend on the earlier turns and are never cached, which
+    returns (None, None).
+    """
+    if response_cache is None or history or not message:
+        return None, None
+    fingerprint = data_fingerprint()
+    return fingerprint, response_cache.get(message, fingerprint)
+
+@app.route('/metrics', methods=['GET'])
+@auth.login_required
+def prometheus_metrics():
+    """Latency histograms and counters of this worker in the Prometheus text format."""
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/cache/stats', methods=['GET'])
+@auth.login_required
+def cache_stats():
+    """Hit rates of the response, tool result and dashboard caches."""
+    return jsonify({
+        "responses": response_cache.stats() if response_cache is not None else None,
+        "tool_results": query_cache.stats(),
+        "temperature": temperature_cache.stats()
+    })
+
+def start_turn(body):
+    """A ChatTurn for a chat request, using this worker's conversation store and response cache."""
+    user_message = body.get('message')
+    conversation_id, conversation_history, legacy = load_conversation(body)
+    fingerprint, cached = lookup_response(user_message, conversation_history)
+    return ChatTurn(user_message, conversation_id, conversation_history, legacy, fingerprint, cached,
+                    conversations, response_cache, SYSTEM_PROMPT, tools, MAX_TOOL_ROUNDS)
+
+def run_turn(plan):
+    """Drive a ChatTurn plan with the sync OpenAI client and tool pool, yielding its events."""
+    try:
+        step = next(plan)
+        while True:
+            kind, arg = step
+            if kind == "complete":
+                step = plan.send(create_completion(**arg))
+            elif kind == "tools":
+                step = plan.send(run_tool_calls(arg))
+            elif kind == "stream":
+                with closing(stream_completion(*arg)) as stream:
+                    for item in stream:
+                        step = plan.send(item)
+                        # Each token comes back as a token event; the last item leads to the next step
+                        if item[0] == "token":
+                            yield step
+            else:
+                yield step
+                step = plan.send(None)
+    except StopIteration:
+        return
+
 @app.route('/api/chat', methods=['POST'])
 @auth.login_required
 def chat():
-    user_message = request.json.get('message')
-    conversation_history = request.json.get('history', [])
-    
-    # Add user message to history
-    messages = conversation_history + [{"role": "user", "content": user_message}]
-    
+    turn = start_turn(request.json)
     try:
-        # Initial API call
-        # Model options: "gpt-4o", "gpt-4o-mini", "gpt-4-turbo", "gpt-3.5-turbo", "gpt-5-nano", "gpt-5-mini"
-        # Note: Using modern tools API (works with all current models)
-        response = client.chat.completions.create(
-            model="gpt-5-mini",  # GPT-5 mini - good balance of speed and capability
-            messages=[
-                {"role": "system", "content": """You are a specialized assistant for wood stove temperature monitoring and operation. 
-                The data comes from a K-type thermocouple monitoring the catalyst temperature. 
-                You can query current temperatures, historical data, and provide insights about burning efficiency and safety.
-                Typical catalyst temperatures range from 500-1500°F during active burning.
-                When the stove is not in use, temperatures will be close to room temperature.
-                
-                SCOPE: You ONLY answer questions about:
-                - Wood stove operation, temperature, and safety
-                - Burning firewood (techniques, efficiency, problems)
-                - Wood species and their burning characteristics
-                - Catalyst operation and maintenance
-                - Fire management and heating
-                
-                If asked about anything outside this scope, politely decline and state you only assist with wood stove related questions.
-                
-                IMPORTANT: Provide direct, concise answers. Answer the question asked, then STOP. 
-                Do NOT offer follow-up suggestions, additional options, or ask what they'd prefer next."""},
-            ] + messages,
-            tools=tools,
-            tool_choice="auto"
-        )
-        
-        response_message = response.choices[0].message
-        
-        # Check if the model wants to call a tool
-        if response_message.tool_calls:
-            # Get the first tool call
-            tool_call = response_message.tool_calls[0]
-            function_name = tool_call.function.name
-            function_args = json.loads(tool_call.function.arguments)
-            
-            # Call the function
-            function_response = available_functions[function_name](**function_args)
-            
-            # Send tool response back to the model
-            messages.append({
-                "role": "assistant",
-                "content": None,
-                "tool_calls": [
-                    {
-                        "id": tool_call.id,
-                        "type": "function",
-                        "function": {
-                            "name": function_name,
-                            "arguments": tool_call.function.arguments
-                        }
-                    }
-                ]
-            })
-            messages.append({
-                "role": "tool",
-                "tool_call_id": tool_call.id,
-                "content": json.dumps(function_response)
-            })
-            
-            # Get final response
-            second_response = client.chat.completions.create(
-                model="gpt-5-mini",  # Same model as initial call
-                messages=[
-                    {"role": "system", "content": """You are a specialized assistant for wood stove temperature monitoring and operation. 
-                    The data comes from a K-type thermocouple monitoring the catalyst temperature. 
-                    You can query current temperatures, historical data, and provide insights about burning efficiency and safety.
-                    Typical catalyst temperatures range from 500-1500°F during active burning.
-                    When the stove is not in use, temperatures will be close to room temperature.
-                    
-                    SCOPE: You ONLY answer questions about:
-                    - Wood stove operation, temperature, and safety
-                    - Burning firewood (techniques, efficiency, problems)
-                    - Wood species and their burning characteristics
-                    - Catalyst operation and maintenance
-                    - Fire management and heating
-                    
-                    If asked about anything outside this scope, politely decline and state you only assist with wood stove related questions.
-                    
-                    IMPORTANT: Provide direct, concise answers. Answer the question asked, then STOP. 
-                    Do NOT offer follow-up suggestions, additional options, or ask what they'd prefer next."""},
-                ] + messages
-            )
-            
-            return jsonify({
-                "response": second_response.choices[0].message.content,
-                "history": messages
-            })
-        
-        return jsonify({
-            "response": response_message.content,
-            "history": messages
-        })
-    
+        # A reply's only event is "done", carrying the response body
+        return jsonify(dict(run_turn(turn.reply()))["done"])
     except Exception as e:
-        return jsonify({
-            "response": f"I encountered an error: {str(e)}",
-            "history": messages
-        }), 500
+        return jsonify(turn.error_body(e)), 500
+
+@app.route('/api/chat/stream', methods=['POST'])
+@auth.login_required
+def chat_stream():
+    """Like /api/chat, but streams tool progress and answer tokens as Server-Sent Events.
+
+    Events: "tool_call" and "tool_result" per tool, "token" per answer fragment,
+    then "done" with the conversation id and timings, or "error".
+    """
+    turn = start_turn(request.json)
+
+    def generate():
+        ttfb_ms = None
+        stream = run_turn(turn.stream())
+        try:
+            for event, data in stream:
+                if ttfb_ms is None:
+                    ttfb_ms = turn.elapsed_ms()
+                    app.logger.info(f"Chat stream first byte after {ttfb_ms:.0f}ms")
+                if event == "done":
+                    data["ttfb_ms"] = round(ttfb_ms, 1)
+                yield sse_event(event, data)
+        except GeneratorExit:
+            app.logger.info("Chat stream cancelled by client")
+            raise
+        except Exception as e:
+            yield sse_event("error", {"message": f"I encountered an error: {str(e)}"})
+        finally:
+            # Closes the in-flight OpenAI stream when the client disconnects
+            stream.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
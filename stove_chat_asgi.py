@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Async (ASGI) serving mode for the chat backend.
+
+/api/chat and /api/chat/stream are served by a Quart app that talks to OpenAI
+through AsyncOpenAI and to InfluxDB through the async query client. Both
+clients keep one pooled set of keep-alive connections shared by every
+request, so a single worker can hold dozens of concurrent chats while they
+wait on the network. The turn logic (see chat_turn), tools, prompts, caches
+and the conversation store are shared with stove_chat_app; this module only
+runs the I/O. Every other route is passed through to the Flask app.
+
+Run with:
+    uvicorn stove_chat_asgi:application --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import time
+
+import httpx
+from asgiref.wsgi import WsgiToAsgi
+from influxdb_client.client.influxdb_client_async import InfluxDBClientAsync
+from openai import AsyncOpenAI
+from quart import Quart, Response, jsonify, request
+
+import stove_chat_app as core
+from tool_encoding import encode_result
+
+quart_app = Quart(__name__)
+flask_app = WsgiToAsgi(core.app)
+
+# Routes served natively by the async app; everything else goes to Flask
+ASYNC_ROUTES = {'/api/chat', '/api/chat/stream'}
+
+# One pooled HTTP client for every OpenAI call made by this worker
+http_client = httpx.AsyncClient(
+    limits=httpx.Limits(
+        max_connections=int(os.getenv('ASYNC_MAX_CONNECTIONS', '100')),
+        max_keepalive_connections=int(os.getenv('ASYNC_MAX_KEEPALIVE', '20'))
+    ),
+    timeout=httpx.Timeout(120.0, connect=10.0)
+)
+openai_client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'), http_client=http_client)
+
+# Created on startup: the async InfluxDB client must be built inside the event loop
+influx_async = None
+async_query_api = None
+
+
+@quart_app.before_serving
+async def startup():
+    global influx_async, async_query_api
+    influx_async = InfluxDBClientAsync(
+        url=os.getenv('INFLUXDB_URL'),
+        token=os.getenv('INFLUXDB_TOKEN'),
+        org=os.getenv('INFLUXDB_ORG'),
+        timeout=30000,
+        connection_pool_maxsize=int(os.getenv('ASYNC_MAX_CONNECTIONS', '100'))
+    )
+    async_query_api = influx_async.query_api()
+
+
+@quart_app.after_serving
+async def shutdown():
+    await http_client.aclose()
+    if influx_async is not None:
+        await influx_async.close()
+
+
+@quart_app.after_request
+async def add_cors_headers(response):
+    # Mirrors flask_cors defaults used by the sync app
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    if request.method == 'OPTIONS':
+        response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
+        requested = request.headers.get('Access-Control-Request-Headers')
+        if requested:
+            response.headers['Access-Control-Allow-Headers'] = requested
+    return response
+
+
+def login_required(view):
+    """Basic or bearer token auth using the sync app's verify_password and verify_token."""
+    @functools.wraps(view)
+    async def wrapper(*args, **kwargs):
+        credentials = request.authorization
+        if credentials is None:
+            user = None
+        elif credentials.type == 'bearer':
+            user = core.verify_token(credentials.token)
+        elif core.verified_credentials.contains(credentials.username, credentials.password):
+            user = credentials.username
+        else:
+            # Password hashing is CPU-bound; keep it off the event loop
+            user = await asyncio.to_thread(core.verify_password, credentials.username, credentials.password)
+        if user:
+            return await view(*args, **kwargs)
+        return Response('Unauthorized Access', 401, {'WWW-Authenticate': 'Basic realm="Authentication Required"'})
+    return wrapper
+
+
+async def run_plan(steps):
+    """Drive a flux_tool generator, running its queries on the async InfluxDB client."""
+    try:
+        query = next(steps)
+        while True:
+            try:
+                with core.FLUX_SECONDS.time(tool=steps.__name__):
+                    result = await async_query_api.query(query=query)
+            except Exception as e:
+                core.FLUX_FAILURES.inc(tool=steps.__name__)
+                query = steps.throw(e)
+            else:
+                query = steps.send(result)
+    except StopIteration as done:
+        return done.value
+
+
+async def execute_tool(function_name, arguments):
+    """Async counterpart of stove_chat_app.execute_tool sharing its result cache."""
+    started = time.perf_counter()
+    function = core.available_functions.get(function_name)
+    if function is None:
+        result = {"error": f"Unknown tool: {function_name}"}
+    else:
+        try:
+            function_args = json.loads(arguments) if arguments else {}
+            cache = getattr(function, "cache", None)
+            hit = False
+            if cache is not None:
+                key = function.cache_key(**function_args)
+                hit, result = cache.get(key)
+            if not hit:
+                plan = getattr(function, "plan", None)
+                if plan is not None:
+                    result = await run_plan(plan(**function_args))
+                else:
+                    # Tools that don't query InfluxDB (e.g. the session index) run on a thread
+                    result = await asyncio.to_thread(function, **function_args)
+                if cache is not None and not (isinstance(result, dict) and "error" in result):
+                    cache.set(key, result)
+        except Exception as e:
+            result = {"error": f"{function_name} failed: {str(e)}"}
+    return result, (time.perf_counter() - started) * 1000
+
+
+async def run_tool_calls(tool_calls):
+    """Run all tool calls concurrently with a per-call timeout."""
+    async def run_one(tool_call):
+        function_name = tool_call["function"]["name"]
+        try:
+            return await asyncio.wait_for(
+                execute_tool(function_name, tool_call["function"]["arguments"]),
+                timeout=core.TOOL_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            return {"error": f"{function_name} timed out after {core.TOOL_TIMEOUT:.0f}s"}, core.TOOL_TIMEOUT * 1000
+
+    results = await asyncio.gather(*(run_one(tool_call) for tool_call in tool_calls))
+    tool_messages, timings = [], []
+    for tool_call, (result, latency_ms) in zip(tool_calls, results):
+        core.record_tool(tool_call["function"]["name"], result, latency_ms)
+        content, tokens = encode_result(result, core.TOOL_RESULT_TOKEN_BUDGET, core.CHAT_MODEL)
+        timings.append({"name": tool_call["function"]["name"], "latency_ms": round(latency_ms, 1), **tokens})
+        tool_messages.append({
+            "role": "tool",
+            "tool_call_id": tool_call["id"],
+            "content": content
+        })
+    return tool_messages, timings
+
+
+async def create_completion(**kwargs):
+    """Async counterpart of stove_chat_app.create_completion."""
+    started = time.perf_counter()
+    try:
+        response = await openai_client.chat.completions.create(model=core.CHAT_MODEL, **kwargs)
+    except Exception:
+        core.OPENAI_FAILURES.inc(model=core.CHAT_MODEL)
+        raise
+    core.record_completion(time.perf_counter() - started, response.usage, False)
+    return response
+
+
+async def stream_completion(messages, use_tools):
+    """Async counterpart of stove_chat_app.stream_completion."""
+    kwargs = {"tools": core.tools, "tool_choice": "auto"} if use_tools else {}
+    started = time.perf_counter()
+    try:
+        stream = await openai_client.chat.completions.create(
+            model=core.CHAT_MODEL,
+            messages=[{"role": "system", "content": core.SYSTEM_PROMPT}] + messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            **kwargs
+        )
+    except Exception:
+        core.OPENAI_FAILURES.inc(model=core.CHAT_MODEL)
+        raise
+    calls = {}
+    usage = None
+    try:
+        async for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                yield "token", delta.content
+            for fragment in delta.tool_calls or []:
+                call = calls.setdefault(fragment.index, core.SimpleNamespace(
+                    id="", function=core.SimpleNamespace(name="", arguments="")
+                ))
+                if fragment.id:
+                    call.id = fragment.id
+                if fragment.function and fragment.function.name:
+                    call.function.name += fragment.function.name
+                if fragment.function and fragment.function.arguments:
+                    call.function.arguments += fragment.function.arguments
+    except Exception:
+        core.OPENAI_FAILURES.inc(model=core.CHAT_MODEL)
+        raise
+    finally:
+        await stream.close()
+        core.record_completion(time.perf_counter() - started, usage, True)
+    yield "tool_calls", [calls[i] for i in sorted(calls)]
+
+
+async def run_turn(plan):
+    """Async counterpart of stove_chat_app.run_turn."""
+    try:
+        step = next(plan)
+        while True:
+            kind, arg = step
+            if kind == "complete":
+                step = plan.send(await create_completion(**arg))
+            elif kind == "tools":
+                step = plan.send(await run_tool_calls(arg))
+            elif kind == "stream":
+                async with contextlib.aclosing(stream_completion(*arg)) as stream:
+                    async for item in stream:
+                        step = plan.send(item)
+                        if item[0] == "token":
+                            yield step
+            else:
+                yield step
+                step = plan.send(None)
+    except StopIteration:
+        return
+
+
+@quart_app.route('/api/chat', methods=['POST'])
+@login_required
+async def chat():
+    turn = core.start_turn(await request.get_json())
+    try:
+        # A reply's only event is "done", carrying the response body
+        return jsonify({event: data async for event, data in run_turn(turn.reply())}["done"])
+    except Exception as e:
+        return jsonify(turn.error_body(e)), 500
+
+
+@quart_app.route('/api/chat/stream', methods=['POST'])
+@login_required
+async def chat_stream():
+    turn = core.start_turn(await request.get_json())
+
+    async def generate():
+        ttfb_ms = None
+        stream = run_turn(turn.stream())
+        try:
+            async for event, data in stream:
+                if ttfb_ms is None:
+                    ttfb_ms = turn.elapsed_ms()
+                if event == "done":
+                    data["ttfb_ms"] = round(ttfb_ms, 1)
+                yield core.sse_event(event, data)
+        except asyncio.CancelledError:
+            quart_app.logger.info("Chat stream cancelled by client")
+            raise
+        except Exception as e:
+            yield core.sse_event("error", {"message": f"I encountered an error: {str(e)}"})
+        finally:
+            # Closes the in-flight OpenAI stream when the client disconnects
+            await stream.aclose()
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.timeout = None
+    return response
+
+
+async def application(scope, receive, send):
+    """ASGI entry point: chat routes run async, the rest are served by the Flask app."""
+    if scope["type"] == "http" and scope["path"] not in ASYNC_ROUTES:
+        await flask_app(scope, receive, send)
+    else:
+        await quart_app(scope, receive, send)
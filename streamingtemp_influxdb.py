@@ -1,16 +1,19 @@
 #!/usr/bin/env python3
 import time
+import base64
 import datetime
 import os
 import logging
-from typing import Optional, Tuple
+from typing import Dict, Optional
 import influxdb_client
 from influxdb_client.client.write_api import SYNCHRONOUS
-import board
-import busio
-import digitalio
-import adafruit_max31855
 from dotenv import load_dotenv
+import metrics
+from alerts import AlertEngine, load_rules, sinks_from_config
+from influx_batch_writer import POINTS_WRITTEN, WRITE_FAILURES, WRITE_SECONDS, BatchWriter, HttpIngestWriteApi
+from edge_reduction import ROLLUP_MEASUREMENT, EdgeReducer
+from sampler import FixedRateSampler
+from sensor_array import DEFAULT_CHANNELS, SensorArray
 
 # Configure logging
 logging.basicConfig(
@@ -22,30 +25,13 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-class TemperatureSensor:
-    def __init__(self, spi: busio.SPI, cs_pin: digitalio.DigitalInOut):
-        """Initialize the MAX31855 temperature sensor."""
-        self.sensor = adafruit_max31855.MAX31855(spi, cs_pin)
-        self.retry_count = 3
-        self.retry_delay = 1  # seconds
-
-    def read_temperature(self) -> Optional[float]:
-        """Read temperature with retry logic."""
-        for attempt in range(self.retry_count):
-            try:
-                temp_c = self.sensor.temperature
-                temp_f = (temp_c * 9/5) + 32
-                return temp_f
-            except Exception as e:
-                logger.warning(f"Temperature reading attempt {attempt + 1} failed: {e}")
-                if attempt < self.retry_count - 1:
-                    time.sleep(self.retry_delay)
-                continue
-        return None
-
 class InfluxDBLogger:
-    def __init__(self):
-        """Initialize InfluxDB connection."""
+    def __init__(self, batching: Optional[bool] = None):
+        """Initialize InfluxDB connection.
+
+        With batching enabled (or INFLUXDB_BATCHING=true) readings are queued
+        and uploaded in batches by a background writer backed by a local spool.
+        """
         self.url = os.getenv('INFLUXDB_URL')
         self.token = os.getenv('INFLUXDB_TOKEN')
         self.org = os.getenv('INFLUXDB_ORG')
@@ -61,62 +47,225 @@ class InfluxDBLogger:
         )
         self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
 
-    def log_temperature(self, temperature: float) -> bool:
-        """Log temperature to InfluxDB."""
-        if not isinstance(temperature, (int, float)):
+        if batching is None:
+            batching = os.getenv('INFLUXDB_BATCHING', 'false').lower() in ('1', 'true', 'yes')
+        self.batch_writer = None
+        if batching:
+            self.batch_writer = BatchWriter(
+                self.write_api,
+                bucket=self.bucket,
+                org=self.org,
+                spool_path=os.getenv('INFLUXDB_SPOOL_PATH', 'influx_spool.db'),
+                batch_size=int(os.getenv('INFLUXDB_BATCH_SIZE', '500')),
+                flush_interval=float(os.getenv('INFLUXDB_FLUSH_INTERVAL', '10')),
+                max_queue=int(os.getenv('INFLUXDB_MAX_QUEUE', '10000'))
+            )
+            self.batch_writer.start()
+
+        # Optionally mirror raw catalyst readings to the chat backend's local store
+        self.ingest_writer = None
+        ingest_url = os.getenv('LOCAL_INGEST_URL')
+        if ingest_url:
+            self.ingest_writer = BatchWriter(
+                HttpIngestWriteApi(
+                    ingest_url,
+                    os.getenv('LOCAL_INGEST_USERNAME', ''),
+                    os.getenv('LOCAL_INGEST_PASSWORD', '')
+                ),
+                bucket=self.bucket,
+                org=self.org,
+                spool_path=os.getenv('LOCAL_INGEST_SPOOL_PATH', 'ingest_spool.db'),
+                flush_interval=float(os.getenv('INFLUXDB_FLUSH_INTERVAL', '10')),
+                name="ingest"
+            )
+            self.ingest_writer.start()
+
+        # Optional edge-side reduction before upload
+        compression = os.getenv('EDGE_COMPRESSION', 'none').lower()
+        rollup = os.getenv('EDGE_ROLLUP', 'false').lower() in ('1', 'true', 'yes')
+        self.reducer = None
+        if compression != 'none' or rollup:
+            self.reducer = EdgeReducer(
+                compression=compression,
+                deviation=float(os.getenv('EDGE_DEVIATION', '1.0')),
+                max_gap=float(os.getenv('EDGE_MAX_GAP', '300')),
+                rollup_period=60.0 if rollup else None
+            )
+
+    def log_temperature(self, temperature: float,
+                        timestamp: Optional[datetime.datetime] = None,
+                        location: str = "catalyst") -> bool:
+        """Log temperature to InfluxDB, stamped with the time it was sampled."""
+        return self.log_readings({location: temperature}, timestamp)
+
+    def log_readings(self, readings: Dict[str, float],
+                     timestamp: Optional[datetime.datetime] = None) -> bool:
+        """Log one reading per location to InfluxDB as a single multi-point batch."""
+        if not readings or not all(isinstance(t, (int, float)) for t in readings.values()):
             logger.error("Invalid temperature value")
             return False
 
+        timestamp = timestamp or datetime.datetime.now(datetime.timezone.utc)
+        if self.ingest_writer is not None and "catalyst" in readings:
+            self.ingest_writer.submit(
+                self._reading_point("catalyst", timestamp, readings["catalyst"]).to_line_protocol()
+            )
+
         try:
-            point = influxdb_client.Point("temperature_measurement") \
-                .tag("location", "catalyst") \
-                .tag("sensor", "k-type-thermocouple") \
-                .field("temperature", float(temperature)) \
-                .time(datetime.datetime.utcnow())
-            
-            self.write_api.write(bucket=self.bucket, record=point)
-            return True
+            if self.reducer is None:
+                points = [
+                    self._reading_point(location, timestamp, temperature)
+                    for location, temperature in readings.items()
+                ]
+            else:
+                raw, windows = self.reducer.process(readings, timestamp)
+                points = self._reduced_points(raw, windows)
+            return self._write_points(points)
         except Exception as e:
             logger.error(f"Failed to write to InfluxDB: {e}")
             return False
 
+    def _reading_point(self, location: str, timestamp: datetime.datetime,
+                       temperature: float) -> influxdb_client.Point:
+        return influxdb_client.Point("temperature_measurement") \
+            .tag("location", location) \
+            .tag("sensor", "k-type-thermocouple") \
+            .field("temperature", float(temperature)) \
+            .time(timestamp)
+
+    def _reduced_points(self, raw, windows) -> list:
+        """Build points for compressed readings and completed rollup windows."""
+        points = [
+            self._reading_point(location, datetime.datetime.fromtimestamp(t, datetime.timezone.utc), value)
+            for location, t, value in raw
+        ]
+        for location, window in windows:
+            points.append(
+                influxdb_client.Point(ROLLUP_MEASUREMENT)
+                    .tag("location", location)
+                    .tag("sensor", "k-type-thermocouple")
+                    .field("min", float(window["min"]))
+                    .field("mean", float(window["mean"]))
+                    .field("max", float(window["max"]))
+                    .field("count", int(window["count"]))
+                    .time(datetime.datetime.fromtimestamp(window["start"], datetime.timezone.utc))
+            )
+        return points
+
+    def _write_points(self, points: list) -> bool:
+        if not points:
+            return True
+        if self.batch_writer is not None:
+            return self.batch_writer.submit("\n".join(p.to_line_protocol() for p in points))
+        try:
+            with WRITE_SECONDS.time(writer="influxdb"):
+                self.write_api.write(bucket=self.bucket, record=points)
+        except Exception:
+            WRITE_FAILURES.inc(writer="influxdb")
+            raise
+        POINTS_WRITTEN.inc(len(points), writer="influxdb")
+        return True
+
+    def stats(self) -> Optional[dict]:
+        """Return batch writer statistics, or None when writing synchronously."""
+        if self.batch_writer is None:
+            return None
+        return self.batch_writer.stats()
+
     def close(self):
         """Close InfluxDB connection."""
+        if self.reducer is not None:
+            try:
+                self._write_points(self._reduced_points(*self.reducer.flush()))
+            except Exception as e:
+                logger.error(f"Failed to write held-back readings: {e}")
+        if self.batch_writer is not None:
+            self.batch_writer.close()
+        if self.ingest_writer is not None:
+            self.ingest_writer.close()
         self.client.close()
 
 def main():
     """Main program loop."""
     try:
         # Initialize hardware
-        spi = busio.SPI(board.SCK, MOSI=board.MOSI, MISO=board.MISO)
-        cs = digitalio.DigitalInOut(board.D5)
-        sensor = TemperatureSensor(spi, cs)
-        logger = InfluxDBLogger()
+        sensors = SensorArray.from_config(os.getenv('THERMOCOUPLE_CHANNELS', DEFAULT_CHANNELS))
+        influx_logger = InfluxDBLogger()
+
+        # Optional edge alert rules, evaluated on every sample before it is uploaded
+        alert_engine = None
+        if os.getenv('ALERT_RULES'):
+            # Webhooks to the chat backend use the same credentials as the local ingest
+            webhook_headers = None
+            if os.getenv('LOCAL_INGEST_USERNAME'):
+                credentials = f"{os.getenv('LOCAL_INGEST_USERNAME')}:{os.getenv('LOCAL_INGEST_PASSWORD', '')}"
+                webhook_headers = {"Authorization": f"Basic {base64.b64encode(credentials.encode()).decode()}"}
+            alert_engine = AlertEngine(
+                load_rules(os.getenv('ALERT_RULES')),
+                sinks_from_config(os.getenv('ALERT_SINKS', 'log'), webhook_headers)
+            )
+
+        # Optional Prometheus scrape port for sensor, write and sampler metrics
+        if os.getenv('METRICS_PORT'):
+            metrics.serve(int(os.getenv('METRICS_PORT')), host=os.getenv('METRICS_HOST', '127.0.0.1'))
+            logger.info(f"Serving metrics on port {os.getenv('METRICS_PORT')}")
 
         logger.info("Starting temperature monitoring...")
         logger.info("Press Ctrl+C to exit")
 
+        sampler = FixedRateSampler(
+            sensors.read_all,
+            interval=float(os.getenv('SAMPLE_INTERVAL', '5'))
+        )
+        sampler.start()
+
+        last_stats = time.monotonic()
         while True:
-            temp_f = sensor.read_temperature()
-            
-            if temp_f is not None:
-                logger.info(f"Temperature: {temp_f:.2f}°F")
-                if logger.log_temperature(temp_f):
-                    logger.info("Data logged successfully")
-                else:
-                    logger.error("Failed to log data")
-            else:
-                logger.error("Failed to read temperature")
-            
-            time.sleep(5)
+            sample = sampler.get(timeout=1.0)
+
+            if sample is not None and sample.value is not None:
+                readings = {loc: temp for loc, temp in sample.value.items() if temp is not None}
+                for location in sample.value:
+                    if location in readings:
+                        logger.info(f"Temperature ({location}): {readings[location]:.2f}°F")
+                    else:
+                        logger.error(f"Failed to read temperature ({location})")
+                if readings and alert_engine is not None:
+                    alert_engine.process(readings, sample.timestamp.timestamp())
+                if readings:
+                    if influx_logger.log_readings(readings, sample.timestamp):
+                        logger.info("Data logged successfully")
+                    else:
+                        logger.error("Failed to log data")
+
+            if time.monotonic() - last_stats >= 60:
+                last_stats = time.monotonic()
+                sampler_stats = sampler.stats()
+                logger.info(
+                    f"Sampler: {sampler_stats['samples']} samples, "
+                    f"{sampler_stats['missed_ticks']} missed ticks, "
+                    f"jitter mean {sampler_stats['jitter_mean'] * 1000:.1f}ms "
+                    f"max {sampler_stats['jitter_max'] * 1000:.1f}ms"
+                )
+                stats = influx_logger.stats()
+                if stats is not None:
+                    logger.info(
+                        f"Write queue: {stats['queue_depth']} queued, "
+                        f"{stats['spool_points']} spooled in {stats['spool_batches']} batches, "
+                        f"last flush {stats['last_flush_latency'] or 0:.3f}s"
+                    )
 
     except KeyboardInterrupt:
         logger.info("Shutting down...")
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
     finally:
-        if 'logger' in locals():
-            logger.close()
+        if 'sampler' in locals():
+            sampler.stop()
+        if 'influx_logger' in locals():
+            influx_logger.close()
+        if locals().get('alert_engine') is not None:
+            alert_engine.close()
 
 if __name__ == "__main__":
     main()
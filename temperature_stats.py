@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Summary statistics for a range of temperature readings.
+
+Used by the chat backend's ``get_temperature_stats`` tool for ranges answered
+from the local store; InfluxDB-backed ranges compute the same fields in a
+single Flux query.
+"""
+import numpy as np
+
+PERCENTILES = (50, 90, 95)
+
+
+def summarize(values):
+    """Return count, mean, min, max, stddev and percentiles of values (°F)."""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return {"count": 0}
+    stats = {
+        "count": int(len(values)),
+        "mean": round(float(values.mean()), 2),
+        "min": round(float(values.min()), 2),
+        "max": round(float(values.max()), 2),
+        "stddev": round(float(values.std()), 2)
+    }
+    for q, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        stats[f"p{q}"] = round(float(value), 2)
+    return stats
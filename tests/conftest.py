@@ -0,0 +1,38 @@
+import base64
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# The modules under test live at the top of the repository
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+CHAT_ENV = {
+    "OPENAI_API_KEY": "test",
+    "INFLUXDB_URL": "http://127.0.0.1:9",
+    "INFLUXDB_TOKEN": "test",
+    "INFLUXDB_ORG": "test",
+    "INFLUXDB_BUCKET": "test",
+    "CHAT_USERNAME": "test",
+    "CHAT_PASSWORD": "test",
+    "QUERY_CACHE_TTL": "0",
+    "RESPONSE_CACHE_SIZE": "0",
+}
+
+
+@pytest.fixture(scope="session")
+def chat_app():
+    """The Flask chat backend, configured without any optional stores and with caching off."""
+    os.environ.update(CHAT_ENV)
+    for name in ("LOCAL_STORE_PATH", "ROLLUP_DB", "BURN_SESSION_DB", "ALERT_DB", "INFLUXDB_USE_ROLLUPS",
+                 "CHAT_SESSION_BACKEND"):
+        os.environ.pop(name, None)
+    import stove_chat_app
+    return stove_chat_app
+
+
+@pytest.fixture
+def auth_headers():
+    credentials = base64.b64encode(f"{CHAT_ENV['CHAT_USERNAME']}:{CHAT_ENV['CHAT_PASSWORD']}".encode()).decode()
+    return {"Authorization": f"Basic {credentials}"}
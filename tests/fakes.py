@@ -0,0 +1,115 @@
+"""Scripted OpenAI and InfluxDB clients for the chat tests."""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from influxdb_client.client.flux_table import FluxRecord, FluxTable
+
+
+def tool_call(call_id, name, arguments="{}"):
+    return SimpleNamespace(id=call_id, type="function", function=SimpleNamespace(name=name, arguments=arguments))
+
+
+def completion(content=None, tool_calls=None):
+    message = SimpleNamespace(content=content, tool_calls=tool_calls or None)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)],
+                           usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5))
+
+
+def chunks(content=None, tool_calls=None):
+    """A completion as stream chunks: content four characters at a time, one per tool call, then the usage."""
+    content = content or ""
+    deltas = [SimpleNamespace(content=content[i:i + 4], tool_calls=None) for i in range(0, len(content), 4)]
+    deltas += [SimpleNamespace(content=None, tool_calls=[SimpleNamespace(index=i, id=call.id, function=call.function)])
+               for i, call in enumerate(tool_calls or [])]
+    stream = [SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=delta)]) for delta in deltas]
+    stream.append(SimpleNamespace(usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5), choices=[]))
+    return stream
+
+
+class FakeStream:
+    """A completion stream that records whether it was closed."""
+
+    def __init__(self, items):
+        self.items = items
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeAsyncStream(FakeStream):
+    async def __aiter__(self):
+        for item in self.items:
+            yield item
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeOpenAI:
+    """Answers chat.completions.create with the scripted turns in order, recording every request.
+
+    Streaming requests are answered with the turn as a FakeStream of chunks.
+    """
+    stream_class = FakeStream
+
+    def __init__(self, turns):
+        self.turns = list(turns)
+        self.requests = []
+        self.streams = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        turn = self.turns.pop(0) if self.turns else completion("done")
+        turn = turn(kwargs) if callable(turn) else turn
+        if kwargs.get("stream"):
+            message = turn.choices[0].message
+            self.streams.append(self.stream_class(chunks(message.content, message.tool_calls)))
+            return self.streams[-1]
+        return turn
+
+
+class FakeAsyncOpenAI(FakeOpenAI):
+    """FakeOpenAI for AsyncOpenAI callers."""
+
+    stream_class = FakeAsyncStream
+
+    def __init__(self, turns):
+        super().__init__(turns)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.acreate))
+
+    async def acreate(self, **kwargs):
+        return self.create(**kwargs)
+
+
+class FakeQueryApi:
+    """Answers every Flux query with one catalyst reading after calling hook (which may block or raise)."""
+
+    def __init__(self, hook=None, value=812.5):
+        self.hook = hook
+        self.value = value
+        self.queries = []
+
+    def query(self, query, **kwargs):
+        self.queries.append(query)
+        if self.hook is not None:
+            self.hook()
+        table = FluxTable()
+        table.records.append(FluxRecord(table=0, values={
+            "_time": datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc),
+            "_value": self.value,
+            "_field": "temperature",
+            "location": "catalyst",
+        }))
+        return [table]
+
+
+class FakeAsyncQueryApi(FakeQueryApi):
+    """FakeQueryApi for the async InfluxDB client."""
+
+    async def query(self, query, **kwargs):
+        return super().query(query, **kwargs)
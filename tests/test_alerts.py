@@ -0,0 +1,180 @@
+"""Alert rules, the engine's sinks and the chat backend's alert log."""
+import json
+import time
+
+import pytest
+
+from alerts import AlertEngine, AlertLog, FileSink, Rule
+
+
+class ListSink:
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+    def close(self):
+        pass
+
+
+class BrokenSink(ListSink):
+    def emit(self, event):
+        raise OSError("disk full")
+
+
+def run(rule, samples, step=10.0):
+    """Feed one reading per step seconds; return (time, state) of every change."""
+    engine = AlertEngine([Rule.from_dict(rule)], [])
+    changes = []
+    for i, value in enumerate(samples):
+        for event in engine.process({"catalyst": value}, i * step):
+            changes.append((i * step, event["state"]))
+    return changes
+
+
+def test_above_fires_after_its_duration_and_clears_with_hysteresis():
+    rule = {"name": "overfire", "kind": "above", "threshold": 1600, "duration": 120, "clear": 1500}
+    samples = [1550] * 3 + [1650] * 15 + [1550] * 3 + [1490]
+    # Above from t=30, so it fires at t=150; 1550 is still above the clear level
+    assert run(rule, samples) == [(150.0, "firing"), (210.0, "resolved")]
+
+
+def test_above_restarts_its_duration_when_the_condition_breaks():
+    rule = {"name": "overfire", "kind": "above", "threshold": 1600, "duration": 60}
+    assert run(rule, [1650] * 5 + [1590] + [1650] * 5) == []
+
+
+def test_below_waits_for_arm_and_rearms_only_after_reaching_it_again():
+    rule = {"name": "reload", "kind": "below", "threshold": 500, "arm": 700, "clear": 550}
+    samples = [
+        300, 300,       # cold stove: never armed
+        750, 450,       # burned past arm, then down: fires
+        300, 560,       # stays fired, then clears
+        450,            # below again without reaching arm: quiet
+        720, 480,       # re-armed: fires again
+    ]
+    assert run(rule, samples) == [(30.0, "firing"), (50.0, "resolved"), (80.0, "firing")]
+
+
+def test_rise_uses_the_least_squares_slope_above_min_value():
+    rule = {"name": "runaway", "kind": "rise", "threshold": 50, "window": 180, "min_value": 1200}
+    # 60°F/min ramps: below min_value first, then from 1200
+    cold = [600 + i * 10 for i in range(30)]
+    hot = [1200 + i * 10 for i in range(30)]
+    # Fires on the first hot sample; clears once the flat tail pulls the slope under 50°F/min
+    assert run(rule, cold + hot + [hot[-1]] * 30) == [(300.0, "firing"), (640.0, "resolved")]
+
+
+@pytest.mark.parametrize("slope, fires", [(29.0, True), (31.0, False)])
+def test_slope_threshold_is_in_degrees_per_minute(slope, fires):
+    rule = {"name": "ramp", "kind": "rise", "threshold": slope, "window": 120}
+    # A steady 30°F/min rise sampled every 10s
+    changes = run(rule, [500 + i * 5 for i in range(40)])
+    assert bool(changes) is fires
+
+
+def test_fall_fires_on_a_steep_drop():
+    rule = {"name": "crash", "kind": "fall", "threshold": 20, "window": 120, "clear": 5}
+    changes = run(rule, [900] * 12 + [900 - i * 5 for i in range(1, 20)] + [805] * 20)
+    assert [state for _, state in changes] == ["firing", "resolved"]
+
+
+def test_engine_fans_out_to_every_sink(tmp_path):
+    listed, path = ListSink(), tmp_path / "alerts.jsonl"
+    engine = AlertEngine([Rule("overfire", "above", 1600)], [BrokenSink(), listed, FileSink(str(path))])
+    events = engine.process({"catalyst": 1700.0}, 1.0) + engine.process({"catalyst": 1500.0}, 2.0)
+    engine.close()
+
+    assert [event["state"] for event in events] == ["firing", "resolved"]
+    # The rule list goes out first; a failing sink does not stop the others
+    assert [event["type"] for event in listed.events] == ["rules", "alert", "alert"]
+    assert [json.loads(line) for line in path.read_text().splitlines()] == listed.events
+    assert engine.active() == []
+
+
+def test_rule_validation():
+    with pytest.raises(ValueError):
+        Rule.from_dict({"name": "x", "kind": "sideways", "threshold": 1})
+    with pytest.raises(ValueError):
+        Rule.from_dict({"name": "x", "kind": "above", "threshold": 1, "colour": "red"})
+    with pytest.raises(ValueError):
+        AlertEngine([Rule("x", "above", 1), Rule("x", "below", 1)], [])
+
+
+def alert(rule, state, t, value=1650.0):
+    return {"type": "alert", "rule": rule, "state": state, "time": t, "value": value,
+            "severity": "critical", "location": "catalyst", "message": f"{rule} {state}"}
+
+
+def test_alert_log_keeps_the_latest_state_and_prunes_old_alerts(tmp_path):
+    log = AlertLog(str(tmp_path / "alerts.db"), max_age=1000)
+    log.record(alert("overfire", "firing", 0))
+    log.record(alert("overfire", "resolved", 500))
+    log.record(alert("runaway", "firing", 1500))
+
+    assert [row["rule"] for row in log.active()] == ["runaway"]
+    # The alert at t=0 is older than max_age by now
+    assert [(row["rule"], row["state"]) for row in log.since(0)] == [("runaway", "firing"), ("overfire", "resolved")]
+
+
+def test_alert_log_rejects_malformed_events_without_breaking_later_writes(tmp_path):
+    path = str(tmp_path / "alerts.db")
+    log = AlertLog(path)
+    for event in ({"type": "rules", "rules": [{"kind": "above", "threshold": 1}]}, {"type": "rules"},
+                  {"type": "alert", "rule": "overfire"}):
+        with pytest.raises(ValueError):
+            log.record(event)
+    assert log.record({"type": "rules", "rules": [{"name": "overfire", "kind": "above", "threshold": 1600}]})
+    assert log.record(alert("overfire", "firing", 100))
+
+    other = AlertLog(path)
+    assert [rule["name"] for rule in other.rules()] == ["overfire"]
+    assert len(other.since(0)) == 1
+
+
+@pytest.fixture
+def alerts_api(chat_app, monkeypatch, auth_headers, tmp_path):
+    monkeypatch.setattr(chat_app, "alert_log", AlertLog(str(tmp_path / "alerts.db")))
+    test_client = chat_app.app.test_client()
+
+    def call(method, **kwargs):
+        response = test_client.open("/api/alerts", method=method, headers=auth_headers, **kwargs)
+        return response.status_code, response.get_json()
+    return call
+
+
+def test_alerts_round_trip(alerts_api):
+    rules = {"type": "rules", "rules": [Rule("overfire", "above", 1600, duration=120).to_dict()]}
+    assert alerts_api("POST", json=rules) == (200, {"recorded": True})
+    assert alerts_api("POST", json=alert("overfire", "firing", time.time()))[0] == 200
+
+    status, body = alerts_api("GET")
+    assert status == 200
+    assert body["rules"] == [{"name": "overfire", "condition": "catalyst above 1600°F for 2 min",
+                              "severity": "warning"}]
+    assert [(a["rule"], a["state"], a["temperature"]) for a in body["active"]] == [("overfire", "firing", 1650.0)]
+    assert body["count"] == 1
+
+
+@pytest.mark.parametrize("event", [
+    {"type": "rules"},
+    {"type": "rules", "rules": "overfire"},
+    {"type": "rules", "rules": [{"kind": "above", "threshold": 1600}]},
+    {"type": "rules", "rules": [{"name": "overfire", "kind": "above", "threshold": "hot"}]},
+    {"type": "alert", "rule": "overfire", "state": "firing"},
+    {"type": "alert", "rule": "overfire", "state": "smouldering", "time": 1.0},
+    {"type": "alert", "state": "firing", "time": 1.0},
+    {"type": "alert", "rule": "overfire", "state": "firing", "time": "now"},
+    {"type": "alert", "rule": "overfire", "state": "firing", "time": 1.0, "value": "hot"},
+    {"type": "heartbeat"},
+    ["not", "an", "event"],
+], ids=["no rules", "rules not a list", "rule without name", "bad threshold", "alert without time",
+        "unknown state", "alert without rule", "time not a number", "value not a number", "unknown type",
+        "not an object"])
+def test_malformed_alert_posts_get_400(alerts_api, event):
+    status, body = alerts_api("POST", json=event)
+    assert status == 400
+    assert body["error"]
+    # The log still takes well-formed events afterwards
+    assert alerts_api("POST", json=alert("overfire", "firing", time.time()))[0] == 200
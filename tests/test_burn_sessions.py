@@ -0,0 +1,250 @@
+"""Burn session detection on synthetic traces and the persisted session index."""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from burn_sessions import BurnSessionDetector, BurnSessionIndex
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from stove_trace import burn_cycle_trace, line_protocol  # noqa: E402
+
+HOURS = 72
+# Seed 3 lays out five fires that each burn out before the next one is lit
+SEED = 3
+
+
+@pytest.fixture(scope="module")
+def trace():
+    return burn_cycle_trace(hours=HOURS, interval=30, seed=SEED, start=time.time() - HOURS * 3600)
+
+
+def fires(trace):
+    """(ignition time, reload count) of every fire in the trace's ground truth."""
+    result = []
+    for event in trace.events:
+        if event["kind"] == "ignition":
+            result.append([event["time"], 0])
+        elif event["kind"] == "reload":
+            result[-1][1] += 1
+    return [tuple(fire) for fire in result]
+
+
+def detect(timestamps, temperatures, detector=None):
+    detector = detector or BurnSessionDetector()
+    closed = []
+    for t, temp in zip(timestamps, temperatures):
+        closed.extend(detector.update(float(t), float(temp)))
+    return closed, detector
+
+
+def test_sessions_match_the_trace_fires(trace):
+    closed, detector = detect(trace.timestamps, trace.temperatures)
+    expected = fires(trace)
+    assert [session["reloads"] for session in closed] == [reloads for _, reloads in expected] == [0, 1, 0, 2, 0]
+    ignitions = [ignition for ignition, _ in expected]
+    for session, ignition, next_ignition in zip(closed, ignitions, ignitions[1:] + [float("inf")]):
+        # The catalyst crosses 250°F a few minutes into ignition and is out well before the next fire
+        assert ignition < session["start"] < ignition + 600
+        assert session["start"] < session["end"] < next_ignition
+        assert session["duration"] == session["end"] - session["start"]
+        assert 1000 < session["peak"] < 1500
+        assert session["start"] < session["peak_time"] < session["end"]
+        assert session["above_1000"] < session["above_500"] < session["above_400"] < session["duration"]
+    assert detector.current() is None
+    assert detector.false_starts == 0
+
+
+def test_relight_on_warm_coals_continues_the_session():
+    # Seed 1 relights its first fire before the catalyst has cooled below 200°F
+    trace = burn_cycle_trace(hours=HOURS, interval=30, seed=1, start=1790000000.0)
+    closed, _ = detect(trace.timestamps, trace.temperatures)
+    ignitions = [ignition for ignition, _ in fires(trace)]
+    assert len(ignitions) == 5
+    assert len(closed) == 4
+    assert closed[0]["start"] < ignitions[1] < closed[0]["end"]
+    assert closed[0]["reloads"] == 4
+
+
+def test_phases_of_a_hand_built_fire():
+    detector = BurnSessionDetector()
+    readings = [70, 260, 400, 520, 900, 440, 420, 510, 400, 350, 480, 600, 300, 150]
+    states = []
+    for i, temp in enumerate(readings):
+        detector.update(i * 60.0, temp)
+        current = detector.current()
+        states.append(current["state"] if current else None)
+    assert states == [None, "ignition", "ignition", "active", "active", "coaling", "coaling",
+                      # 510°F is within 100°F of the 420°F low: the fire recovering
+                      "active", "coaling", "coaling",
+                      # 480°F is 130°F above the 350°F low: a reload
+                      "reload", "active", "coaling", "coaling"]
+    assert detector.current()["reloads"] == 1
+
+
+def test_reload_that_never_catches_goes_back_to_coaling():
+    detector = BurnSessionDetector()
+    for i, temp in enumerate([300, 600, 400, 520, 390]):
+        detector.update(i * 60.0, temp)
+    assert detector.current()["state"] == "coaling"
+    assert detector.current()["reloads"] == 1
+
+
+def test_session_ends_when_the_temperature_first_stayed_out():
+    detector = BurnSessionDetector(out_hold=900)
+    closed, _ = detect([0, 60, 120, 180], [300, 600, 150, 210], detector)
+    assert closed == []
+    # Below 200°F from t=240; it closes once that has lasted 900 s
+    closed, _ = detect([240, 600, 1080], [190, 150, 120], detector)
+    assert closed == []
+    closed, _ = detect([1140], [110], detector)
+    assert len(closed) == 1
+    assert closed[0]["start"] == 0
+    assert closed[0]["end"] == 240
+    assert closed[0]["peak"] == 600
+    assert closed[0]["peak_time"] == 60
+
+
+def test_false_start_is_not_recorded():
+    detector = BurnSessionDetector()
+    closed, _ = detect([0, 60, 120, 1200], [270, 380, 150, 120], detector)
+    assert closed == []
+    assert detector.current() is None
+    assert detector.false_starts == 1
+
+
+def test_gap_in_readings_closes_the_session_at_the_last_reading():
+    detector = BurnSessionDetector(max_gap=3600)
+    detect([0, 60, 120], [300, 700, 650], detector)
+    assert detector.expire(120 + 3600) == []
+    assert [session["end"] for session in detector.expire(120 + 3601)] == [120]
+
+    detector = BurnSessionDetector(max_gap=3600)
+    detect([0, 60, 120], [300, 700, 650], detector)
+    closed, _ = detect([10000], [700], detector)
+    assert [session["end"] for session in closed] == [120]
+    # The reading after the gap starts the next fire
+    assert detector.current()["start"] == 10000
+
+
+def test_time_above_thresholds_counts_each_interval_at_its_starting_temperature():
+    closed, _ = detect([0, 60, 180, 300, 420, 1320], [300, 1100, 450, 150, 150, 150])
+    assert len(closed) == 1
+    assert closed[0]["above_400"] == 120 + 120
+    assert closed[0]["above_500"] == 120
+    assert closed[0]["above_1000"] == 120
+
+
+def test_readings_out_of_order_are_ignored():
+    detector = BurnSessionDetector()
+    detect([0, 60], [300, 600], detector)
+    assert detector.update(30.0, 1400.0) == []
+    assert detector.update(60.0, 1400.0) == []
+    assert detector.current()["peak"] == 600
+
+
+def test_state_snapshot_resumes_mid_fire(trace):
+    expected, _ = detect(trace.timestamps, trace.temperatures)
+    # Split in the middle of the second fire's plateau
+    split = int(((fires(trace)[1][0] - trace.timestamps[0]) + 3600) // 30)
+    first, detector = detect(trace.timestamps[:split], trace.temperatures[:split])
+    assert detector.current()["state"] == "active"
+    resumed = BurnSessionDetector()
+    resumed.set_state(detector.get_state())
+    rest, _ = detect(trace.timestamps[split:], trace.temperatures[split:], resumed)
+    assert first + rest == expected
+
+
+def test_index_reopens_with_its_sessions_and_detector_state(trace, tmp_path):
+    path = str(tmp_path / "sessions.db")
+    expected, _ = detect(trace.timestamps, trace.temperatures)
+    split = len(trace.timestamps) * 2 // 3
+
+    # The trace is days old; without a gap limit the fire cut off at the split stays open
+    def no_gap_limit():
+        return BurnSessionDetector(max_gap=float("inf"))
+
+    index = BurnSessionIndex(path, detector_factory=no_gap_limit)
+    assert not index.has_state()
+    closed = index.ingest(trace.timestamps[:split], trace.temperatures[:split])
+    assert index.has_state()
+    in_progress = index.current()
+    assert in_progress["start"] == expected[3]["start"]
+    index._conn.close()
+
+    # A restarted process (or another worker) picks up mid-fire
+    index = BurnSessionIndex(path, detector_factory=no_gap_limit)
+    assert index.has_state()
+    assert index.current() == in_progress
+    for chunk in range(split, len(trace.timestamps), 1000):
+        closed += index.ingest(trace.timestamps[chunk:chunk + 1000], trace.temperatures[chunk:chunk + 1000])
+    assert closed == expected
+    index._conn.close()
+
+    index = BurnSessionIndex(path)
+    assert index.since(0) == expected
+    assert index.last() == expected[-1]
+    assert [session["start"] for session in index.since(expected[2]["end"])] == [s["start"] for s in expected[2:]]
+    summary = index.summary(0)
+    assert summary["count"] == 5
+    assert summary["reloads"] == 3
+    assert summary["total_duration"] == pytest.approx(sum(s["duration"] for s in expected))
+    assert summary["max_peak"] == max(s["peak"] for s in expected)
+    assert summary["above_500"] == pytest.approx(sum(s["above_500"] for s in expected))
+
+
+def test_index_expires_a_fire_whose_readings_stopped(tmp_path):
+    index = BurnSessionIndex(str(tmp_path / "sessions.db"))
+    now = time.time()
+    index.ingest([now - 7300, now - 7240, now - 7200], [300, 700, 650])
+    assert index.current() is None
+    assert index.last()["end"] == pytest.approx(now - 7200)
+
+
+def test_failed_ingest_leaves_the_index_unchanged(tmp_path):
+    index = BurnSessionIndex(str(tmp_path / "sessions.db"))
+    now = time.time()
+    index.ingest([now - 120, now - 60], [300, 700])
+    with pytest.raises(ValueError):
+        index.ingest([now - 30, now - 20], [800, "hot"])
+    assert index.current()["peak"] == 700
+    index.ingest([now - 10], [900])
+    assert index.current()["peak"] == 900
+
+
+@pytest.fixture
+def sessions_api(chat_app, monkeypatch, auth_headers, tmp_path):
+    monkeypatch.setattr(chat_app, "burn_index", BurnSessionIndex(str(tmp_path / "sessions.db")))
+    test_client = chat_app.app.test_client()
+
+    def call(method, path, **kwargs):
+        response = test_client.open(path, method=method, headers=auth_headers, **kwargs)
+        return response.status_code, response.get_json()
+    return call
+
+
+def test_sessions_api_and_tool_read_ingested_fires(chat_app, sessions_api, trace):
+    assert sessions_api("GET", "/api/sessions/last") == (200, {"session": None})
+
+    status, body = sessions_api("POST", "/api/ingest", data="\n".join(line_protocol(trace)))
+    assert status == 200
+    assert body["sessions_closed"] == 5
+
+    status, body = sessions_api("GET", "/api/sessions?days=7")
+    assert status == 200
+    assert body["current"] is None
+    assert [session["reloads"] for session in body["sessions"]] == [0, 1, 0, 2, 0]
+    assert body["summary"]["count"] == 5
+    assert sessions_api("GET", "/api/sessions/last")[1]["session"] == body["sessions"][-1]
+
+    result = chat_app.get_burn_sessions(days_back=7)
+    assert result["fire_count"] == 5
+    assert result["total_reloads"] == 3
+    assert result["sessions"] == body["sessions"]
+
+
+def test_sessions_api_is_404_without_an_index(chat_app, auth_headers):
+    response = chat_app.app.test_client().get("/api/sessions", headers=auth_headers)
+    assert response.status_code == 404
@@ -0,0 +1,116 @@
+"""The /api/chat tool loop with a scripted OpenAI client and a fake InfluxDB query API."""
+import json
+import threading
+
+import pytest
+
+from fakes import FakeOpenAI, FakeQueryApi, completion, tool_call
+
+
+@pytest.fixture
+def chat(chat_app, monkeypatch, auth_headers):
+    """Post one message to /api/chat with the given fakes; returns (status, body)."""
+    test_client = chat_app.app.test_client()
+
+    def post(openai, query_api=None, message="How hot is the stove?"):
+        monkeypatch.setattr(chat_app, "client", openai)
+        monkeypatch.setattr(chat_app, "query_api", query_api or FakeQueryApi())
+        response = test_client.post("/api/chat", json={"message": message}, headers=auth_headers)
+        return response.status_code, response.get_json()
+    return post
+
+
+def tool_messages(openai_request):
+    return {m["tool_call_id"]: json.loads(m["content"]) for m in openai_request["messages"] if m["role"] == "tool"}
+
+
+def test_tool_calls_of_one_round_run_in_parallel(chat):
+    # Each query waits until all three tool calls are querying at once
+    barrier = threading.Barrier(3, timeout=5)
+    openai = FakeOpenAI([
+        completion(tool_calls=[tool_call(f"call_{i}", "get_current_temperature") for i in range(3)]),
+        completion("It is 812.5°F."),
+    ])
+    status, body = chat(openai, FakeQueryApi(hook=barrier.wait))
+
+    assert status == 200
+    assert body["response"] == "It is 812.5°F."
+    assert [timing["name"] for timing in body["tool_calls"]] == ["get_current_temperature"] * 3
+    results = tool_messages(openai.requests[1])
+    assert list(results) == ["call_0", "call_1", "call_2"]
+    assert all(result["temperature"] == 812.5 for result in results.values())
+
+
+def test_round_cap_forces_an_answer_without_tools(chat, chat_app, monkeypatch):
+    monkeypatch.setattr(chat_app, "MAX_TOOL_ROUNDS", 2)
+    openai = FakeOpenAI([
+        completion(tool_calls=[tool_call("call_1", "get_current_temperature")]),
+        completion(tool_calls=[tool_call("call_2", "get_current_temperature")]),
+        completion("Here is what I found."),
+    ])
+    status, body = chat(openai)
+
+    assert status == 200
+    assert body["response"] == "Here is what I found."
+    assert len(openai.requests) == 3
+    assert all("tools" in request for request in openai.requests[:2])
+    assert "tools" not in openai.requests[2]
+    assert len(body["tool_calls"]) == 2
+
+
+def test_slow_tool_times_out_as_an_error_result(chat, chat_app, monkeypatch):
+    monkeypatch.setattr(chat_app, "TOOL_TIMEOUT", 0.2)
+    release = threading.Event()
+    openai = FakeOpenAI([
+        completion(tool_calls=[tool_call("call_1", "get_current_temperature")]),
+        completion("InfluxDB is slow right now."),
+    ])
+    try:
+        status, body = chat(openai, FakeQueryApi(hook=lambda: release.wait(5)))
+    finally:
+        release.set()
+
+    assert status == 200
+    assert body["response"] == "InfluxDB is slow right now."
+    results = tool_messages(openai.requests[1])
+    assert list(results) == ["call_1"]
+    assert results["call_1"]["error"].startswith("get_current_temperature timed out")
+
+
+def test_tool_failures_come_back_as_error_results(chat, chat_app, monkeypatch):
+    def broken_tool():
+        raise RuntimeError("sensor offline")
+
+    monkeypatch.setitem(chat_app.available_functions, "get_alerts", broken_tool)
+
+    def failing_query():
+        raise ConnectionError("connection refused")
+
+    openai = FakeOpenAI([
+        completion(tool_calls=[
+            tool_call("call_1", "get_current_temperature"),
+            tool_call("call_2", "get_alerts"),
+            tool_call("call_3", "get_temperature_history", "{not json"),
+            tool_call("call_4", "make_coffee"),
+        ]),
+        completion("Something went wrong."),
+    ])
+    status, body = chat(openai, FakeQueryApi(hook=failing_query))
+
+    assert status == 200
+    results = tool_messages(openai.requests[1])
+    assert set(results) == {"call_1", "call_2", "call_3", "call_4"}
+    assert "connection refused" in results["call_1"]["error"]
+    assert results["call_2"] == {"error": "get_alerts failed: sensor offline"}
+    assert results["call_3"]["error"].startswith("get_temperature_history failed")
+    assert results["call_4"] == {"error": "Unknown tool: make_coffee"}
+
+
+def test_stats_scan_raw_readings_even_with_rollups(chat_app, monkeypatch):
+    monkeypatch.setattr(chat_app, "use_rollups", True)
+    query_api = FakeQueryApi()
+    monkeypatch.setattr(chat_app, "query_api", query_api)
+    chat_app.get_temperature_stats(hours=6)
+    assert len(query_api.queries) == 1
+    assert 'r["_measurement"] == "temperature_measurement"' in query_api.queries[0]
+    assert "temperature_1m" not in query_api.queries[0]
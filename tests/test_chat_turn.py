@@ -0,0 +1,128 @@
+"""The same chat turns through the Flask and the ASGI front ends."""
+import asyncio
+import json
+
+import pytest
+
+from fakes import (FakeAsyncOpenAI, FakeAsyncQueryApi, FakeOpenAI, FakeQueryApi, completion,
+                   tool_call)
+from response_cache import ResponseCache
+
+
+@pytest.fixture(params=["flask", "asgi"])
+def post(request, chat_app, monkeypatch, auth_headers):
+    """post(path, body, turns) -> (status, body text, fake OpenAI) on one front end."""
+    if request.param == "flask":
+        test_client = chat_app.app.test_client()
+
+        def post(path, body, turns):
+            openai = FakeOpenAI(turns)
+            monkeypatch.setattr(chat_app, "client", openai)
+            monkeypatch.setattr(chat_app, "query_api", FakeQueryApi())
+            response = test_client.post(path, json=body, headers=auth_headers)
+            return response.status_code, response.get_data(as_text=True), openai
+        return post
+
+    asgi = pytest.importorskip("stove_chat_asgi")
+
+    async def send(path, body):
+        response = await asgi.quart_app.test_client().post(path, json=body, headers=auth_headers)
+        return response.status_code, await response.get_data(as_text=True)
+
+    def post(path, body, turns):
+        openai = FakeAsyncOpenAI(turns)
+        monkeypatch.setattr(asgi, "openai_client", openai)
+        monkeypatch.setattr(asgi, "async_query_api", FakeAsyncQueryApi())
+        return (*asyncio.run(send(path, body)), openai)
+    return post
+
+
+def sse_events(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        event, data = block.split("\n", 1)
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def roles(openai_request):
+    return [message["role"] for message in openai_request["messages"]]
+
+
+def test_chat_answers_through_tool_rounds_and_keeps_the_conversation(post):
+    status, text, openai = post("/api/chat", {"message": "How hot is it?"}, [
+        completion(tool_calls=[tool_call("call_1", "get_current_temperature")]),
+        completion("It is 812.5°F."),
+    ])
+    body = json.loads(text)
+    assert status == 200
+    assert body["response"] == "It is 812.5°F."
+    assert body["cached"] is False
+    assert [timing["name"] for timing in body["tool_calls"]] == ["get_current_temperature"]
+    assert roles(openai.requests[1]) == ["system", "user", "assistant", "tool"]
+
+    status, text, openai = post("/api/chat", {"message": "And now?", "conversation_id": body["conversation_id"]},
+                                [completion("Still 812.5°F.")])
+    assert status == 200
+    assert json.loads(text)["response"] == "Still 812.5°F."
+    assert roles(openai.requests[0]) == ["system", "user", "assistant", "tool", "assistant", "user"]
+
+
+def test_chat_round_cap_forces_an_answer(post, chat_app, monkeypatch):
+    monkeypatch.setattr(chat_app, "MAX_TOOL_ROUNDS", 1)
+    status, text, openai = post("/api/chat", {"message": "How hot is it?"}, [
+        completion(tool_calls=[tool_call("call_1", "get_current_temperature")]),
+        completion("About 800°F."),
+    ])
+    assert status == 200
+    assert json.loads(text)["response"] == "About 800°F."
+    assert "tools" in openai.requests[0] and "tools" not in openai.requests[1]
+
+
+def test_chat_failure_returns_the_conversation_with_500(post):
+    def fail(request):
+        raise ConnectionError("OpenAI unreachable")
+
+    status, text, _ = post("/api/chat", {"message": "How hot is it?", "history": []}, [fail])
+    body = json.loads(text)
+    assert status == 500
+    assert body["response"] == "I encountered an error: OpenAI unreachable"
+    assert body["history"] == [{"role": "user", "content": "How hot is it?"}]
+
+
+def test_stream_sends_tool_progress_then_tokens_then_done(post):
+    status, text, openai = post("/api/chat/stream", {"message": "How hot is it?"}, [
+        completion(tool_calls=[tool_call("call_1", "get_current_temperature")]),
+        completion("It is 812.5°F."),
+    ])
+    events = sse_events(text)
+    assert status == 200
+    assert [event for event, _ in events] == ["tool_call", "tool_result"] + ["token"] * 4 + ["done"]
+    assert events[0][1] == {"name": "get_current_temperature"}
+    assert "".join(data["text"] for event, data in events if event == "token") == "It is 812.5°F."
+    done = events[-1][1]
+    assert [timing["name"] for timing in done["tool_calls"]] == ["get_current_temperature"]
+    assert done["ttfb_ms"] is not None and done["first_token_ms"] is not None
+    assert all(stream.closed for stream in openai.streams)
+    assert all("tools" in request for request in openai.requests)
+
+
+def test_stream_error_becomes_an_error_event(post):
+    def fail(request):
+        raise ConnectionError("OpenAI unreachable")
+
+    status, text, _ = post("/api/chat/stream", {"message": "How hot is it?"}, [fail])
+    assert status == 200
+    assert sse_events(text) == [("error", {"message": "I encountered an error: OpenAI unreachable"})]
+
+
+def test_opening_question_is_answered_from_the_response_cache(post, chat_app, monkeypatch):
+    monkeypatch.setattr(chat_app, "response_cache", ResponseCache(maxsize=8, ttl=300, similarity=0.9))
+    status, text, _ = post("/api/chat", {"message": "Is the catalyst active?"}, [completion("Yes, at 812.5°F.")])
+    assert status == 200 and json.loads(text)["cached"] is False
+
+    status, text, openai = post("/api/chat/stream", {"message": "Is the catalyst active?"}, [])
+    events = sse_events(text)
+    assert events[0] == ("token", {"text": "Yes, at 812.5°F."})
+    assert events[-1][0] == "done" and events[-1][1]["cached"] is True
+    assert openai.requests == []
@@ -0,0 +1,91 @@
+"""History compaction and the conversation stores."""
+import json
+
+from conversation_store import (MemoryConversationStore, SQLiteConversationStore, compact_history,
+                                estimate_tokens, split_turns)
+
+
+def turn(n, readings=50):
+    """One user question answered through a tool call."""
+    result = {"location": "catalyst", "current": 500.0 + n,
+              "readings": {"start": "2026-10-17T06:00Z", "interval_s": 60, "temperature": [500.0] * readings}}
+    return [
+        {"role": "user", "content": f"question {n}"},
+        {"role": "assistant", "content": None, "tool_calls": [
+            {"id": f"call_{n}", "type": "function",
+             "function": {"name": "get_temperature_history", "arguments": "{}"}}]},
+        {"role": "tool", "tool_call_id": f"call_{n}", "content": json.dumps(result)},
+        {"role": "assistant", "content": f"answer {n}"},
+    ]
+
+
+def history(turns, readings=50):
+    return [message for n in range(turns) for message in turn(n, readings)]
+
+
+def tool_contents(messages):
+    return [json.loads(m["content"]) for m in messages if m["role"] == "tool"]
+
+
+def test_old_tool_outputs_are_summarized():
+    compacted = compact_history(history(4), keep_turns=2, token_budget=100_000)
+    assert len(compacted) == 16
+    old, recent = tool_contents(compacted)[:2], tool_contents(compacted)[2:]
+    assert old[0] == {"location": "catalyst", "current": 500.0, "readings_count": 50, "summarized": True}
+    assert all(result["summarized"] for result in old)
+    assert all(len(result["readings"]["temperature"]) == 50 for result in recent)
+
+
+def test_compaction_does_not_modify_the_stored_history():
+    messages = history(3)
+    original = json.dumps(messages)
+    compact_history(messages, keep_turns=1, token_budget=100_000)
+    assert json.dumps(messages) == original
+
+
+def test_oldest_whole_turns_are_dropped_to_fit_the_budget():
+    messages = history(6, readings=200)
+    budget = estimate_tokens(history(2, readings=200)) + 10
+    compacted = compact_history(messages, keep_turns=6, token_budget=budget)
+
+    assert estimate_tokens(compacted) <= budget
+    assert compacted[0] == {"role": "user", "content": "question 4"}
+    assert [len(t) for t in split_turns(compacted)] == [4, 4]
+    # Every tool result still follows the assistant message that called it
+    calls = set()
+    for message in compacted:
+        calls.update(call["id"] for call in message.get("tool_calls") or [])
+        if message["role"] == "tool":
+            assert message["tool_call_id"] in calls
+
+
+def test_newest_turn_is_kept_even_over_budget():
+    compacted = compact_history(history(3, readings=500), keep_turns=2, token_budget=10)
+    assert compacted == turn(2, readings=500)
+
+
+def test_sqlite_store_round_trips_a_conversation(tmp_path):
+    path = str(tmp_path / "conversations.db")
+    messages = history(2)
+    store = SQLiteConversationStore(path)
+    store.save("abc", messages)
+    assert store.load("abc") == messages
+    assert store.load("missing") is None
+
+    # Another worker (or a restart) sees the same conversation
+    assert SQLiteConversationStore(path).load("abc") == messages
+
+
+def test_sqlite_store_expires_conversations(tmp_path):
+    store = SQLiteConversationStore(str(tmp_path / "conversations.db"), ttl=-1)
+    store.save("abc", history(1))
+    assert store.load("abc") is None
+
+
+def test_memory_store_returns_a_copy():
+    store = MemoryConversationStore()
+    messages = history(1)
+    store.save("abc", messages)
+    loaded = store.load("abc")
+    loaded.append({"role": "user", "content": "more"})
+    assert store.load("abc") == messages
@@ -0,0 +1,36 @@
+"""Downsampling stays within its budget and keeps the endpoints."""
+import numpy as np
+import pytest
+
+from downsample import downsample, minmax
+
+N = 500
+X = np.arange(N) * 60.0
+# A burn: ramp, peak, slow decline, a reload spike
+Y = np.interp(np.arange(N), [0, 60, 120, 300, 310, 499], [80, 650, 900, 420, 780, 150])
+
+
+@pytest.mark.parametrize("method", ["minmax", "lttb"])
+@pytest.mark.parametrize("budget", [0, 1, 2, 3, 4, 5, 7, 50, 499, 500, 600])
+def test_output_stays_within_the_budget(method, budget):
+    keep = downsample(X, Y, budget, method)
+    assert len(keep) <= max(budget, 0)
+    assert np.all(np.diff(keep) > 0)
+    if budget >= 2:
+        assert keep[0] == 0 and keep[-1] == N - 1
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    keep = minmax(Y, 50)
+    assert Y.argmax() in keep and Y.argmin() in keep
+
+
+def test_minmax_with_three_points_keeps_the_peak():
+    assert minmax(Y, 3).tolist() == [0, int(Y.argmax()), N - 1]
+
+
+def test_long_series_use_minmax_preselection():
+    y = np.sin(np.arange(20_000) / 50.0)
+    keep = downsample(np.arange(20_000), y, 100)
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 19_999
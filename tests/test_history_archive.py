@@ -0,0 +1,68 @@
+"""Export queries and bulk import of archive files."""
+import pytest
+
+from history_archive import SCHEMA, export_query, load_file
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+INJECTION = 'x") |> drop(columns: ["_value"]) |> filter(fn: (r) => r._measurement == "y'
+
+
+def test_export_query_filters_plain_measurement_names():
+    query = export_query("bucket", 0, 60, ["temperature_measurement", "temperature_1m"])
+    assert 'r["_measurement"] == "temperature_measurement" or r["_measurement"] == "temperature_1m"' in query
+
+
+@pytest.mark.parametrize("name", [INJECTION, 'a"b', "a\\b", "", "two words"])
+def test_export_query_rejects_other_measurement_names(name):
+    with pytest.raises(ValueError):
+        export_query("bucket", 0, 60, [name])
+
+
+def test_export_route_rejects_bad_measurement(chat_app, auth_headers):
+    response = chat_app.app.test_client().get("/api/export", query_string={"measurement": INJECTION},
+                                              headers=auth_headers)
+    assert response.status_code == 400
+    assert "invalid measurement name" in response.get_json()["error"]
+
+
+class RecordingWriteApi:
+    """Stands in for an InfluxDB write_api, keeping every line it accepts."""
+
+    def __init__(self):
+        self.lines = []
+
+    def write(self, bucket, org, record, write_precision=None):
+        self.lines.extend(record.split("\n"))
+
+
+def test_import_skips_rows_without_a_value(tmp_path):
+    n = 100
+    values = [500.0 + i for i in range(n)]
+    values[7] = None
+    values[23] = float("nan")
+    measurements = ["temperature_measurement"] * n
+    fields = ["temperature"] * n
+    # A rollup count that is NaN would not even cast to an integer
+    measurements[42], fields[42], values[42] = "temperature_1m", "count", float("nan")
+    measurements[43], fields[43], values[43] = "temperature_1m", "count", 60.0
+    table = pa.table({
+        "time": pa.array([1_790_000_000_000_000_000 + i * 1_000_000_000 for i in range(n)],
+                         pa.timestamp("ns", tz="UTC")),
+        "measurement": measurements,
+        "location": ["catalyst"] * n,
+        "sensor": [None] * n,
+        "field": fields,
+        "value": pa.array(values, pa.float64()),
+    }, schema=SCHEMA)
+    path = str(tmp_path / "history.parquet")
+    pq.write_table(table, path)
+
+    write_api = RecordingWriteApi()
+    points = load_file(path, write_api, "bucket", "org", spool_path=str(tmp_path / "spool.db"), points_per_write=10)
+    assert points == (97, 97)
+    assert len(write_api.lines) == 97
+    assert not any("nan" in line for line in write_api.lines)
+    assert "temperature_1m,location=catalyst count=60i 1790000043000000000" in write_api.lines
+    assert "temperature_measurement,location=catalyst temperature=599 1790000099000000000" in write_api.lines
@@ -0,0 +1,133 @@
+"""BatchWriter against a fake InfluxDB write endpoint that goes down and comes back."""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import influxdb_client
+import pytest
+from influxdb_client.client.write_api import SYNCHRONOUS
+
+from influx_batch_writer import BatchWriter, WriteSpool
+
+
+class FakeInfluxDB(ThreadingHTTPServer):
+    """Answers /api/v2/write with 503 while down, else 204, keeping the accepted lines in order."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), WriteHandler)
+        self.down = False
+        self.lines = []
+        self.rejected = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class WriteHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+        if self.server.down:
+            self.server.rejected += 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        self.server.lines.extend(body.splitlines())
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def influx():
+    server = FakeInfluxDB()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def write_api(influx):
+    client = influxdb_client.InfluxDBClient(url=influx.url, token="token", org="org")
+    yield client.write_api(write_options=SYNCHRONOUS)
+    client.close()
+
+
+def make_writer(write_api, spool_path):
+    writer = BatchWriter(write_api, bucket="bucket", org="org", spool_path=str(spool_path),
+                         batch_size=2, flush_interval=0.05, max_backoff=0.05)
+    writer.start()
+    return writer
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def records(start, stop):
+    return [f"temperature_measurement,location=catalyst temperature={i}.0 {i}000000000" for i in range(start, stop)]
+
+
+def test_spools_during_outage_and_replays_in_order(influx, write_api, tmp_path):
+    influx.down = True
+    writer = make_writer(write_api, tmp_path / "spool.db")
+    sent = records(0, 6)
+    for record in sent:
+        assert writer.submit(record)
+
+    wait_for(lambda: writer.stats()["spool_points"] == 6 and influx.rejected >= 2)
+    stats = writer.stats()
+    assert stats["spool_batches"] == 3
+    assert stats["flushed_points"] == 0
+    assert stats["failed_flushes"] >= 2
+    assert influx.lines == []
+
+    influx.down = False
+    wait_for(lambda: writer.stats()["spool_points"] == 0)
+    assert influx.lines == sent
+    assert writer.flushed_points == len(influx.lines) == 6
+    assert writer.stats()["dropped"] == 0
+    writer.close()
+
+
+def test_close_keeps_unsent_batches_for_the_next_run(influx, write_api, tmp_path):
+    spool_path = tmp_path / "spool.db"
+    influx.down = True
+    writer = make_writer(write_api, spool_path)
+    for record in records(0, 3):
+        writer.submit(record)
+    writer.close()
+
+    spool = WriteSpool(str(spool_path))
+    assert spool.size() == (2, 3)
+    spool.close()
+
+    influx.down = False
+    writer = make_writer(write_api, spool_path)
+    writer.submit(records(3, 4)[0])
+    writer.close()
+    assert influx.lines == records(0, 4)
+    assert writer.flushed_points == 4
+
+
+def test_close_makes_a_last_upload_despite_backoff(influx, write_api, tmp_path):
+    influx.down = True
+    writer = BatchWriter(write_api, bucket="bucket", org="org", spool_path=str(tmp_path / "spool.db"),
+                         batch_size=1, flush_interval=0.05, max_backoff=60)
+    writer.start()
+    writer.submit(records(0, 1)[0])
+    wait_for(lambda: influx.rejected >= 1)
+
+    # The next retry is a second away; close uploads now instead
+    influx.down = False
+    started = time.monotonic()
+    writer.close()
+    assert time.monotonic() - started < 1.0
+    assert influx.lines == records(0, 1)
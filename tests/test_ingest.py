@@ -0,0 +1,30 @@
+"""/api/ingest skips malformed line protocol instead of failing the batch."""
+from local_store import parse_line_protocol
+
+GOOD = "temperature_measurement,location=catalyst temperature=512.5 1790000000000000000"
+
+
+def test_parser_skips_and_collects_malformed_lines():
+    payload = "\n".join([
+        GOOD,
+        "temperature_measurement,location=catalyst",
+        "temperature_measurement,location temperature=1.0 1790000000000000001",
+        "temperature_measurement,location=catalyst temperature=hot 1790000000000000002",
+        "temperature_measurement,location=catalyst temperature=1.0 soon",
+        "temperature_measurement,location=outdoor temperature=40.0 1790000000000000003",
+        "temperature_measurement,location=catalyst temperature=520i 1790000000000000004",
+    ])
+    rejected = []
+    timestamps, values = parse_line_protocol(payload, tags={"location": "catalyst"}, rejected=rejected)
+    assert timestamps == [1790000000000000000, 1790000000000000004]
+    assert values == [512.5, 520.0]
+    assert len(rejected) == 4
+
+
+def test_ingest_reports_rejected_lines(chat_app, auth_headers):
+    payload = GOOD + "\ntemperature_measurement,location=catalyst temperature=hot 1790000000000000001\n"
+    response = chat_app.app.test_client().post("/api/ingest", data=payload, headers=auth_headers)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["received"] == 1
+    assert body["rejected"] == 1
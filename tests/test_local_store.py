@@ -0,0 +1,42 @@
+"""RingStore appends from several processes sharing one file."""
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from local_store import RingStore, fcntl
+
+WRITERS = 4
+BATCHES = 300
+
+
+def append_batches(path, writer, stored):
+    store = RingStore(path)
+    total = 0
+    for batch in range(BATCHES):
+        # Writers interleave timestamps, so some batches are older than the newest stored reading
+        ts = np.arange(3) + (batch * WRITERS + writer) * 3
+        total += store.append(ts, ts.astype(np.float32) / 2)
+    stored.put(total)
+
+
+@pytest.mark.skipif(fcntl is None, reason="flock is not available")
+def test_concurrent_appends_from_several_processes(tmp_path):
+    path = str(tmp_path / "store.bin")
+    RingStore(path, capacity=WRITERS * BATCHES * 3)
+
+    context = multiprocessing.get_context("spawn")
+    stored = context.Queue()
+    writers = [context.Process(target=append_batches, args=(path, i, stored)) for i in range(WRITERS)]
+    for process in writers:
+        process.start()
+    appended = sum(stored.get(timeout=60) for _ in writers)
+    for process in writers:
+        process.join(60)
+        assert process.exitcode == 0
+
+    store = RingStore(path)
+    ts, temps = store.range(0)
+    assert len(store) == len(ts) == appended
+    assert np.all(np.diff(ts) > 0)
+    np.testing.assert_array_equal(temps, ts.astype(np.float32) / 2)
@@ -0,0 +1,36 @@
+"""/api/predict rejects malformed requests with 400 before training."""
+import pytest
+
+FIVE_MINUTES_MS = 5 * 60 * 1000
+
+
+def series(n, start_ms=1_790_000_000_000):
+    return {"timestamps": [start_ms + i * FIVE_MINUTES_MS for i in range(n)],
+            "temperatures": [500.0 + i for i in range(n)]}
+
+
+def request_body(**overrides):
+    body = {"training": series(48), "recent": series(12), "hours": 8}
+    body.update(overrides)
+    return body
+
+
+@pytest.mark.parametrize("body", [
+    request_body(training={"timestamps": [], "temperatures": []}),
+    request_body(training={"timestamps": [1, 2], "temperatures": [500.0]}),
+    request_body(recent={"timestamps": [], "temperatures": [500.0]}),
+    request_body(recent={"timestamps": [1, 2], "temperatures": [500.0]}),
+    request_body(recent={"temperatures": [500.0]}),
+    request_body(hours=0),
+    request_body(hours=-2),
+    request_body(hours=25),
+    request_body(hours=0.01),
+    request_body(hours="soon"),
+    {"recent": series(12)},
+], ids=["empty training", "training lengths differ", "empty recent timestamps", "recent lengths differ",
+        "no recent timestamps", "zero hours", "negative hours", "over 24 hours", "under one interval",
+        "hours not a number", "no training"])
+def test_invalid_requests_get_400(chat_app, auth_headers, body):
+    response = chat_app.app.test_client().post("/api/predict", json=body, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.get_json()["error"].startswith("Invalid prediction request")
@@ -0,0 +1,45 @@
+"""ThermocoupleChannel retries and backoff."""
+from sensor_array import ThermocoupleChannel
+
+
+class FlakySensor:
+    """Raises for the first `failures` reads, then reads 400°C."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.reads = 0
+
+    @property
+    def temperature(self):
+        self.reads += 1
+        if self.reads <= self.failures:
+            raise RuntimeError("thermocouple open")
+        return 400.0
+
+
+def test_retry_count_retries_after_the_first_attempt():
+    sensor = FlakySensor(failures=2)
+    channel = ThermocoupleChannel("catalyst", sensor, retry_count=2)
+    assert channel.read(now=0.0) == 752.0
+    assert sensor.reads == 3
+    assert channel.failures == 0
+
+
+def test_channel_backs_off_once_every_retry_fails():
+    sensor = FlakySensor(failures=3)
+    channel = ThermocoupleChannel("catalyst", sensor, retry_count=2, base_backoff=1.0)
+    assert channel.read(now=0.0) is None
+    assert sensor.reads == 3
+    assert channel.failures == 1
+
+    # Backing off: the sensor is left alone until the backoff has passed
+    assert channel.read(now=0.5) is None
+    assert sensor.reads == 3
+    assert channel.read(now=1.0) == 752.0
+
+
+def test_no_retries():
+    sensor = FlakySensor(failures=1)
+    channel = ThermocoupleChannel("catalyst", sensor, retry_count=0)
+    assert channel.read(now=0.0) is None
+    assert sensor.reads == 1
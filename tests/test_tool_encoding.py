@@ -0,0 +1,73 @@
+"""Tool results are encoded within their token budget."""
+import json
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from tool_encoding import count_tokens, encode_result
+
+START = datetime(2026, 10, 17, 6, 0, tzinfo=timezone.utc)
+
+
+def readings(n, step_s=60):
+    # A burn-shaped curve, so LTTB has peaks to keep
+    return [{"time": (START + timedelta(seconds=i * step_s)).isoformat(),
+             "temperature": 300 + 400 * math.sin(i / n * math.pi) + 25 * math.sin(i / 7)}
+            for i in range(n)]
+
+
+@pytest.mark.parametrize("budget", [100, 300, 800])
+def test_encoded_result_fits_the_budget(budget):
+    content, stats = encode_result({"location": "catalyst", "readings": readings(2000)}, token_budget=budget)
+    assert stats["tokens"] == count_tokens(content) <= budget
+    assert stats["raw_tokens"] > budget
+    assert stats["tokens_saved"] == stats["raw_tokens"] - stats["tokens"]
+
+
+def test_small_result_is_sent_whole():
+    content, stats = encode_result({"readings": readings(5)}, token_budget=800)
+    encoded = json.loads(content)["readings"]
+    assert encoded["start"] == "2026-10-17T06:00Z"
+    assert encoded["interval_s"] == 60
+    assert len(encoded["temperature"]) == 5
+    assert "downsampled_from" not in encoded
+
+
+def test_downsampling_keeps_the_first_and_last_readings():
+    series = readings(1000)
+    content, _ = encode_result({"readings": series}, token_budget=400)
+    encoded = json.loads(content)["readings"]
+
+    assert encoded["downsampled_from"] == 1000
+    assert 3 <= len(encoded["temperature"]) < 1000
+    assert encoded["start"] == "2026-10-17T06:00Z"
+    assert "start_offset_s" not in encoded
+    assert encoded["temperature"][0] == round(series[0]["temperature"], 1)
+    assert encoded["temperature"][-1] == round(series[-1]["temperature"], 1)
+    assert sum(encoded["dt_s"]) == 999 * 60
+    assert len(encoded["dt_s"]) == len(encoded["temperature"]) - 1
+
+
+def test_result_that_cannot_fit_is_truncated_with_a_marker():
+    # No series to downsample, only long text
+    result = {"alerts": [{"message": f"Catalyst above 1200°F during burn {i}", "level": "critical"}
+                         for i in range(200)]}
+    content, stats = encode_result(result, token_budget=100)
+    assert content.endswith("...[truncated]")
+    assert stats["tokens"] <= 100
+
+
+def test_truncation_fits_when_tokens_per_character_vary(monkeypatch):
+    # A tokenizer far from four characters per token, and denser at the start of the text
+    monkeypatch.setattr("tool_encoding.count_tokens", lambda text, model="gpt-4o": sum(
+        8 if char.isdigit() else 1 for char in text) // 4)
+    result = {"ids": "".join(str(i) for i in range(300)), "note": "catalyst " * 200}
+    whole, _ = encode_result(result, token_budget=10000)
+    for budget in (50, 400, 10):
+        content, stats = encode_result(result, token_budget=budget)
+        assert content.endswith("...[truncated]")
+        assert stats["tokens"] <= budget
+        # One more character would not have fit
+        longer = whole[:len(content) - len("...[truncated]") + 1]
+        assert sum(8 if char.isdigit() else 1 for char in longer + "...[truncated]") // 4 > budget
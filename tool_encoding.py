@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Compact encoding of chat tool results for the model.
+
+Tool results used to be sent as ``json.dumps`` of lists like
+``[{"temperature": 512.34, "time": "2025-01-05T14:05:00+00:00"}, ...]``, so
+most of the prompt went on repeated keys and timestamps. The encoder keeps
+the result a JSON object, so history compaction can still read it, but:
+
+* time series become columns. A start time plus a fixed ``interval_s`` is
+  used when the readings are evenly spaced. Otherwise ``dt_s`` holds the
+  delta-encoded seconds between readings. Each value field becomes a plain
+  array.
+* other lists of uniform objects become ``{"fields": [...], "rows": [...]}``.
+* floats are rounded to one decimal and ISO times are shortened to minutes
+  (``2025-01-05T14:05Z``).
+
+Each result is held to a token budget. Series are downsampled with LTTB
+until the result fits, and anything still too long is cut with a marker.
+Tokens are counted with tiktoken when it is installed, otherwise estimated
+at four characters per token.
+"""
+import json
+from datetime import datetime, timezone
+
+import numpy as np
+
+from downsample import lttb
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+_encodings = {}
+
+
+def count_tokens(text, model="gpt-4o"):
+    """Token count of text for model (approximate without tiktoken)."""
+    if tiktoken is None:
+        return len(text) // 4
+    if model not in _encodings:
+        try:
+            _encodings[model] = tiktoken.encoding_for_model(model)
+        except KeyError:
+            _encodings[model] = tiktoken.get_encoding("o200k_base")
+    return len(_encodings[model].encode(text))
+
+
+def _parse_time(value):
+    if not isinstance(value, str) or len(value) < 16 or value[10] != "T":
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def short_time(value):
+    """ISO time shortened to minutes in UTC (2025-01-05T14:05Z); other values unchanged."""
+    parsed = _parse_time(value)
+    if parsed is None or parsed.tzinfo is None:
+        return value
+    utc = parsed.astimezone(timezone.utc)
+    return utc.strftime("%Y-%m-%dT%H:%M:%SZ" if utc.second else "%Y-%m-%dT%H:%MZ")
+
+
+def _compact_value(value):
+    if isinstance(value, float):
+        return round(value, 1)
+    if isinstance(value, str):
+        return short_time(value)
+    if isinstance(value, dict):
+        return {key: _compact_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return _compact_list(value)
+    return value
+
+
+def _series(records):
+    """Columns for a list of {"time": ..., <numeric fields>} readings, or None if it is not one."""
+    times = [_parse_time(record.get("time")) for record in records]
+    if any(t is None for t in times):
+        return None
+    fields = [key for key in records[0] if key != "time"]
+    if not all(isinstance(record.get(key), (int, float)) for record in records for key in fields):
+        return None
+    seconds = [round(t.timestamp()) for t in times]
+    deltas = [b - a for a, b in zip(seconds, seconds[1:])]
+    encoded = {"start": short_time(records[0]["time"])}
+    if deltas and all(d == deltas[0] for d in deltas):
+        encoded["interval_s"] = deltas[0]
+    elif deltas:
+        encoded["dt_s"] = deltas
+    for key in fields:
+        encoded[key] = [round(float(record[key]), 1) for record in records]
+    return encoded
+
+
+def _compact_list(items):
+    if len(items) < 2 or not all(isinstance(item, dict) for item in items):
+        return [_compact_value(item) for item in items]
+    keys = list(items[0])
+    if any(list(item) != keys for item in items):
+        return [_compact_value(item) for item in items]
+    if "time" in keys:
+        series = _series(items)
+        if series is not None:
+            return series
+    return {"fields": keys, "rows": [[_compact_value(item[key]) for key in keys] for item in items]}
+
+
+def _downsample_series(result, points):
+    """Copy of an encoded result with every series cut to at most `points` readings."""
+    def shrink(value):
+        if isinstance(value, dict):
+            if "start" in value and ("interval_s" in value or "dt_s" in value):
+                fields = [key for key in value if isinstance(value[key], list) and key != "dt_s"]
+                n = len(value[fields[0]]) if fields else 0
+                if n <= points:
+                    return value
+                deltas = value.get("dt_s") or [value["interval_s"]] * (n - 1)
+                offsets = np.concatenate(([0], np.cumsum(deltas)))
+                keep = lttb(offsets, value[fields[0]], points)
+                shrunk = {"start": value["start"]}
+                if keep[0]:
+                    shrunk["start_offset_s"] = int(offsets[keep[0]])
+                shrunk["dt_s"] = np.diff(offsets[keep]).astype(int).tolist()
+                for key in fields:
+                    shrunk[key] = [value[key][i] for i in keep]
+                shrunk["downsampled_from"] = n
+                return shrunk
+            return {key: shrink(item) for key, item in value.items()}
+        return value
+    return shrink(result)
+
+
+def _longest_series(result):
+    longest = 0
+    if isinstance(result, dict):
+        for key, value in result.items():
+            if isinstance(value, list) and key != "dt_s" and all(isinstance(v, (int, float)) for v in value):
+                longest = max(longest, len(value))
+            else:
+                longest = max(longest, _longest_series(value))
+    return longest
+
+
+def encode_result(result, token_budget=800, model="gpt-4o"):
+    """Encode one tool result for the model within token_budget.
+
+    Returns (content, stats) where stats has the tokens of the plain JSON
+    encoding ("raw_tokens"), of the content sent ("tokens") and the
+    difference ("tokens_saved").
+    """
+    raw = json.dumps(result)
+    raw_tokens = count_tokens(raw, model)
+    encoded = _compact_value(result)
+    content = json.dumps(encoded, separators=(",", ":"))
+    tokens = count_tokens(content, model)
+
+    points = _longest_series(encoded)
+    while tokens > token_budget and points > 3:
+        points = max(3, points // 2)
+        content = json.dumps(_downsample_series(encoded, points), separators=(",", ":"))
+        tokens = count_tokens(content, model)
+    if tokens > token_budget:
+        # Keep the longest prefix that fits with a marker, so the model knows the result is incomplete.
+        # Tokens per character vary along the text, so search from twice the proportional cut.
+        marker = "...[truncated]"
+        fits, over = 0, min(len(content), 2 * len(content) * token_budget // tokens)
+        if count_tokens(content[:over] + marker, model) <= token_budget:
+            fits, over = over, len(content)
+        while over - fits > 1:
+            cut = (fits + over) // 2
+            if count_tokens(content[:cut] + marker, model) <= token_budget:
+                fits = cut
+            else:
+                over = cut
+        content = content[:fits] + marker
+        tokens = count_tokens(content, model)
+
+    return content, {"raw_tokens": raw_tokens, "tokens": tokens, "tokens_saved": raw_tokens - tokens}